@@ -1,12 +1,185 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-from resume_parser import ResumeParser
-from matcher import match_jobs
+from matcher import (match_jobs, match_candidates, get_job_store, get_catalogue, get_resume_index,
+                     encode_texts, encode_resume, embedding_version)
+from job_store import METADATA_FIELDS, validate_job
+from job_filters import parse_filters
+from encode_batcher import MicroBatcher, EncoderOverloaded
+from result_cache import ResultCache, content_key
+from resume_index import IndexStale
+from encoder import start_background_load, is_ready, load_error
+from batch import iter_batch_results, iter_jsonl
+from parsing_pool import ParsingPool, ParseError, ParseTimeout
+from task_queue import TaskQueue, TaskWorkers, QueueFull, upload_response
+from metrics import stage
+import atexit
+import cProfile
+import io
+import json
+import metrics
 import os
-import tempfile
+import threading
+import time
+
+class InMemoryUploadRequest(Request):
+    """Keep uploaded files in memory instead of letting Werkzeug spool large ones to temp files.
+    Safe because the body size is capped by MAX_CONTENT_LENGTH before it is read."""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 app = Flask(__name__) # declare the application
+app.request_class = InMemoryUploadRequest
+# Oversized uploads are rejected with 413 from the Content-Length header, before the body is read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+MAX_BATCH_UPLOAD_BYTES = int(os.environ.get("MAX_BATCH_UPLOAD_MB", 500)) * 1024 * 1024
 CORS(app)  # allow requests from react
 
+# Resume parsing runs in worker processes so it never blocks a request thread on the GIL
+parsing_pool = ParsingPool(
+    workers=int(os.environ.get("PARSE_WORKERS", 0)) or None,
+    timeout=float(os.environ.get("PARSE_TIMEOUT", 30)),
+    max_pages=int(os.environ.get("PARSE_MAX_PAGES", 20)),
+    max_tasks_per_worker=int(os.environ.get("PARSE_MAX_TASKS_PER_WORKER", 200)),
+)
+atexit.register(parsing_pool.close)
+
+# Asynchronous uploads (/upload?async=1) are queued in SQLite and processed by
+# TASK_WORKERS worker processes, started by the server entry points (start_task_workers);
+# with 0, run them separately (python task_queue.py)
+TASK_DB = os.environ.get("TASK_DB", "tasks.db")
+TASK_WORKERS = int(os.environ.get("TASK_WORKERS", 2))
+TASK_TIMEOUT = float(os.environ.get("TASK_TIMEOUT", 120))
+TASK_MAX_ATTEMPTS = int(os.environ.get("TASK_MAX_ATTEMPTS", 3))
+task_queue = TaskQueue(TASK_DB, max_attempts=TASK_MAX_ATTEMPTS,
+                       max_queued=int(os.environ.get("TASK_MAX_QUEUED", 1000)))
+task_workers = None
+
+def start_task_workers():
+    """Start the TASK_WORKERS upload workers for this server; importing the app starts none."""
+    global task_workers
+    if task_workers is not None or TASK_WORKERS <= 0:
+        return
+    task_workers = TaskWorkers(
+        TASK_DB, workers=TASK_WORKERS, timeout=TASK_TIMEOUT, max_attempts=TASK_MAX_ATTEMPTS,
+        max_pages=int(os.environ.get("PARSE_MAX_PAGES", 20)),
+        store_resumes=os.environ.get("STORE_RESUMES", "1") == "1",
+        retention=float(os.environ.get("TASK_RETENTION_HOURS", 24)) * 3600,
+    )
+    atexit.register(task_workers.close)
+
+# Seconds between status checks of a server-sent event stream, and between keep-alive comments
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15
+# Each open stream holds a request thread (see ASGI_THREADS in asgi.py); past
+# this many, clients are told to poll GET /results/<id> instead
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", 8))
+_sse_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+# Repeat uploads of the same PDF skip parsing and encoding
+result_cache = ResultCache(
+    cache_dir=os.environ.get("RESULT_CACHE_DIR", "result_cache"),
+    max_memory_items=int(os.environ.get("RESULT_CACHE_MEMORY_ITEMS", 256)),
+    max_disk_bytes=int(os.environ.get("RESULT_CACHE_DISK_MB", 256)) * 1024 * 1024,
+)
+# Concurrent uploads share encode calls: summaries are grouped into batches of up to
+# ENCODE_MAX_BATCH, waiting at most ENCODE_MAX_WAIT_MS for a batch to fill
+encode_batcher = MicroBatcher(
+    encode_texts,
+    max_batch_size=int(os.environ.get("ENCODE_MAX_BATCH", 32)),
+    max_wait_ms=float(os.environ.get("ENCODE_MAX_WAIT_MS", 2)),
+    max_queue=int(os.environ.get("ENCODE_MAX_QUEUE", 256)),
+)
+atexit.register(encode_batcher.close)
+
+# Load the model, warm it up and load the job index without blocking start-up;
+# /readyz reports when this has finished
+start_background_load(on_loaded=get_catalogue)
+
+# Opt-in per-request cProfile dumps (?profile=1); stage traces (?trace=1) are always available
+PROFILE_REQUESTS = os.environ.get("PROFILE_REQUESTS", "0") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+MAX_TOP_N = 50
+# Query parameters that are not job filters (see job_filters.py)
+CONTROL_PARAMS = ('top_n', 'trace', 'profile', 'async')
+
+# Keep every matched resume in the resume index so recruiters can search candidates per job
+STORE_RESUMES = os.environ.get("STORE_RESUMES", "1") == "1"
+
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    if request.args.get('trace') == '1':
+        g.trace, g.trace_token = metrics.start_trace()
+    if PROFILE_REQUESTS and request.args.get('profile') == '1':
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_timing(response):
+    """Record request latency and attach the trace/profile requested for this request.
+    For streamed responses the latency is time to the first byte."""
+    endpoint = request.endpoint or 'unknown'
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint)
+    metrics.REQUESTS.inc(endpoint, str(response.status_code))
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{id(profiler):x}.prof")
+        profiler.dump_stats(path)
+        response.headers['X-Profile-File'] = path
+
+    trace = g.pop('trace', None)
+    if trace is not None:
+        metrics.end_trace(g.pop('trace_token'))
+        totals = {}
+        for event in trace:
+            totals[event['stage']] = totals.get(event['stage'], 0.0) + event['duration_ms']
+        response.headers['Server-Timing'] = ', '.join(f"{name};dur={ms:.3f}" for name, ms in totals.items())
+        if response.is_json and not response.is_streamed:
+            body = response.get_json()
+            if isinstance(body, dict):
+                body['trace'] = trace
+                response.set_data(json.dumps(body))
+    return response
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    limit_mb = (request.max_content_length or 0) / (1024 * 1024)
+    return jsonify({"error": f"Upload too large; the limit is {limit_mb:.0f} MB"}), 413
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: the model is loaded and warmed up and the job index is available."""
+    if is_ready():
+        return jsonify({"status": "ready"})
+    error = load_error()
+    if error:
+        return jsonify({"status": "failed", "error": error}), 503
+    return jsonify({"status": "loading"}), 503
+
+def top_n_option(default_top_n):
+    """``top_n`` from the query string, between 1 and MAX_TOP_N; raises ValueError on bad values."""
+    try:
+        top_n = int(request.args.get('top_n', default_top_n))
+    except ValueError:
+        raise ValueError("'top_n' must be an integer")
+    if not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"'top_n' must be between 1 and {MAX_TOP_N}")
+    return top_n
+
+def match_options(default_top_n=3):
+    """``top_n`` and job filters from the query string; raises ValueError on bad values."""
+    top_n = top_n_option(default_top_n)
+    filters = parse_filters({k: v for k, v in request.args.lists() if k not in CONTROL_PARAMS})
+    return top_n, filters
+
 @app.route('/upload', methods=['POST'])
 def upload():
     if 'resume' not in request.files:
@@ -17,51 +190,241 @@ def upload():
     print(f"✅ Received file: {file.filename}")
     if file.filename == "":
         return jsonify({"error": "Empty filename"}), 400
+    try:
+        top_n, filters = match_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if request.args.get('async') == '1' or 'respond-async' in request.headers.get('Prefer', ''):
+        return enqueue_upload(file, top_n, filters)
 
     try:
-        # Save the uploaded file to a temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            file.save(tmp.name)
-            resume_path = tmp.name
-
-        # Parse the resume from the file path
-        parser = ResumeParser()
-        parsed_resume = parser.parse_resume(resume_path) 
-
-        # Remove temporary file
-        os.remove(resume_path)
-
-        # Run job matcher
-        top_n = 3
-
-        parsed_dict = {
-            'summary' : parsed_resume.summary,
-            'skills' : parsed_resume.skills
-        }
-        matched = match_jobs(parsed_dict,top_n=top_n)
-        titles = []
-        scores = []
-        req_skills = []
-        missing_skills = []
-        
-        for i in range(top_n):
-            titles.append(matched['matched_jobs'][i]['title'])
-            scores.append(matched['matched_jobs'][i]['score'])
-            req_skills.append(matched['matched_jobs'][i]['required_skills'])
-            missing_skills.append(matched['matched_jobs'][i]['missing_skills'])
-        return jsonify({
-            "name": parsed_resume.contact_info.name,
-            "skills": parsed_resume.skills,
-            "summary" : parsed_resume.summary,
-            "matched_job_titles" : titles,
-            "sim_scores" : scores,
-            "req_skills" : req_skills,
-            "missing_skills" : missing_skills
-        }) 
+        # The upload is already in memory (see InMemoryUploadRequest); no temp file involved
+        with stage("upload_read"):
+            pdf_bytes = file.read()
+        with stage("cache_lookup"):
+            cache_key = content_key(pdf_bytes)
+            catalogue = get_catalogue()
+            cache_version = embedding_version(catalogue)
+            cached = result_cache.get(cache_key, cache_version)
+        if cached is not None:
+            parsed_data, resume_embedding = cached
+        else:
+            # Parse the resume in a worker process
+            try:
+                with stage("parse"):
+                    parsed_resume = parsing_pool.parse(pdf_bytes)
+            except ParseTimeout as e:
+                return jsonify({"error": str(e)}), 504
+            except ParseError as e:
+                return jsonify({"error": str(e)}), 422
+            parsed_data = parsed_resume.to_dict()
+            try:
+                # Summary, experience entries, skills and text chunks go through the batcher together
+                with stage("encode_resume"):
+                    resume_embedding = encode_resume(parsed_data, encode_fn=encode_batcher.encode_many)
+            except EncoderOverloaded as e:
+                return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+            with stage("cache_store"):
+                result_cache.put(cache_key, cache_version, parsed_data, resume_embedding)
+        if STORE_RESUMES and resume_embedding is not None:
+            with stage("resume_index"):
+                get_resume_index().add(cache_key, parsed_data, resume_embedding)
+
+        # Run job matcher; fewer than top_n jobs come back when the catalogue or filters leave fewer
+        matched = match_jobs(parsed_data, top_n=top_n, resume_embedding=resume_embedding,
+                             catalogue=catalogue, filters=filters)
+        if 'error' in matched:
+            return jsonify({"error": matched['error']}), 422
+        with stage("serialise"):
+            return jsonify(upload_response(parsed_data, matched))
         
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def enqueue_upload(file, top_n, filters):
+    """Queue an upload for the task workers; answers 202 with where to follow it."""
+    with stage("upload_read"):
+        pdf_bytes = file.read()
+    try:
+        with stage("enqueue"):
+            task_id = task_queue.enqueue(pdf_bytes, {'filename': file.filename, 'top_n': top_n, 'filters': filters})
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    results_url = f"/results/{task_id}"
+    return jsonify({
+        "id": task_id,
+        "status": "queued",
+        "results_url": results_url,
+        "events_url": f"{results_url}/events",
+    }), 202, {"Location": results_url}
+
+@app.route('/results/<task_id>', methods=['GET'])
+def task_result(task_id):
+    """Status of a queued upload; once done, ``result`` holds the /upload response."""
+    task = task_queue.get(task_id)
+    if task is None:
+        return jsonify({"error": f"Unknown task id '{task_id}'"}), 404
+    return jsonify(task)
+
+@app.route('/results/<task_id>/events', methods=['GET'])
+def task_events(task_id):
+    """Server-sent events: a ``status`` event whenever the task changes, ending once it is done or failed."""
+    if task_queue.get(task_id) is None:
+        return jsonify({"error": f"Unknown task id '{task_id}'"}), 404
+    if not _sse_streams.acquire(blocking=False):
+        return jsonify({"error": f"Too many open event streams; poll GET /results/{task_id} instead",
+                        "results_url": f"/results/{task_id}"}), 503, {"Retry-After": "5"}
+
+    def events():
+        last, last_sent = None, time.monotonic()
+        while True:
+            task = task_queue.get(task_id)
+            if task is None:  # purged
+                return
+            state = (task['status'], task['attempts'])
+            if state != last:
+                yield f"event: status\ndata: {json.dumps(task)}\n\n"
+                last, last_sent = state, time.monotonic()
+                if task['status'] in ('done', 'failed'):
+                    return
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(SSE_POLL_SECONDS)
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(_sse_streams.release)
+    return response
+
+@app.route('/tasks/stats', methods=['GET'])
+def task_stats():
+    """Number of queued, running, done and failed uploads."""
+    return jsonify(task_queue.counts())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage and request latency histograms in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters and size of the upload result cache."""
+    return jsonify(result_cache.stats())
+
+@app.route('/encoder/stats', methods=['GET'])
+def encoder_stats():
+    """Batch sizes and back-pressure counters of the encode batcher."""
+    return jsonify(encode_batcher.stats())
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """All postings in the job store, with their stable ids."""
+    store = get_job_store()
+    return jsonify({"revision": store.revision(), "jobs": store.all()})
+
+@app.route('/jobs', methods=['POST'])
+def add_jobs():
+    """Add one posting (a JSON object) or several (a JSON array); ids are generated unless given."""
+    payload = request.get_json(silent=True)
+    jobs = payload if isinstance(payload, list) else [payload]
+    try:
+        added = get_job_store().add_many(jobs)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    get_catalogue()  # starts re-indexing in the background
+    return jsonify(added if isinstance(payload, list) else added[0]), 201
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job id '{job_id}'"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>', methods=['PUT', 'PATCH'])
+def update_job(job_id):
+    """Update a posting; PATCH changes the given fields, PUT replaces all of them."""
+    changes = request.get_json(silent=True)
+    try:
+        if request.method == 'PUT':
+            changes = {**{field: None for field in METADATA_FIELDS}, **validate_job(changes)}
+        job = get_job_store().update(job_id, changes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if job is None:
+        return jsonify({"error": f"Unknown job id '{job_id}'"}), 404
+    get_catalogue()
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    if not get_job_store().delete(job_id):
+        return jsonify({"error": f"Unknown job id '{job_id}'"}), 404
+    get_catalogue()
+    return '', 204
+
+@app.route('/jobs/<job_id>/candidates', methods=['GET'])
+def job_candidates(job_id):
+    """The stored resumes that best match a posting."""
+    job = get_job_store().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job id '{job_id}'"}), 404
+    try:
+        top_n = top_n_option(default_top_n=10)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        matched = match_candidates(job, top_n=top_n, encode_fn=encode_batcher.encode_many)
+    except EncoderOverloaded as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except IndexStale as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({"job": job, **matched})
+
+@app.route('/candidates', methods=['POST'])
+def adhoc_candidates():
+    """The stored resumes that best match an ad-hoc posting: {"description": ..., "required_skills": [...]}."""
+    try:
+        job = validate_job({'title': 'ad hoc', **(request.get_json(silent=True) or {})})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        top_n = top_n_option(default_top_n=10)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        matched = match_candidates(job, top_n=top_n, encode_fn=encode_batcher.encode_many)
+    except EncoderOverloaded as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except IndexStale as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify(matched)
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """Screen many resumes at once; streams one JSON object per resume (JSON Lines)."""
+    request.max_content_length = MAX_BATCH_UPLOAD_BYTES
+    files = [f for f in request.files.getlist('resumes') if f.filename]
+    if not files:
+        return jsonify({"error": "No files uploaded"}), 400
+
+    try:
+        top_n, filters = match_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Read uploads up front: the request stream is gone once the response starts
+    documents = [f.read() for f in files]
+    labels = [f.filename for f in files]
+    print(f"✅ Received {len(files)} files for batch matching")
+
+    results = iter_batch_results(documents, labels, parsing_pool, top_n=top_n, filters=filters)
+    return Response(stream_with_context(iter_jsonl(results)), mimetype='application/x-ndjson')
+
 if __name__ == '__main__':
+    from werkzeug.serving import is_running_from_reloader
+    if is_running_from_reloader():  # the debug reloader's serving process, not its watcher
+        start_task_workers()
     app.run(debug=True)
@@ -0,0 +1,76 @@
+"""
+ASGI entry point for the resume matcher.
+
+Serves the Flask app through an ASGI server so many uploads can be in flight
+at once; each request runs on a thread of a pool of ``ASGI_THREADS`` threads
+and hands its resume fields to the shared encode batcher (see
+encode_batcher.py), which folds concurrent encodes into single model calls.
+
+asgiref's ``WsgiToAsgi`` cannot be used as is: it runs the WSGI app with
+``thread_sensitive=True``, i.e. every request on one shared thread, one at a
+time, so the batcher would never see two requests together. The adapter
+below runs each request on the pool instead.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Use one server worker process: the model, the job index and the batcher live
+in the process, and a single batcher sees the most concurrency. This module
+also starts the upload task workers (``TASK_WORKERS``, see task_queue.py).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import app, start_task_workers
+
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))
+_executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix="asgi-request")
+
+
+class _PooledInstance(WsgiToAsgiInstance):
+    def _run_wsgi_app(self, body):
+        """
+        asgiref's run_wsgi_app, on a pool thread: runs the app with this
+        instance's environ and start_response and sends what it yields. Also
+        closes the app's response (so e.g. event streams free their slot),
+        which asgiref's does not.
+        """
+        output = self.wsgi_application(self.build_environ(self.scope, body), self.start_response)
+        try:
+            bytes_sent = 0
+            for chunk in output:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                if self.response_content_length is not None:
+                    chunk = chunk[:self.response_content_length - bytes_sent]  # never past Content-Length
+                self.sync_send({"type": "http.response.body", "body": chunk, "more_body": True})
+                bytes_sent += len(chunk)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(output, 'close'):
+                output.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
+
+    run_wsgi_app = sync_to_async(_run_wsgi_app, thread_sensitive=False, executor=_executor)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """``WsgiToAsgi`` running each request on a thread of the pool rather than one shared thread."""
+
+    async def __call__(self, scope, receive, send):
+        await _PooledInstance(self.wsgi_application)(scope, receive, send)
+
+
+application = PooledWsgiToAsgi(app)
+start_task_workers()
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(application, host=os.environ.get("HOST", "127.0.0.1"), port=int(os.environ.get("PORT", 5000)))
@@ -0,0 +1,136 @@
+"""
+Batch resume screening: parse many PDFs in parallel and match them against
+the job index with one batched encode per chunk.
+
+Usage:
+    python batch.py resumes/ -o results.jsonl
+    python batch.py a.pdf b.pdf c.pdf --workers 8 --top-n 5
+    python batch.py resumes/ --filter seniority=junior,mid --filter skill=python
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from job_filters import parse_filters
+from matcher import match_jobs_batch
+from parsing_pool import ParseError, ParsingPool
+
+# A document is either raw PDF bytes or a zero-argument callable returning them,
+# so large folders are only read from disk one chunk at a time
+Document = Union[bytes, Callable[[], bytes]]
+
+
+def _to_result(parsed) -> Dict:
+    if isinstance(parsed, ParseError):
+        return {"error": str(parsed)}
+    return {
+        "name": parsed.contact_info.name,
+        "skills": parsed.skills,
+        "summary": parsed.summary,
+    }
+
+
+def _read(document: Document) -> bytes:
+    return document() if callable(document) else document
+
+
+def iter_batch_results(documents: List[Document], labels: List[str], pool: ParsingPool,
+                       top_n: int = 3, chunk_size: int = 256,
+                       filters: Optional[Dict[str, List[str]]] = None) -> Iterator[Dict]:
+    """
+    Yield one result dict per resume, in input order.
+
+    Resumes are processed in chunks of ``chunk_size`` so results start
+    streaming before the whole folder is parsed, while each chunk's summaries
+    are still encoded in a single model call. Each resume's summary,
+    experience entries, skills and (if weighted) chunked text are embedded
+    (see matcher.resume_fields).
+    """
+    for start in range(0, len(documents), chunk_size):
+        chunk = documents[start:start + chunk_size]
+        parsed = [None] * len(chunk)
+        readable = []
+        for i, document in enumerate(chunk):
+            try:
+                readable.append((i, _read(document)))
+            except OSError as e:
+                parsed[i] = {"error": str(e)}
+        match_fields = {}
+        for (i, _), result in zip(readable, pool.parse_many(data for _, data in readable)):
+            parsed[i] = _to_result(result)
+            if not isinstance(result, ParseError):
+                match_fields[i] = {"experience": result.to_dict()["experience"], "text": result.text}
+
+        ok = [i for i, p in enumerate(parsed) if "error" not in p]
+        matches = match_jobs_batch([dict(parsed[i], **match_fields[i]) for i in ok], top_n=top_n,
+                                   filters=filters)
+        for i, matched in zip(ok, matches):
+            parsed[i].update(matched)
+
+        for label, result in zip(labels[start:start + chunk_size], parsed):
+            yield {"file": label, **result}
+
+
+def iter_jsonl(results: Iterable[Dict]) -> Iterator[str]:
+    for result in results:
+        yield json.dumps(result, ensure_ascii=False) + "\n"
+
+
+def collect_pdfs(inputs: List[str]) -> List[str]:
+    """Expand directories into the PDFs they contain."""
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(str(p) for p in sorted(path.glob("*.pdf")))
+        else:
+            paths.append(str(path))
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", help="PDF files and/or folders of PDFs")
+    ap.add_argument("-o", "--output", help="JSON Lines output file (default: stdout)")
+    ap.add_argument("--top-n", type=int, default=3)
+    ap.add_argument("--filter", action="append", default=[], metavar="FACET=VALUES",
+                    help="only match jobs with these metadata, e.g. seniority=junior,mid or skill=python "
+                         "(repeatable; see job_filters.py)")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    ap.add_argument("--chunk-size", type=int, default=256)
+    ap.add_argument("--timeout", type=float, default=30.0, help="per-document parse timeout in seconds")
+    ap.add_argument("--max-pages", type=int, default=20)
+    args = ap.parse_args()
+    specs = {}
+    for spec in args.filter:
+        facet, _, values = spec.partition('=')
+        specs.setdefault(facet.strip(), []).append(values)
+    try:
+        filters = parse_filters(specs)
+    except ValueError as e:
+        ap.error(str(e))
+
+    pdf_paths = collect_pdfs(args.inputs)
+    documents = [Path(p).read_bytes for p in pdf_paths]
+    labels = [os.path.basename(p) for p in pdf_paths]
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # Progress prints from the parser/matcher go to stderr so stdout stays valid JSON Lines
+        with redirect_stdout(sys.stderr), \
+                ParsingPool(workers=args.workers, timeout=args.timeout, max_pages=args.max_pages) as pool:
+            results = iter_batch_results(documents, labels, pool,
+                                         top_n=args.top_n, chunk_size=args.chunk_size, filters=filters)
+            for line in iter_jsonl(results):
+                out.write(line)
+                out.flush()
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Index size and latency with near-duplicate postings collapsed (dedup.py).
+
+Synthetic catalogues mimic jobs_db.json: role families whose postings are
+templated variants ("<role> #<n>" listing the family's skills in a different
+order), plus one-off postings. For each size the report shows:
+
+- dedup: time to shingle, MinHash, band and cluster the catalogue
+- pair precision / recall: clustered pairs against the true families
+- rows / MB: embeddings to compute and serve (384-d float32), all postings
+  versus representatives only
+- p50 / p95 ms: exact search latency per resume over each index
+- distinct@3: share of top-3 results that are different roles
+
+Usage:
+    python bench_dedup.py                        # 10k and 100k postings
+    python bench_dedup.py --sizes 200000 --variants 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from dedup import find_duplicates
+from retrieval import ExactSearch
+
+WORDS = ("python sql java aws docker kubernetes react pandas spark git tensorflow excel go rust linux "
+         "tableau flask django scala terraform azure gcp kafka airflow redis postgres graphql node "
+         "typescript swift kotlin pytorch hadoop snowflake dbt looker jenkins ansible bash c++").split()
+ROLES = ("engineer developer analyst scientist architect administrator designer manager consultant "
+         "specialist").split()
+AREAS = ("data cloud backend frontend platform security network embedded mobile machine-learning qa "
+         "devops database reliability analytics integration payments search infrastructure").split()
+
+
+def synthetic_jobs(n_jobs: int, variants: float, seed: int = 0):
+    """(jobs, true family per job): families of templated variants plus one-off postings."""
+    rng = np.random.default_rng(seed)
+    jobs, family = [], []
+    n_family = 0
+    while len(jobs) < n_jobs:
+        title = f"{rng.choice(AREAS).title()} {rng.choice(ROLES).title()} {n_family}"
+        skills = list(rng.choice(WORDS, 6, replace=False))
+        location = str(rng.choice(['Berlin', 'London', 'Remote', 'New York']))
+        size = 1 if rng.random() < 0.2 else int(rng.integers(2, 2 * variants))
+        for v in range(min(size, n_jobs - len(jobs))):
+            listed = list(rng.permutation(skills))
+            jobs.append({
+                'id': f"job-{len(jobs)}",
+                'title': f"{title} #{v + 1}",
+                'description': f"We are seeking a {title} proficient in {', '.join(listed[:4])}. "
+                               f"Experience with {listed[4]} is a plus.",
+                'required_skills': skills,
+                'location': location,
+            })
+            family.append(n_family)
+        n_family += 1
+    return jobs, np.array(family)
+
+
+def family_embeddings(family: np.ndarray, dim: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors: one direction per family, variants a little apart (as their embeddings are)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((family.max() + 1, dim)).astype(np.float32)
+    data = centres[family] + 0.15 * rng.standard_normal((len(family), dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def pair_scores(predicted: np.ndarray, truth: np.ndarray):
+    """Pairwise precision and recall of a clustering against the true families."""
+    def pairs(labels):
+        _, counts = np.unique(labels, axis=0, return_counts=True)
+        return (counts * (counts - 1) // 2).sum()
+    both = pairs(np.stack([predicted, truth], axis=1))
+    return both / max(pairs(predicted), 1), both / max(pairs(truth), 1)
+
+
+def search_latency(embeddings: np.ndarray, queries: np.ndarray, k: int):
+    backend = ExactSearch(embeddings)
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        ids, _ = backend.search(q, k)
+        latencies.append(time.perf_counter() - start)
+        results.append(ids)
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--variants", type=float, default=5, help="average postings per templated family")
+    ap.add_argument("--threshold", type=float, default=0.7)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"{'jobs':>8} {'dedup s':>8} {'precision':>9} {'recall':>7} {'index':>6} {'rows':>8} {'MB':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'distinct@3':>10}")
+    for n_jobs in args.sizes:
+        jobs, family = synthetic_jobs(n_jobs, args.variants)
+        start = time.perf_counter()
+        clusters = find_duplicates(jobs, args.threshold)
+        dedup_time = time.perf_counter() - start
+        precision, recall = pair_scores(clusters.roots, family)
+
+        embeddings = family_embeddings(family, args.dim)
+        rng = np.random.default_rng(1)
+        queries = embeddings[rng.integers(0, n_jobs, args.queries)]
+        queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        reps = clusters.representatives
+        for label, rows in (("all", np.arange(n_jobs)), ("dedup", reps)):
+            index = np.ascontiguousarray(embeddings[rows])
+            latencies, results = search_latency(index, queries, 3)
+            distinct = np.mean([len(set(family[rows[ids]].tolist())) / 3 for ids in results])
+            prefix = (f"{n_jobs:>8} {dedup_time:>8.2f} {precision:>9.3f} {recall:>7.3f}" if label == "all"
+                      else f"{'':>8} {'':>8} {'':>9} {'':>7}")
+            print(f"{prefix} {label:>6} {len(rows):>8} {index.nbytes / 2**20:>7.1f} "
+                  f"{np.percentile(latencies, 50):>7.2f} {np.percentile(latencies, 95):>7.2f} {distinct:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
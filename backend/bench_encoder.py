@@ -0,0 +1,109 @@
+"""
+Accuracy parity and throughput of the encoder backends (encoder_backends.py).
+
+Every backend / quantisation pair encodes the same texts (the job
+descriptions plus synthetic resume fields of mixed length) and is compared
+with the eager PyTorch fp32 model:
+
+- min cos / mean cos: cosine between each embedding and the reference one
+- recall@10: overlap of the top-10 jobs per resume field with the reference
+- sent/s: sentences per second (best of ``--repeats`` runs)
+
+The exit status is 1 when a backend's minimum cosine falls below
+``--min-cosine`` (fp32) or ``--min-cosine-int8``, or its recall@10 below
+``--min-recall`` (fp32) or ``--min-recall-int8``. Only serve a backend
+(ENCODER_BACKEND / ENCODER_QUANTIZE, see encoder.py) that passes both on the
+real checkpoint.
+
+Usage:
+    python bench_encoder.py --model-dir models/all-MiniLM-L6-v2
+    python bench_encoder.py --model-dir models/all-MiniLM-L6-v2 --backends onnx --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from bench_serialisation import synthetic_resumes
+from encoder import MODEL_NAME
+from encoder_backends import BACKENDS, load_encoder
+
+
+def benchmark_texts(jobs_path: str, n_resumes: int):
+    with open(jobs_path, 'r') as f:
+        jobs = [job['description'] for job in json.load(f)]
+    queries = []
+    for resume in synthetic_resumes(n_resumes, with_text=True):
+        queries.append(resume.summary)
+        queries.extend(e.title + '. ' + e.description for e in resume.experience)
+        queries.append(resume.text)  # longer than the model's 256-token window
+    return jobs, queries
+
+
+def encode_timed(model, texts, batch_size: int, repeats: int):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        best = min(best, time.perf_counter() - start)
+    return np.asarray(embeddings, dtype=np.float32), len(texts) / best
+
+
+def top_k(queries: np.ndarray, jobs: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ jobs.T), axis=1)[:, :k]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model-dir", required=True, help="local model copy (python encoder_backends.py <dir>)")
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    ap.add_argument("--quantize", nargs="+", choices=['none', 'int8'], default=['none', 'int8'])
+    ap.add_argument("--threads", type=int, default=0, help="intra-op threads (0: library default)")
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--resumes", type=int, default=50)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--jobs", default="jobs_db.json")
+    ap.add_argument("--min-cosine", type=float, default=0.9999)
+    ap.add_argument("--min-cosine-int8", type=float, default=0.97)
+    ap.add_argument("--min-recall", type=float, default=0.99)
+    ap.add_argument("--min-recall-int8", type=float, default=0.97)
+    args = ap.parse_args()
+
+    jobs, queries = benchmark_texts(args.jobs, args.resumes)
+    texts = jobs + queries
+    k = min(10, len(jobs))
+    print(f"{len(jobs)} job descriptions + {len(queries)} resume fields, batch size {args.batch_size}, "
+          f"threads {args.threads or 'default'}, {os.cpu_count()} CPUs")
+
+    reference_model = load_encoder('torch', MODEL_NAME, args.model_dir, threads=args.threads)
+    reference, _ = encode_timed(reference_model, texts, args.batch_size, 1)
+    reference_top = top_k(reference[len(jobs):], reference[:len(jobs)], k)
+    del reference_model
+
+    print(f"{'backend':<12} {'quant':>5} {'min cos':>9} {'mean cos':>9} {'recall@10':>10} {'sent/s':>8}")
+    failed = False
+    for backend in args.backends:
+        for quantize in args.quantize:
+            quantize = '' if quantize == 'none' else quantize
+            model = load_encoder(backend, MODEL_NAME, args.model_dir, quantize, args.threads)
+            encode_timed(model, texts[:args.batch_size], args.batch_size, 1)  # warm-up
+            embeddings, throughput = encode_timed(model, texts, args.batch_size, args.repeats)
+
+            cosine = (embeddings * reference).sum(axis=1)
+            found = top_k(embeddings[len(jobs):], embeddings[:len(jobs)], k)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, reference_top)])
+            min_cosine, min_recall = ((args.min_cosine_int8, args.min_recall_int8) if quantize
+                                      else (args.min_cosine, args.min_recall))
+            misses = [f"{name} < {threshold:g}" for name, value, threshold in
+                      (('cosine', cosine.min(), min_cosine), ('recall', recall, min_recall)) if value < threshold]
+            failed |= bool(misses)
+            print(f"{backend:<12} {quantize or '-':>5} {cosine.min():>9.5f} {cosine.mean():>9.5f} "
+                  f"{recall:>10.3f} {throughput:>8.1f}" + (f"  FAIL ({', '.join(misses)})" if misses else ''))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
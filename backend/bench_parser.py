@@ -0,0 +1,130 @@
+"""
+Micro-benchmark for the text stage of ResumeParser (contact info, skills,
+education, experience and summary extraction) on synthetic resumes.
+
+PDF extraction is excluded so the numbers isolate the extractors. Pass
+``--baseline`` with another version of resume_parser.py to compare, e.g.
+
+    git show <rev>:backend/resume_parser.py > /tmp/resume_parser_old.py
+    python bench_parser.py --baseline /tmp/resume_parser_old.py
+"""
+import argparse
+import importlib.util
+import random
+import statistics
+import time
+
+SECTION_TITLES = {
+    'summary': ['SUMMARY', 'Professional Summary', 'OBJECTIVE', 'Profile'],
+    'experience': ['EXPERIENCE', 'Work Experience', 'PROFESSIONAL EXPERIENCE', 'Employment History'],
+    'education': ['EDUCATION', 'Education', 'Academic Background'],
+    'skills': ['SKILLS', 'Technical Skills', 'Skills & Tools'],
+    'projects': ['PROJECTS', 'Personal Projects'],
+}
+FIRST_NAMES = ['Asha', 'Ravi', 'Maria', 'John', 'Wei', 'Fatima', 'Liam', 'Priya']
+LAST_NAMES = ['Sharma', 'Garcia', 'Smith', 'Chen', 'Khan', 'Murphy', 'Patel']
+TITLES = ['Software Engineer', 'Data Analyst', 'Senior Developer', 'Project Manager', 'ML Intern']
+COMPANIES = ['Acme Technologies', 'Globex Corp', 'Initech Solutions', 'Umbrella Ltd', 'Hooli Inc']
+INSTITUTIONS = ['Indian Institute of Technology, Delhi', 'Stanford University', 'City College', 'NIT Trichy']
+DEGREES = ['B.Tech in Computer Science', 'Master of Science in Data Science', 'Bachelor of Arts', 'M.Tech in AI']
+SKILLS = ['Python', 'SQL', 'Docker', 'Kubernetes', 'React', 'Node.js', 'AWS', 'Pandas', 'Git', 'Java', 'Go']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+FILLER = ('designed built improved data pipeline service latency customers reporting dashboard '
+          'automated deployment scaled team migrated platform analysed metrics reduced cost').split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(FILLER) for _ in range(words)).capitalize() + '.'
+
+
+def _date_range(rng: random.Random) -> str:
+    start = rng.randint(2005, 2022)
+    return f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {start + rng.randint(1, 3)}"
+
+
+def synthetic_resume_text(rng: random.Random, n_jobs: int = 3, n_projects: int = 3,
+                          bullets_per_item: int = 3) -> str:
+    """A plausible resume as plain text, with sections in a random order."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.split()[0].lower()}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+             "linkedin.com/in/" + name.replace(' ', '').lower()]
+
+    sections = {
+        'summary': [_sentence(rng, 14) for _ in range(rng.randint(2, 5))],
+        'experience': [],
+        'education': [],
+        'skills': [', '.join(rng.sample(SKILLS, 6)), ', '.join(rng.sample(SKILLS, 4))],
+        'projects': [],
+    }
+    for _ in range(n_jobs):
+        sections['experience'] += [rng.choice(TITLES), rng.choice(COMPANIES), _date_range(rng)]
+        sections['experience'] += ['• ' + _sentence(rng, 12) for _ in range(bullets_per_item)]
+    for _ in range(rng.randint(1, 2)):
+        sections['education'] += [rng.choice(INSTITUTIONS), rng.choice(DEGREES), _date_range(rng),
+                                  f"CGPA: {rng.uniform(6, 10):.2f}/10"]
+    for _ in range(n_projects):
+        sections['projects'] += [f"Project {rng.randint(1, 99)}: {_sentence(rng, 4)}"]
+        sections['projects'] += ['• ' + _sentence(rng, 12) for _ in range(bullets_per_item)]
+
+    order = ['summary'] + rng.sample(['experience', 'education', 'skills', 'projects'], 4)
+    for section in order:
+        lines.append(rng.choice(SECTION_TITLES[section]))
+        lines.extend(sections[section])
+    return '\n'.join(lines) + '\n'
+
+
+def load_parser_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_text(parser, text: str):
+    """Everything parse_resume does after PDF extraction, for either parser version."""
+    if hasattr(parser, 'parse_text'):
+        return parser.parse_text(text, [])
+    return (parser.extract_contact_info(text, []), parser.extract_skills(text),
+            parser.extract_education(text), parser.extract_experience(text),
+            parser.extract_summary(text))
+
+
+def time_corpus(parser, corpus, repeat: int) -> list:
+    per_resume = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            parse_text(parser, text)
+        per_resume.append((time.perf_counter() - start) / len(corpus))
+    return per_resume
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resumes", type=int, default=500)
+    ap.add_argument("--jobs", type=int, default=4, help="experience entries per resume")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--baseline", help="path to another resume_parser.py to compare against")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    corpus = [synthetic_resume_text(rng, n_jobs=args.jobs) for _ in range(args.resumes)]
+    avg_chars = statistics.mean(len(t) for t in corpus)
+    print(f"{args.resumes} synthetic resumes, {avg_chars:.0f} chars on average")
+
+    versions = [('current', 'resume_parser.py')]
+    if args.baseline:
+        versions.insert(0, ('baseline', args.baseline))
+
+    for label, path in versions:
+        if label == 'current':
+            import resume_parser as module
+        else:
+            module = load_parser_module(path, 'resume_parser_baseline')
+        times = time_corpus(module.ResumeParser(), corpus, args.repeat)
+        print(f"{label:>9}: {min(times) * 1e6:8.1f} us/resume (best of {args.repeat}), "
+              f"median {statistics.median(times) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
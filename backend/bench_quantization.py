@@ -0,0 +1,76 @@
+"""
+Memory footprint and ranking agreement of the quantised job index formats.
+
+For each catalogue size, the float32 matrix is quantised to float16 and int8
+(see quantization.py) and exact top-k search on each is compared with the
+float32 baseline:
+
+- MB: bytes of the stored matrix (plus per-row scales for int8)
+- recall@k: share of the float32 top-k also returned by the compact format
+- top-1: share of queries whose best job is unchanged
+- max |err|: largest absolute cosine-score difference over all jobs
+- p50 ms: median single-query latency
+
+Usage:
+    python bench_quantization.py                       # 10k, 100k and 1M jobs
+    python bench_quantization.py --sizes 100000 --k 10 --queries 200
+    python bench_quantization.py --index-dir job_index # the real catalogue
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bench_retrieval import synthetic_catalogue, synthetic_queries
+from job_index import EMBEDDINGS_FILE
+from quantization import QuantizedMatrix, quantize
+from retrieval import ExactSearch
+
+
+def compare(catalogue: np.ndarray, queries: np.ndarray, k: int, label: str):
+    baseline = ExactSearch(catalogue)
+    truth = [baseline.search(q, k)[0] for q in queries]
+    true_scores = catalogue @ queries.T
+
+    print(f"{label:>9} {'dtype':>8} {'MB':>9} {'recall@k':>9} {'top-1':>7} {'max |err|':>10} {'p50 ms':>8}")
+    for dtype in ('float32', 'float16', 'int8'):
+        matrix = catalogue if dtype == 'float32' else QuantizedMatrix(*quantize(catalogue, dtype))
+        backend = ExactSearch(matrix)
+
+        latencies = []
+        hits = top1 = 0
+        for q, t in zip(queries, truth):
+            start = time.perf_counter()
+            ids, _ = backend.search(q, k)
+            latencies.append(time.perf_counter() - start)
+            hits += len(set(ids.tolist()) & set(t.tolist()))
+            top1 += int(ids[0] == t[0])
+
+        error = np.abs((matrix @ queries.T) - true_scores).max()
+        print(f"{label:>9} {dtype:>8} {matrix.nbytes / 2**20:>9.1f} {hits / (k * len(queries)):>9.4f} "
+              f"{top1 / len(queries):>7.3f} {error:>10.5f} {np.median(latencies) * 1000:>8.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--index-dir", help="compare on an existing job index instead of synthetic data")
+    args = ap.parse_args()
+
+    if args.index_dir:
+        catalogue = np.load(os.path.join(args.index_dir, EMBEDDINGS_FILE))
+        compare(catalogue, synthetic_queries(catalogue, args.queries), min(args.k, len(catalogue)),
+                str(catalogue.shape[0]))
+        return
+
+    for n_jobs in args.sizes:
+        catalogue = synthetic_catalogue(n_jobs, args.dim, n_families=max(10, n_jobs // 500))
+        compare(catalogue, synthetic_queries(catalogue, args.queries), args.k, str(n_jobs))
+
+
+if __name__ == "__main__":
+    main()
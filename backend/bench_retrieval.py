@@ -0,0 +1,88 @@
+"""
+Recall vs latency benchmark for the retrieval backends in retrieval.py.
+
+Builds synthetic catalogues of clustered unit vectors (job postings tend to
+form role families, which is what IVF relies on) and compares exact search
+with IVF at several ``n_probe`` settings.
+
+Usage:
+    python bench_retrieval.py                      # 10k, 100k and 1M jobs
+    python bench_retrieval.py --sizes 10000 100000 --queries 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from retrieval import ExactSearch, IVFSearch
+
+
+def synthetic_catalogue(n_jobs: int, dim: int, n_families: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors scattered around ``n_families`` random role centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_families, dim)).astype(np.float32)
+    family = rng.integers(0, n_families, n_jobs)
+    data = np.empty((n_jobs, dim), dtype=np.float32)
+    for start in range(0, n_jobs, 100_000):
+        stop = min(start + 100_000, n_jobs)
+        block = centres[family[start:stop]] + 0.6 * rng.standard_normal((stop - start, dim)).astype(np.float32)
+        data[start:stop] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return data
+
+
+def synthetic_queries(catalogue: np.ndarray, n_queries: int, seed: int = 1) -> np.ndarray:
+    """Noisy copies of random catalogue entries, i.e. resumes close to some role."""
+    rng = np.random.default_rng(seed)
+    base = catalogue[rng.integers(0, catalogue.shape[0], n_queries)]
+    queries = base + 0.05 * rng.standard_normal(base.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def run_queries(backend, queries: np.ndarray, k: int):
+    latencies = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        ids, _ = backend.search(q, k)
+        latencies.append(time.perf_counter() - start)
+        results.append(ids)
+    return results, np.array(latencies) * 1000
+
+
+def recall(results, truth) -> float:
+    hits = sum(len(set(r.tolist()) & set(t.tolist())) for r, t in zip(results, truth))
+    return hits / sum(len(t) for t in truth)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = ap.parse_args()
+
+    print(f"{'jobs':>9} {'backend':>12} {'build s':>8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for n_jobs in args.sizes:
+        catalogue = synthetic_catalogue(n_jobs, args.dim, n_families=max(10, n_jobs // 500))
+        queries = synthetic_queries(catalogue, args.queries)
+
+        exact = ExactSearch(catalogue)
+        truth, lat = run_queries(exact, queries, args.k)
+        print(f"{n_jobs:>9} {'exact':>12} {0.0:>8.2f} {1.0:>9.3f} "
+              f"{np.percentile(lat, 50):>8.2f} {np.percentile(lat, 95):>8.2f}")
+
+        start = time.perf_counter()
+        ivf = IVFSearch(catalogue)
+        build_time = time.perf_counter() - start
+        for n_probe in args.probes:
+            ivf.n_probe = min(n_probe, ivf.n_lists)
+            results, lat = run_queries(ivf, queries, args.k)
+            label = f"ivf/{ivf.n_probe}of{ivf.n_lists}"
+            print(f"{n_jobs:>9} {label:>12} {build_time:>8.2f} {recall(results, truth):>9.3f} "
+                  f"{np.percentile(lat, 50):>8.2f} {np.percentile(lat, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
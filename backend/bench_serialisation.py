@@ -0,0 +1,155 @@
+"""
+Memory per resume and bulk load throughput of the parsed-resume representations.
+
+Synthetic ParsedResume records are held in memory as:
+
+- dicts: ``ParsedResume.to_dict()`` (what the JSON path produces)
+- dataclasses without slots (the previous model)
+- slotted dataclasses (the current model)
+- a ResumeTable over the columnar file (resume_codec.py)
+
+and stored / loaded in bulk as JSON Lines versus the columnar format.
+
+Usage:
+    python bench_serialisation.py                    # 10k and 100k resumes
+    python bench_serialisation.py --sizes 50000 --with-text
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+
+import numpy as np
+
+from resume_codec import ResumeTable, read_resumes, write_resumes
+from resume_parser import ContactInfo, Education, Experience, ParsedResume
+
+WORDS = ("data engineer python pipeline model team built led designed analytics platform cloud "
+         "service customer product research scalable api latency dashboards stakeholders").split()
+SKILLS = ['python', 'sql', 'java', 'aws', 'docker', 'kubernetes', 'react', 'pandas', 'spark', 'git',
+          'tensorflow', 'excel', 'go', 'rust', 'linux', 'tableau', 'flask', 'django', 'c++', 'scala']
+
+
+def _words(rng, n: int) -> str:
+    return ' '.join(rng.choice(WORDS, n))
+
+
+def synthetic_resumes(n: int, with_text: bool = False, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    resumes = []
+    for i in range(n):
+        resumes.append(ParsedResume(
+            contact_info=ContactInfo(name=f"Candidate {i}", email=f"candidate{i}@example.com",
+                                     phone=f"+1 555 {i:07d}", linkedin=f"https://linkedin.com/in/c{i}",
+                                     github=f"https://github.com/c{i}" if i % 2 else None),
+            skills=list(rng.choice(SKILLS, int(rng.integers(5, 15)), replace=False)),
+            education=[Education(degree="B.Sc. Computer Science", institution="State University",
+                                 year=str(2000 + i % 20)) for _ in range(int(rng.integers(1, 3)))],
+            experience=[Experience(title=_words(rng, 2).title(), company=_words(rng, 2).title(),
+                                   duration="2019 - 2023", description=_words(rng, 40))
+                        for _ in range(int(rng.integers(1, 5)))],
+            summary=_words(rng, 50),
+            text=_words(rng, 600) if with_text else None,
+        ))
+    return resumes
+
+
+def _unslotted(cls):
+    return make_dataclass(cls.__name__, [(f.name, f.type, field(default=f.default) if f.default is not MISSING
+                                          else field()) for f in fields(cls)])
+
+
+PlainContact, PlainEducation, PlainExperience, PlainResume = map(
+    _unslotted, (ContactInfo, Education, Experience, ParsedResume))
+
+
+def _plain(r: ParsedResume):
+    c = r.contact_info
+    return PlainResume(
+        contact_info=PlainContact(c.name, c.email, c.phone, c.address, c.linkedin, c.github, c.portfolio,
+                                  list(c.other_links)),
+        skills=list(r.skills),
+        education=[PlainEducation(e.degree, e.institution, e.year, e.gpa) for e in r.education],
+        experience=[PlainExperience(e.title, e.company, e.duration, e.description) for e in r.experience],
+        summary=r.summary, text=r.text)
+
+
+def _measure(build):
+    """(result, bytes allocated by ``build`` and still live)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def run(n: int, with_text: bool):
+    resumes = synthetic_resumes(n, with_text)
+    # Strings are rebuilt inside each measurement so every representation pays for its own copies
+    payload = [json.dumps(r.to_dict()) for r in resumes]
+
+    print(f"\n{n} resumes{' (with full text)' if with_text else ''}")
+    print(f"{'in memory':<24} {'bytes/resume':>13}")
+    for label, build in (
+        ("dicts", lambda: [json.loads(p) for p in payload]),
+        ("dataclasses", lambda: [_plain(ParsedResume.from_dict(json.loads(p))) for p in payload]),
+        ("slotted dataclasses", lambda: [ParsedResume.from_dict(json.loads(p)) for p in payload]),
+    ):
+        _, size = _measure(build)
+        print(f"{label:<24} {size / n:>13.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "resumes.jsonl")
+        table_path = os.path.join(tmp, "resumes.rsm")
+
+        start = time.perf_counter()
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for r in resumes:
+                f.write(json.dumps(r.to_dict(), ensure_ascii=False) + '\n')
+        jsonl_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        write_resumes(table_path, resumes)
+        table_write = time.perf_counter() - start
+
+        table = ResumeTable.open(table_path)
+        print(f"{'ResumeTable (mmap)':<24} {table.nbytes / n:>13.0f}")
+
+        start = time.perf_counter()
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            from_jsonl = [ParsedResume.from_dict(json.loads(line)) for line in f]
+        jsonl_read = time.perf_counter() - start
+
+        start = time.perf_counter()
+        from_table = read_resumes(table_path)
+        table_read = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summaries = ResumeTable.open(table_path).column('summary')
+        column_read = time.perf_counter() - start
+        assert from_table == from_jsonl == resumes and len(summaries) == n
+
+        print(f"{'on disk':<24} {'MB':>13} {'write/s':>10} {'load/s':>10}")
+        print(f"{'JSON Lines':<24} {os.path.getsize(jsonl_path) / 2**20:>13.1f} "
+              f"{n / jsonl_write:>10.0f} {n / jsonl_read:>10.0f}")
+        print(f"{'columnar':<24} {os.path.getsize(table_path) / 2**20:>13.1f} "
+              f"{n / table_write:>10.0f} {n / table_read:>10.0f}")
+        print(f"{'columnar, one column':<24} {'':>13} {'':>10} {n / column_read:>10.0f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--with-text", action="store_true", help="include the full resume text in each record")
+    args = ap.parse_args()
+    for n in args.sizes:
+        run(n, args.with_text)
+
+
+if __name__ == "__main__":
+    main()
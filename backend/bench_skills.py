@@ -0,0 +1,84 @@
+"""
+Skill extraction benchmark: single-pass SkillMatcher vs the old
+``skill in text_lower`` loop over every keyword.
+
+Shows that SkillMatcher cost grows linearly with text length (flat
+microseconds per 1k characters) and barely moves with taxonomy size, while
+the keyword loop scales with skills x text.
+
+Usage:
+    python bench_skills.py
+    python bench_skills.py --taxonomy-sizes 60 20000 --lengths 2000 32000 256000
+"""
+import argparse
+import random
+import string
+import time
+
+from resume_parser import ResumeParser
+from skill_matcher import SKILL_ALIASES, SkillMatcher
+
+
+def synthetic_taxonomy(size: int, seed: int = 0):
+    """The parser's real keywords padded with random multi-word skill names."""
+    rng = random.Random(seed)
+    skills = list(ResumeParser().skill_keywords)
+    while len(skills) < size:
+        words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        skills.append(' '.join(words))
+    return skills[:size]
+
+
+def synthetic_text(length: int, taxonomy, seed: int = 1) -> str:
+    """Resume-like filler with a skill mention roughly every 15 words."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < length:
+        if rng.random() < 0.07:
+            word = rng.choice(taxonomy)
+        else:
+            word = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        parts.append(word)
+        total += len(word) + 1
+    return ' '.join(parts)[:length]
+
+
+def legacy_extract(skills, text):
+    text_lower = text.lower()
+    return [s for s in skills if s.lower() in text_lower]
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--taxonomy-sizes", type=int, nargs="+", default=[60, 2000, 20000])
+    ap.add_argument("--lengths", type=int, nargs="+", default=[2000, 8000, 32000, 128000])
+    args = ap.parse_args()
+
+    print(f"{'skills':>7} {'chars':>8} {'compile ms':>11} {'matcher ms':>11} {'us/1k chars':>12} {'legacy ms':>10}")
+    for size in args.taxonomy_sizes:
+        taxonomy = synthetic_taxonomy(size)
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy, SKILL_ALIASES)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        for length in args.lengths:
+            text = synthetic_text(length, taxonomy)
+            t_new = best_of(lambda: matcher.extract(text))
+            t_old = best_of(lambda: legacy_extract(taxonomy, text), repeat=1 if size > 2000 else 3)
+            print(f"{size:>7} {length:>8} {compile_ms:>11.1f} {t_new * 1000:>11.3f} "
+                  f"{t_new * 1e6 / (length / 1000):>12.1f} {t_old * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
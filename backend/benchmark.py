@@ -0,0 +1,339 @@
+"""
+Reproducible benchmark suite for the resume parser and the job matcher.
+
+Everything is generated from a fixed seed:
+
+- resume PDFs rendered with PyMuPDF at several page counts, with a
+  configurable number of links and either a single-column or a sidebar
+  layout (skills and education in a narrow left column);
+- job catalogues of configurable size, with random clustered embeddings
+  (as in bench_retrieval.py) so matching is measured without the model.
+
+Measured:
+
+- parse: documents/s, p50/p95 per document, mean cost of every parser stage
+  (from the metrics.py stage timers) and peak Python heap (tracemalloc)
+- encode: single-summary latency and batched throughput with the real model
+  (skipped when sentence-transformers is not installed, or with --no-encode)
+- match: backend/skill-matrix build time, p50/p95/mean ``match_jobs``
+  latency and peak Python heap, per catalogue size
+
+Results are written as JSON (``-o``). ``--compare old.json`` prints the
+change for every shared metric and exits with status 1 when any of them is
+worse by more than ``--threshold``, so it can gate a CI job.
+
+Usage:
+    python benchmark.py -o bench.json
+    python benchmark.py --pages 1 3 --jobs 1000 100000 -o new.json --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import fitz
+import numpy as np
+
+import metrics
+from bench_parser import SECTION_TITLES, SKILLS, synthetic_resume_text
+from bench_retrieval import synthetic_catalogue, synthetic_queries
+from job_index import JobIndex, content_hash
+from matcher import Catalogue, match_jobs
+from resume_parser import ResumeParser
+
+HEADER_LINES = {title for titles in SECTION_TITLES.values() for title in titles}
+SIDEBAR_SECTIONS = {title for key in ('skills', 'education') for title in SECTION_TITLES[key]}
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 40
+LINE_HEIGHT = 13
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+JOB_SKILLS = SKILLS + ['Machine Learning', 'TensorFlow', 'Linux', 'C++', 'Spark', 'Terraform', 'Excel', 'Tableau']
+ROLES = ['Data Scientist', 'Backend Engineer', 'DevOps Engineer', 'Frontend Developer', 'Data Analyst',
+         'ML Engineer', 'System Administrator', 'Product Analyst']
+HIGHER_IS_BETTER = ('_per_s',)
+
+
+def _wrap(line: str, width: float, fontsize: float):
+    words, current = line.split(), ''
+    for word in words:
+        candidate = f"{current} {word}".strip()
+        if current and fitz.get_text_length(candidate, fontsize=fontsize) > width:
+            yield current
+            current = word
+        else:
+            current = candidate
+    if current:
+        yield current
+
+
+class _Column:
+    """Writes wrapped lines top to bottom, moving on to the next page when one fills up."""
+
+    def __init__(self, doc, x0: float, x1: float):
+        self.doc, self.x0, self.width = doc, x0, x1 - x0
+        self.page_number = 0
+        self.y = MARGIN
+        if len(doc) == 0:
+            doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+
+    def write(self, line: str, fontsize: float = 10, uri: str = None):
+        for part in _wrap(line, self.width, fontsize):
+            if self.y + LINE_HEIGHT > PAGE_HEIGHT - MARGIN:
+                self.page_number += 1
+                self.y = MARGIN
+                if self.page_number == len(self.doc):
+                    self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            page = self.doc[self.page_number]
+            self.y += LINE_HEIGHT if fontsize <= 10 else LINE_HEIGHT + 4
+            page.insert_text((self.x0, self.y), part, fontsize=fontsize)
+            if uri:
+                rect = fitz.Rect(self.x0, self.y - fontsize, self.x0 + fitz.get_text_length(part, fontsize=fontsize),
+                                 self.y + 2)
+                page.insert_link({'kind': fitz.LINK_URI, 'from': rect, 'uri': uri})
+
+
+def synthetic_resume_pdf(rng: random.Random, pages: int, links: int, layout: str) -> bytes:
+    """A resume of roughly ``pages`` pages with ``links`` URI links, as PDF bytes."""
+    # About LINES_PER_PAGE lines per page, ~22 of them fixed (contact, summary, skills,
+    # education), the rest experience and project entries of 6 lines each
+    n_items = max(2, (LINES_PER_PAGE * pages - 30) // 6)
+    n_jobs = (n_items * 3 + 4) // 5
+    text = synthetic_resume_text(rng, n_jobs=n_jobs, n_projects=n_items - n_jobs, bullets_per_item=3)
+    lines = text.splitlines()
+    doc = fitz.open()
+    sidebar = None
+    if layout == 'sidebar':
+        sidebar = _Column(doc, MARGIN, 190)
+        main = _Column(doc, 205, PAGE_WIDTH - MARGIN)
+    else:
+        main = _Column(doc, MARGIN, PAGE_WIDTH - MARGIN)
+
+    # Contact lines carry the first links; the rest go on project lines
+    link_targets = {1: f"mailto:{lines[1].split()[0]}", 2: "https://" + lines[2]}
+    project_lines = [i for i, line in enumerate(lines) if line.startswith('Project ')]
+    for n, i in enumerate(project_lines[:max(0, links - 2)]):
+        link_targets[i] = f"https://github.com/example/project-{n}"
+
+    column = main
+    for i, line in enumerate(lines):
+        if line in HEADER_LINES:
+            column = sidebar if sidebar is not None and line in SIDEBAR_SECTIONS else main
+            column.write(line, fontsize=13)
+        else:
+            column.write(line, uri=link_targets.get(i) if i < 3 or links > 2 else None)
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def synthetic_jobs(rng: random.Random, n_jobs: int):
+    jobs = []
+    for i in range(n_jobs):
+        role = rng.choice(ROLES)
+        skills = rng.sample(JOB_SKILLS, rng.randint(3, 7))
+        jobs.append({
+            'id': f"job-{i}",
+            'title': f"{role} #{i}",
+            'description': f"We are seeking a {role} proficient in {', '.join(skills)}.",
+            'required_skills': skills,
+        })
+    return jobs
+
+
+def _ms_summary(latencies_s):
+    ms = sorted(x * 1000 for x in latencies_s)
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+    }
+
+
+def _peak_mb(fn) -> float:
+    """Peak Python heap allocated while running ``fn`` (C allocations, e.g. MuPDF's, are not seen)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_parse(args, rng: random.Random):
+    parser = ResumeParser()
+    results = {}
+    for pages in args.pages:
+        for layout in args.layouts:
+            corpus = [synthetic_resume_pdf(rng, pages, args.links, layout) for _ in range(args.resumes)]
+            actual_pages = statistics.fmean(len(fitz.open(stream=pdf, filetype='pdf')) for pdf in corpus)
+            prefix = f"parse.pages={pages}.layout={layout}"
+
+            latencies, stage_totals = [], {}
+            with contextlib.redirect_stdout(io.StringIO()):
+                parser.parse_resume(corpus[0])  # warm-up
+                start = time.perf_counter()
+                for pdf in corpus:
+                    with metrics.collect_trace() as trace:
+                        t0 = time.perf_counter()
+                        parser.parse_resume(pdf)
+                        latencies.append(time.perf_counter() - t0)
+                    for event in trace:
+                        stage_totals[event['stage']] = stage_totals.get(event['stage'], 0.0) + event['duration_ms']
+                elapsed = time.perf_counter() - start
+                peak = _peak_mb(lambda: [parser.parse_resume(pdf) for pdf in corpus[:10]])
+
+            results[f"{prefix}.pages_actual"] = round(actual_pages, 2)
+            results[f"{prefix}.docs_per_s"] = round(len(corpus) / elapsed, 2)
+            for key, value in _ms_summary(latencies).items():
+                results[f"{prefix}.{key}"] = value
+            for name, total in sorted(stage_totals.items()):
+                results[f"{prefix}.stage.{name}_us"] = round(total * 1000 / len(corpus), 2)
+            results[f"{prefix}.peak_heap_mb"] = peak
+            print(f"{prefix}: {results[f'{prefix}.docs_per_s']} docs/s, "
+                  f"p50 {results[f'{prefix}.p50_ms']} ms ({actual_pages:.1f} pages)")
+    return results
+
+
+def bench_encode(args, rng: random.Random):
+    try:
+        from encoder import get_model
+        model = get_model()
+    except ImportError as e:
+        print(f"encode: skipped ({e})")
+        return {}
+
+    summaries = [synthetic_resume_text(rng).splitlines()[4] for _ in range(max(64, args.queries))]
+    model.encode(summaries[:8], convert_to_numpy=True, normalize_embeddings=True)  # warm-up
+
+    latencies = []
+    for text in summaries[:args.queries]:
+        start = time.perf_counter()
+        model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.encode(summaries, batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+    batched = len(summaries) / (time.perf_counter() - start)
+
+    results = {f"encode.single.{k}": v for k, v in _ms_summary(latencies).items()}
+    results["encode.batch32.texts_per_s"] = round(batched, 2)
+    print(f"encode: single p50 {results['encode.single.p50_ms']} ms, batched {batched:.0f} texts/s")
+    return results
+
+
+def bench_match(args, rng: random.Random):
+    results = {}
+    for n_jobs in args.jobs:
+        prefix = f"match.jobs={n_jobs}"
+        jobs = synthetic_jobs(rng, n_jobs)
+        embeddings = synthetic_catalogue(n_jobs, args.dim, n_families=max(10, n_jobs // 500))
+        manifest = {'model': 'synthetic', 'dim': args.dim, 'count': n_jobs,
+                    'hashes': [content_hash(job['description']) for job in jobs]}
+        queries = synthetic_queries(embeddings, args.queries)
+        resumes = [{'summary': 'synthetic', 'skills': rng.sample(JOB_SKILLS, 6)} for _ in range(args.queries)]
+
+        def build():
+            catalogue = Catalogue(JobIndex(jobs, embeddings, manifest), revision=0)
+            catalogue.backend, catalogue.skill_matrix
+            return catalogue
+
+        start = time.perf_counter()
+        catalogue = build()
+        results[f"{prefix}.build_s"] = round(time.perf_counter() - start, 4)
+
+        latencies = []
+        for resume, query in zip(resumes, queries):
+            start = time.perf_counter()
+            match_jobs(resume, top_n=args.top_n, resume_embedding=query, catalogue=catalogue)
+            latencies.append(time.perf_counter() - start)
+        for key, value in _ms_summary(latencies).items():
+            results[f"{prefix}.{key}"] = value
+        results[f"{prefix}.peak_heap_mb"] = _peak_mb(lambda: [
+            match_jobs(r, top_n=args.top_n, resume_embedding=q, catalogue=build())
+            for r, q in zip(resumes[:5], queries[:5])
+        ])
+        print(f"{prefix}: build {results[f'{prefix}.build_s']} s, p50 {results[f'{prefix}.p50_ms']} ms")
+    return results
+
+
+def environment():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                  text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+    return {
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pymupdf': fitz.VersionBind,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline, threshold: float) -> bool:
+    """Print per-metric changes against ``baseline``; False if any metric regressed past ``threshold``."""
+    ok = True
+    print(f"\n{'metric':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(results) & set(baseline)):
+        old, new = baseline[name], results[name]
+        if not old or name.endswith(('pages_actual',)):
+            continue
+        change = (new - old) / old
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        flag = ''
+        if worse > threshold:
+            flag, ok = '  REGRESSION', False
+        print(f"{name:<60} {old:>12g} {new:>12g} {change:>+8.1%}{flag}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5], help="target resume lengths")
+    ap.add_argument("--layouts", nargs="+", default=["single", "sidebar"], choices=["single", "sidebar"])
+    ap.add_argument("--links", type=int, default=6, help="URI links per resume")
+    ap.add_argument("--resumes", type=int, default=50, help="PDFs per (pages, layout) setting")
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="catalogue sizes")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-n", type=int, default=3)
+    ap.add_argument("--no-encode", action="store_true", help="skip the model encode benchmark")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-o", "--output", help="write results as JSON")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing --compare")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    results.update(bench_parse(args, rng))
+    if not args.no_encode:
+        results.update(bench_encode(args, rng))
+    results.update(bench_match(args, rng))
+    results["process.max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    report = {'environment': environment(), 'config': vars(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Token-bounded chunking of long resume text, and pooling of chunk embeddings.
+
+``all-MiniLM-L6-v2`` reads at most 256 word pieces (254 plus the special
+tokens) and silently truncates the rest, so the full text of a resume is cut
+into overlapping windows that each fit. Windows are measured with the model's
+own tokenizer when it is a fast (Rust) tokenizer that reports character
+offsets; otherwise word counts are used with a conservative pieces-per-word
+ratio.
+
+The chunks of one or many resumes are encoded together; ``length_sorted``
+orders any list of texts by length so each padded batch holds texts of
+similar length, and returns the permutation to restore the input order.
+
+Chunk embeddings are pooled into one resume vector with ``pool``:
+
+- ``mean``: the average chunk (scores equal the mean cosine over chunks)
+- ``max``: the element-wise maximum, re-normalised
+- ``topk``: the mean of the ``k`` chunks closest to the document's centroid,
+  which drops outliers such as contact blocks and reference lists
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_TOKENS = 254          # model limit (256) minus [CLS] and [SEP]
+OVERLAP_TOKENS = 32       # context shared by consecutive windows
+PIECES_PER_WORD = 1.4     # fallback estimate when no offset-reporting tokenizer is available
+POOLING = ('mean', 'max', 'topk')
+
+
+def _windows(n: int, size: int, overlap: int):
+    step = max(1, size - overlap)
+    start = 0
+    while True:
+        yield start, min(n, start + size)
+        if start + size >= n:
+            return
+        start += step
+
+
+def chunk_text(text: str, tokenizer=None, max_tokens: int = MAX_TOKENS,
+               overlap: int = OVERLAP_TOKENS) -> List[str]:
+    """Split ``text`` into windows of at most ``max_tokens`` tokens overlapping by ``overlap``."""
+    text = ' '.join(text.split())
+    if not text:
+        return []
+
+    if tokenizer is not None and getattr(tokenizer, 'is_fast', False):
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                            truncation=False)['offset_mapping']
+        if not offsets:
+            return []
+        return [text[offsets[start][0]:offsets[end - 1][1]]
+                for start, end in _windows(len(offsets), max_tokens, overlap)]
+
+    words = text.split(' ')
+    words_per_chunk = max(1, int(max_tokens / PIECES_PER_WORD))
+    word_overlap = int(overlap / PIECES_PER_WORD)
+    return [' '.join(words[start:end]) for start, end in _windows(len(words), words_per_chunk, word_overlap)]
+
+
+def length_sorted(texts: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """Texts ordered longest first, and the indices that restore the input order."""
+    order = np.argsort([-len(t) for t in texts], kind='stable')
+    return [texts[i] for i in order], np.argsort(order)
+
+
+def encode_sorted(texts: Sequence[str], encode_fn) -> np.ndarray:
+    """Encode ``texts`` in one ``encode_fn`` call, sorted by length to minimise padding."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    sorted_texts, restore = length_sorted(texts)
+    return np.asarray(encode_fn(sorted_texts))[restore]
+
+
+def pool(embeddings: np.ndarray, method: str = 'mean', k: int = 3) -> Optional[np.ndarray]:
+    """Pool normalised chunk embeddings (chunks x dim) into one vector."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.shape[0] == 0:
+        return None
+    if method == 'mean':
+        return embeddings.mean(axis=0)
+    if method == 'max':
+        pooled = embeddings.max(axis=0)
+        return pooled / (np.linalg.norm(pooled) or 1.0)
+    if method == 'topk':
+        if embeddings.shape[0] <= k:
+            return embeddings.mean(axis=0)
+        closest = np.argpartition(embeddings @ embeddings.mean(axis=0), -k)[-k:]
+        return embeddings[closest].mean(axis=0)
+    raise ValueError(f"Unknown pooling '{method}'. Choose from: {', '.join(POOLING)}")
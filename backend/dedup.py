@@ -0,0 +1,185 @@
+"""
+Near-duplicate detection for job postings.
+
+Catalogues are full of templated postings: "Cloud Engineer #2" and
+"Cloud Engineer #39" differ only in the order their skills are listed. Each
+posting becomes a set of shingles (word ``shingle``-grams of its description
+plus its normalised required skills), summarised by a MinHash signature whose
+agreement rate estimates the Jaccard similarity of two sets. LSH banding
+splits every signature into ``bands`` bands; postings that share a band are
+candidates, and each is only compared with the first posting of its bucket,
+so the work per band is linear in the number of postings. A candidate pair
+counts as a duplicate when its estimated Jaccard similarity reaches
+``threshold`` and both postings have the same role family, seniority,
+location (job_filters.py) and set of normalised required skills. Every
+member of a cluster therefore has the facets and skills of its
+representative, so filters, skill coverage and missing skills computed on
+the representative hold for every member; only the wording differs.
+Duplicates are grouped with an array-based union-find.
+
+The first posting of each cluster is its representative. With
+MATCH_DEDUP_THRESHOLD set (off by default) only representatives are embedded
+and searched (see matcher._build_catalogue), and each match lists the other
+members of its cluster as ``duplicates``.
+
+Usage (list the clusters of the job store):
+    python dedup.py --threshold 0.7
+"""
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from job_filters import metadata_facets
+from skill_matrix import normalize_skill
+
+NUM_PERM = 128
+BANDS = 32  # 4 rows per band: pairs from ~0.4 Jaccard up become candidates
+DEFAULT_SHINGLE = 1  # templated descriptions mostly differ in word order
+SIGNATURE_BLOCK = 1 << 16  # shingles hashed per numpy block
+
+
+def shingles(job: Dict, size: int = DEFAULT_SHINGLE) -> List[str]:
+    """Word ``size``-grams of the description plus the required skills."""
+    words = re.findall(r"[a-z0-9+#.]+", job.get('description', '').lower())
+    grams = {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+    grams.update('skill:' + normalize_skill(s) for s in job.get('required_skills', []))
+    grams.discard('')
+    return list(grams)
+
+
+def minhash_signatures(shingle_sets: List[List[str]], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """(jobs x num_perm) MinHash signatures; an empty set gets an all-max signature."""
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: the top 32 bits of a * x + b (mod 2**64), with a odd
+    a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+    lengths = np.array([len(s) for s in shingle_sets], dtype=np.int64)
+    hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for s in shingle_sets for g in s),
+                         dtype=np.uint64, count=int(lengths.sum()))
+    owners = np.repeat(np.arange(len(shingle_sets)), lengths)
+
+    signatures = np.full((len(shingle_sets), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for start in range(0, len(hashes), SIGNATURE_BLOCK):
+        block = slice(start, start + SIGNATURE_BLOCK)
+        # Shingles repeat a lot across postings; each distinct one is hashed once per block.
+        # Rows are permutations here so each reduction runs over contiguous memory
+        distinct, inverse = np.unique(hashes[block], return_inverse=True)
+        permuted = ((a[:, None] * distinct + b[:, None]) >> np.uint64(32)).astype(np.uint32).take(inverse, axis=1)
+        # A job's shingles are contiguous: reduce each run, then merge runs split across blocks
+        block_owners = owners[block]
+        runs = np.flatnonzero(np.r_[True, block_owners[1:] != block_owners[:-1]])
+        run_owners = block_owners[runs]
+        signatures[run_owners] = np.minimum(signatures[run_owners], np.minimum.reduceat(permuted, runs, axis=1).T)
+    return signatures
+
+
+def _band_keys(signatures: np.ndarray, bands: int):
+    """One uint64 key per posting and band; equal band values give equal keys."""
+    rows = signatures.shape[1] // bands
+    mix = np.random.default_rng(0).integers(1, 1 << 62, rows, dtype=np.uint64) | np.uint64(1)
+    for band in range(bands):
+        yield (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * mix).sum(axis=1)
+
+
+def _merge(labels: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Union-find over a label array: every posting points at the smallest row of
+    its cluster. Links each pair (x, y), then re-points every posting at its root.
+    """
+    while len(x):
+        lx, ly = labels[x], labels[y]
+        split = lx != ly
+        if not split.any():
+            break
+        x, y, lx, ly = x[split], y[split], lx[split], ly[split]
+        np.minimum.at(labels, np.maximum(lx, ly), np.minimum(lx, ly))
+        while True:  # pointer jumping until every label is a root
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    return labels
+
+
+class JobClusters:
+    """Clusters of near-duplicate postings over rows of a job list."""
+
+    def __init__(self, jobs: List[Dict], roots: np.ndarray):
+        self.jobs = jobs
+        self.roots = roots
+        self.representatives = np.flatnonzero(roots == np.arange(len(roots)))
+        order = np.argsort(roots, kind='stable')
+        starts = np.searchsorted(roots[order], self.representatives)
+        self.members = {int(r): order[s:e].tolist()
+                        for r, s, e in zip(self.representatives, starts, np.append(starts[1:], len(order)))}
+
+    def __len__(self) -> int:
+        return len(self.representatives)
+
+    def duplicates(self) -> Dict[str, List[Dict]]:
+        """Representative id -> the other members of its cluster (id and title), for clusters of two or more."""
+        return {
+            self.jobs[rep].get('id'): [{'id': self.jobs[m].get('id'), 'title': self.jobs[m]['title']}
+                                       for m in members[1:]]
+            for rep, members in self.members.items() if len(members) > 1
+        }
+
+    def stats(self) -> Dict:
+        sizes = np.array([len(m) for m in self.members.values()])
+        return {
+            'jobs': len(self.jobs),
+            'clusters': len(self),
+            'duplicates': len(self.jobs) - len(self),
+            'largest_cluster': int(sizes.max()) if len(sizes) else 0,
+        }
+
+
+def _duplicate_key(job: Dict) -> Tuple:
+    """What two postings must share to be duplicates: metadata facets and the normalised skill set."""
+    skills = tuple(sorted({normalize_skill(s) for s in job.get('required_skills', [])}))
+    return (*metadata_facets(job), skills)
+
+
+def find_duplicates(jobs: List[Dict], threshold: float = 0.7, shingle: int = DEFAULT_SHINGLE,
+                    num_perm: int = NUM_PERM, bands: int = BANDS,
+                    signatures: Optional[np.ndarray] = None) -> JobClusters:
+    """Cluster near-duplicate postings (see the module docstring)."""
+    if signatures is None:
+        signatures = minhash_signatures([shingles(job, shingle) for job in jobs], num_perm)
+    facet_ids: Dict[Tuple, int] = {}
+    facets = np.array([facet_ids.setdefault(_duplicate_key(job), len(facet_ids)) for job in jobs], dtype=np.int64)
+
+    # Band by band, only candidates not already in one cluster are verified
+    ids = np.arange(len(jobs))
+    roots = ids.copy()
+    for keys in _band_keys(signatures, bands):
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        heads = first[inverse]  # each posting is compared with the first posting of its bucket
+        candidate = roots[heads] != roots
+        x, y = heads[candidate], ids[candidate]
+        similar = (signatures[x] == signatures[y]).mean(axis=1) >= threshold
+        similar &= facets[x] == facets[y]
+        roots = _merge(roots, x[similar], y[similar])
+    return JobClusters(jobs, roots)
+
+
+def main():
+    import argparse
+    from matcher import load_jobs
+    ap = argparse.ArgumentParser(description="List clusters of near-duplicate postings in the job store.")
+    ap.add_argument("--threshold", type=float, default=0.7)
+    ap.add_argument("--shingle", type=int, default=DEFAULT_SHINGLE)
+    args = ap.parse_args()
+
+    jobs = load_jobs()
+    clusters = find_duplicates(jobs, args.threshold, args.shingle)
+    for rep, members in clusters.members.items():
+        if len(members) > 1:
+            print(f"{jobs[rep]['title']}: " + ', '.join(jobs[m]['title'] for m in members[1:]))
+    print(clusters.stats())
+
+
+if __name__ == "__main__":
+    main()
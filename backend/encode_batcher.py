@@ -0,0 +1,136 @@
+"""
+Micro-batching for the sentence encoder.
+
+Concurrent requests each need one short text encoded. Encoding them one at a
+time makes every request pay the model's per-call overhead and contend for
+the CPU; encoding them together costs little more than encoding one. The
+``MicroBatcher`` collects texts from any number of threads into a queue, and
+a single worker thread drains it:
+
+- it waits for the first text, then keeps collecting until either
+  ``max_batch_size`` texts are queued or ``max_wait_ms`` has passed;
+- the batch is encoded with one ``encode`` call and each caller's future is
+  resolved with its own row.
+
+The queue is bounded by ``max_queue``; when it is full ``submit`` raises
+``EncoderOverloaded`` straight away instead of letting latency grow without
+limit, so the web app can answer 503 and the client can retry.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+
+class EncoderOverloaded(Exception):
+    """The encode queue is full."""
+
+
+class MicroBatcher:
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, max_queue: int = 256):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._stopping = False
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        self._worker = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue ``text`` for encoding; the future resolves to its embedding."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        try:
+            self._queue.put_nowait((text, future))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise EncoderOverloaded(f"Encoder queue is full ({self._queue.maxsize} pending)")
+        return future
+
+    def encode(self, text: str, timeout: float = None) -> np.ndarray:
+        """Blocking helper for synchronous handlers."""
+        return self.submit(text).result(timeout)
+
+    def encode_many(self, texts: List[str], timeout: float = None) -> np.ndarray:
+        """
+        Encode several texts of one caller; they are queued together, so they
+        usually share a batch. If the queue fills part-way, the texts already
+        queued are cancelled (the worker skips them) before EncoderOverloaded
+        is raised.
+        """
+        futures = []
+        try:
+            for text in texts:
+                futures.append(self.submit(text))
+        except EncoderOverloaded:
+            for future in futures:
+                future.cancel()
+            raise
+        return np.stack([future.result(timeout) for future in futures])
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self._batches,
+                'items': self._items,
+                'mean_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'rejected': self._rejected,
+                'queued': self._queue.qsize(),
+            }
+
+    def close(self):
+        """Stop accepting work; texts already queued are still encoded."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def _collect(self):
+        first = None if self._stopping else self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopping = True  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # Callers that gave up (cancelled futures) are dropped from the batch
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                embeddings = self.encode_fn([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
@@ -0,0 +1,99 @@
+"""
+Lifecycle of the sentence-transformer model.
+
+Nothing heavy happens at import time: torch and sentence_transformers are
+only imported when the model is first needed, so the resume parser and the
+CLI tools can run without them. The web app calls ``start_background_load``
+at boot to load and warm up the model off the main thread, and reports
+readiness through ``is_ready``.
+
+The inference engine is chosen with environment variables (see
+encoder_backends.py):
+
+- ENCODER_BACKEND: "torch" (default), "torchscript" or "onnx"
+- ENCODER_QUANTIZE: "int8" for dynamic int8 quantisation; about 1.5x the
+  throughput, but it has not met bench_encoder.py's 0.97 recall@10 target
+  for every backend (torch 0.967, torchscript 0.962, onnx 0.985 when last
+  measured), so fp32 stays the default until it passes on the real checkpoint
+- ENCODER_THREADS: intra-op threads (0 leaves the library default)
+- ENCODER_MODEL_DIR: local copy of the model; nothing is downloaded when set
+"""
+import os
+import threading
+import time
+import traceback
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+ENCODER_BACKEND = os.environ.get("ENCODER_BACKEND", "torch")
+ENCODER_QUANTIZE = os.environ.get("ENCODER_QUANTIZE", "")
+ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", 0))
+ENCODER_MODEL_DIR = os.environ.get("ENCODER_MODEL_DIR") or None
+# Identifies the embeddings in index manifests. The fp32 graph backends match
+# PyTorch to float precision (bench_encoder.py); int8 embeddings do not.
+MODEL_VERSION = MODEL_NAME + (f":{ENCODER_QUANTIZE}" if ENCODER_QUANTIZE else "")
+WARM_UP_SENTENCES = [
+    "Warm-up sentence for the resume matcher.",
+    "Experienced data scientist skilled in Python, SQL and machine learning.",
+]
+
+_model = None
+_model_lock = threading.Lock()
+_ready = threading.Event()
+_load_error = None
+_loader_thread = None
+
+
+def get_model():
+    """Return the shared encoder (a SentenceTransformer or compatible), loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                start = time.perf_counter()
+                from encoder_backends import load_encoder
+                _model = load_encoder(ENCODER_BACKEND, MODEL_NAME, ENCODER_MODEL_DIR,
+                                      ENCODER_QUANTIZE, ENCODER_THREADS)
+                engine = ENCODER_BACKEND + (f", {ENCODER_QUANTIZE}" if ENCODER_QUANTIZE else "")
+                print(f"Loaded {MODEL_NAME} ({engine}) in {time.perf_counter() - start:.1f}s")
+    return _model
+
+
+def warm_up(model=None):
+    """Run a small encode so the first real request doesn't pay for lazy init."""
+    model = model or get_model()
+    start = time.perf_counter()
+    model.encode(WARM_UP_SENTENCES, convert_to_numpy=True, normalize_embeddings=True)
+    print(f"Model warm-up took {time.perf_counter() - start:.2f}s")
+
+
+def start_background_load(on_loaded=None):
+    """
+    Load and warm up the model in a daemon thread. ``on_loaded`` (e.g. building
+    the job index) runs in the same thread before the service is marked ready.
+    """
+    global _loader_thread
+
+    def load():
+        global _load_error
+        try:
+            warm_up(get_model())
+            if on_loaded is not None:
+                on_loaded()
+            _ready.set()
+        except Exception as e:
+            _load_error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+
+    if _loader_thread is None:
+        _loader_thread = threading.Thread(target=load, name="model-loader", daemon=True)
+        _loader_thread.start()
+    return _loader_thread
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def load_error():
+    """Why background loading failed, or None."""
+    return _load_error
@@ -0,0 +1,272 @@
+"""
+Inference engines for the sentence encoder, selected by ``encoder.py``.
+
+- ``torch``: the SentenceTransformer itself (eager PyTorch)
+- ``torchscript``: the transformer traced and frozen with TorchScript
+- ``onnx``: the transformer exported to ONNX and run by onnxruntime
+
+Each can use dynamic int8 quantisation of the linear layers (weights stored
+as int8, activations quantised on the fly), which is where almost all of a
+MiniLM forward pass goes on CPU.
+
+The graph backends load everything from a local model directory (a
+``SentenceTransformer.save`` copy) and never touch the network. The
+exported graph is kept in that directory, under ``onnx/`` or
+``torchscript/``, and exporting it is the only step that needs torch. They
+run the same pipeline as the model's modules: tokenise, run the
+transformer, mean-pool over the attention mask, then L2-normalise.
+``bench_encoder.py`` checks their embeddings against the PyTorch path.
+
+One-off preparation (the only step that downloads anything):
+    python encoder_backends.py models/all-MiniLM-L6-v2 --export onnx --quantize int8
+"""
+import json
+import os
+import time
+from typing import List, Optional, Union
+
+import numpy as np
+
+BACKENDS = ('torch', 'torchscript', 'onnx')
+QUANTIZATIONS = ('', 'int8')
+
+
+def _use_offline_hub():
+    """Make transformers / huggingface_hub fail instead of downloading."""
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+
+def _read_json(path: str) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_local_model(model_name: str, model_dir: str) -> str:
+    """Download ``model_name`` into ``model_dir`` unless a copy is already there."""
+    if not os.path.exists(os.path.join(model_dir, 'modules.json')):
+        from sentence_transformers import SentenceTransformer
+        SentenceTransformer(model_name).save(model_dir)
+        print(f"Saved {model_name} to {model_dir}")
+    return model_dir
+
+
+def graph_path(model_dir: str, backend: str, quantize: str = '') -> str:
+    suffix = '_int8' if quantize == 'int8' else ''
+    extension = 'onnx' if backend == 'onnx' else 'pt'
+    return os.path.join(model_dir, backend, f"model{suffix}.{extension}")
+
+
+def set_torch_threads(threads: int):
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def _quantize_torch(module):
+    import torch
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _example_inputs(model_dir: str):
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    features = tokenizer(["An example sentence to trace the encoder with."], return_tensors='pt')
+    return tuple(features[name] for name in ('input_ids', 'attention_mask', 'token_type_ids'))
+
+
+def export_onnx(model_dir: str, quantize: str = '') -> str:
+    import torch
+    from transformers import AutoModel
+
+    path = graph_path(model_dir, 'onnx')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        model = AutoModel.from_pretrained(model_dir).eval()
+        names = ['input_ids', 'attention_mask', 'token_type_ids']
+        with torch.no_grad():
+            torch.onnx.export(
+                model, _example_inputs(model_dir), path,
+                input_names=names, output_names=['last_hidden_state'],
+                dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in names + ['last_hidden_state']},
+                opset_version=14, do_constant_folding=True,
+                dynamo=False,  # the TorchScript exporter; newer torch defaults to dynamo (needs onnxscript)
+            )
+        print(f"Exported ONNX graph to {path}")
+    if quantize != 'int8':
+        return path
+
+    quantized_path = graph_path(model_dir, 'onnx', 'int8')
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+        print(f"Quantised ONNX graph to {quantized_path}")
+    return quantized_path
+
+
+def export_torchscript(model_dir: str, quantize: str = '') -> str:
+    import torch
+    from transformers import AutoModel
+
+    path = graph_path(model_dir, 'torchscript', quantize)
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    model = AutoModel.from_pretrained(model_dir, torchscript=True).eval()
+    if quantize == 'int8':
+        model = _quantize_torch(model)
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(input_ids=input_ids, attention_mask=attention_mask,
+                                    token_type_ids=token_type_ids)[0]
+
+    with torch.no_grad():
+        traced = torch.jit.trace(LastHiddenState(model).eval(), _example_inputs(model_dir), strict=False)
+        traced = torch.jit.freeze(traced)
+    torch.jit.save(traced, path)
+    print(f"Exported TorchScript graph to {path}")
+    return path
+
+
+class GraphEncoder:
+    """
+    ``SentenceTransformer.encode`` over an exported transformer graph.
+    Subclasses only run the graph (``_forward``: features -> token embeddings).
+    """
+
+    def __init__(self, model_dir: str):
+        from transformers import AutoTokenizer
+        self.model_dir = model_dir
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        modules = _read_json(os.path.join(model_dir, 'modules.json'))
+        for module in modules:
+            if module['type'].endswith('Pooling'):
+                pooling = _read_json(os.path.join(model_dir, module['path'], 'config.json'))
+                if not pooling.get('pooling_mode_mean_tokens'):
+                    raise ValueError(f"{model_dir}: only mean pooling is supported by the graph backends")
+        self._normalize = any(module['type'].endswith('Normalize') for module in modules)
+
+        config_path = os.path.join(model_dir, 'sentence_bert_config.json')
+        config = _read_json(config_path) if os.path.exists(config_path) else {}
+        self.max_seq_length = config.get('max_seq_length') or self.tokenizer.model_max_length
+        self._dim = _read_json(os.path.join(model_dir, 'config.json'))['hidden_size']
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def _forward(self, features) -> np.ndarray:
+        raise NotImplementedError
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        embeddings = np.zeros((len(sentences), self._dim), dtype=np.float32)
+        # Longest first, as SentenceTransformer does, so each batch pads to a similar length
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        for start in range(0, len(sentences), batch_size):
+            rows = order[start:start + batch_size]
+            features = self.tokenizer([sentences[i] for i in rows], padding=True, truncation=True,
+                                      max_length=self.max_seq_length, return_tensors='np')
+            tokens = self._forward(features)
+            mask = features['attention_mask'][..., None].astype(np.float32)
+            embeddings[rows] = (tokens * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if normalize_embeddings or self._normalize:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxEncoder(GraphEncoder):
+    def __init__(self, model_dir: str, path: str, threads: int = 0):
+        super().__init__(model_dir)
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("ENCODER_BACKEND=onnx needs onnxruntime (pip install onnxruntime)") from None
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self._inputs = {i.name for i in self._session.get_inputs()}
+
+    def _forward(self, features) -> np.ndarray:
+        feed = {name: np.asarray(value, dtype=np.int64) for name, value in features.items() if name in self._inputs}
+        return self._session.run(None, feed)[0]
+
+
+class TorchScriptEncoder(GraphEncoder):
+    def __init__(self, model_dir: str, path: str, threads: int = 0):
+        super().__init__(model_dir)
+        import torch
+        set_torch_threads(threads)
+        self._torch = torch
+        self._module = torch.jit.load(path, map_location='cpu')
+
+    def _forward(self, features) -> np.ndarray:
+        torch = self._torch
+        with torch.inference_mode():
+            inputs = [torch.from_numpy(np.asarray(features[name], dtype=np.int64))
+                      for name in ('input_ids', 'attention_mask', 'token_type_ids')]
+            return self._module(*inputs).numpy()
+
+
+def load_encoder(backend: str = 'torch', model_name: str = 'all-MiniLM-L6-v2', model_dir: Optional[str] = None,
+                 quantize: str = '', threads: int = 0):
+    """
+    An object with SentenceTransformer's ``encode`` for the chosen backend.
+    ``model_dir`` is a local copy of the model (required by the graph
+    backends); with it nothing is downloaded.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"Unknown encoder quantisation '{quantize}'. Use 'int8' or leave it empty")
+    if model_dir:
+        _use_offline_hub()
+
+    if backend == 'torch':
+        set_torch_threads(threads)
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_dir or model_name)
+        return _quantize_torch(model) if quantize == 'int8' else model
+
+    if not model_dir or not os.path.exists(os.path.join(model_dir, 'modules.json')):
+        raise ValueError(f"ENCODER_BACKEND={backend} needs a local model directory (ENCODER_MODEL_DIR); "
+                         f"create one with: python encoder_backends.py <dir> --export {backend}")
+    path = graph_path(model_dir, backend, quantize)
+    if not os.path.exists(path):
+        path = (export_onnx if backend == 'onnx' else export_torchscript)(model_dir, quantize)
+    if backend == 'onnx':
+        return OnnxEncoder(model_dir, path, threads)
+    return TorchScriptEncoder(model_dir, path, threads)
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Save the model locally and export its inference graphs.")
+    ap.add_argument("model_dir")
+    ap.add_argument("--model", default="all-MiniLM-L6-v2")
+    ap.add_argument("--export", choices=BACKENDS[1:], nargs="*", default=[])
+    ap.add_argument("--quantize", choices=QUANTIZATIONS, default='')
+    args = ap.parse_args()
+
+    save_local_model(args.model, args.model_dir)
+    _use_offline_hub()
+    for backend in args.export:
+        start = time.perf_counter()
+        (export_onnx if backend == 'onnx' else export_torchscript)(args.model_dir, args.quantize)
+        print(f"{backend}: ready in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Import-time budget report.
+
+Imports each module in a fresh interpreter with ``python -X importtime`` and
+reports the total import time, the slowest top-level imports, and whether
+torch was pulled in. Exits non-zero if a module exceeds its budget.
+
+Usage:
+    python import_report.py                       # resume_parser, matcher, app
+    python import_report.py resume_parser --budget-ms 300 --top 15
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+HEAVY_MODULES = ('torch', 'transformers', 'sentence_transformers')
+
+
+def import_profile(module: str):
+    """Return [(cumulative_us, depth, name)] for every module imported by ``module``."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            entries.append((cumulative, (len(indent) - 1) // 2, name))
+    return entries
+
+
+def direct_imports(entries, module: str):
+    """Entries imported directly by ``module`` (importtime lists children before their parent)."""
+    children = []
+    for entry in entries:
+        cumulative, depth, name = entry
+        if depth == 0:
+            if name == module:
+                return cumulative, children
+            children = []
+        elif depth == 1:
+            children.append(entry)
+    return 0, []
+
+
+def report(module: str, top: int, budget_ms: float) -> bool:
+    entries = import_profile(module)
+    total_us, children = direct_imports(entries, module)
+    total_ms = total_us / 1000
+    heavy = sorted({name.split('.')[0] for _, _, name in entries if name.split('.')[0] in HEAVY_MODULES})
+    within = budget_ms is None or total_ms <= budget_ms
+
+    status = '' if budget_ms is None else (' (within budget)' if within else f' (OVER {budget_ms:.0f} ms budget)')
+    print(f"\nimport {module}: {total_ms:.0f} ms{status}")
+    print(f"  heavy ML modules imported: {', '.join(heavy) if heavy else 'none'}")
+    for cumulative, _, name in sorted(children, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    return within
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("modules", nargs="*", default=["resume_parser", "matcher", "app"])
+    ap.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    ap.add_argument("--budget-ms", type=float, default=None, help="fail if any module takes longer")
+    args = ap.parse_args()
+
+    ok = True
+    for module in args.modules:
+        try:
+            ok &= report(module, args.top, args.budget_ms)
+        except RuntimeError as e:
+            print(e)
+            ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Inverted indexes over job metadata, for filtering before similarity scoring.
+
+Every filterable facet (role family, seniority, location, required skill)
+maps each normalised value to the sorted row ids of the jobs that have it,
+a posting list. A request's filters become a set of rows:
+
+- within a facet, values are alternatives: their posting lists are merged
+  (``seniority=junior&seniority=mid``)
+- ``skill`` is the exception: a job must require every listed skill
+- across facets, the sets are intersected, smallest list first
+
+Sorted int32 posting lists are used rather than one dense bitmap per value:
+their memory and intersection cost scale with the number of matching jobs,
+which for skills over a large catalogue is far below a catalogue-length
+bitmap per skill. Only the surviving rows are then scored (see
+matcher.match_jobs).
+
+Role family and seniority fall back to the job title when a posting does not
+set them: "Senior Data Scientist #3" is family "data scientist", seniority
+"senior"; titles without a level word count as "mid".
+"""
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from skill_matrix import normalize_skill
+
+FACETS = ('role_family', 'seniority', 'location', 'skill')
+
+SENIORITY_WORDS = {
+    'intern': 'intern', 'internship': 'intern', 'trainee': 'intern',
+    'junior': 'junior', 'jr': 'junior', 'graduate': 'junior', 'entry': 'junior',
+    'mid': 'mid', 'intermediate': 'mid',
+    'senior': 'senior', 'sr': 'senior',
+    'lead': 'lead', 'staff': 'lead', 'principal': 'lead',
+    'head': 'head', 'director': 'head', 'vp': 'head',
+}
+DEFAULT_SENIORITY = 'mid'
+
+
+def _normalize(value: str) -> str:
+    return ' '.join(value.lower().split())
+
+
+def _title_words(title: str) -> List[str]:
+    title = re.sub(r'#\s*\d+', ' ', title)  # catalogue numbering, e.g. "Data Analyst #12"
+    return re.findall(r"[a-z0-9+#.]+", title.lower())
+
+
+def _seniority(words: List[str]) -> str:
+    for word in words:
+        level = SENIORITY_WORDS.get(word.rstrip('.'))
+        if level:
+            return level
+    return DEFAULT_SENIORITY
+
+
+def _role_family(words: List[str]) -> str:
+    return ' '.join(w for w in words if w.rstrip('.') not in SENIORITY_WORDS and w != 'level')
+
+
+def infer_seniority(title: str) -> str:
+    return _seniority(_title_words(title))
+
+
+def infer_role_family(title: str) -> str:
+    return _role_family(_title_words(title))
+
+
+def metadata_facets(job: Dict) -> Tuple[str, str, str]:
+    """Normalised (role family, seniority, location) of one posting; location is '' when unset."""
+    role_family, seniority = job.get('role_family'), job.get('seniority')
+    if not role_family or not seniority:
+        words = _title_words(job['title'])
+        role_family = role_family or _role_family(words)
+        seniority = seniority or _seniority(words)
+    return _normalize(role_family), _normalize(seniority), _normalize(job.get('location') or '')
+
+
+def job_facets(job: Dict) -> Dict[str, List[str]]:
+    """Normalised facet values of one posting."""
+    role_family, seniority, location = metadata_facets(job)
+    return {
+        'role_family': [role_family],
+        'seniority': [seniority],
+        'location': [location] if location else [],
+        'skill': [normalize_skill(s) for s in job.get('required_skills', [])],
+    }
+
+
+def parse_filters(args: Mapping[str, Iterable[str]]) -> Dict[str, List[str]]:
+    """
+    Filters from request parameters: each facet name maps to its values,
+    repeated or comma-separated. Raises ValueError for unknown facets.
+    """
+    filters = {}
+    for facet, values in args.items():
+        if facet not in FACETS:
+            raise ValueError(f"Unknown filter '{facet}'. Choose from: {', '.join(FACETS)}")
+        parsed = [v.strip() for value in values for v in value.split(',') if v.strip()]
+        if parsed:
+            filters[facet] = parsed
+    return filters
+
+
+class JobFilterIndex:
+    def __init__(self, jobs: List[Dict]):
+        postings: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for row, job in enumerate(jobs):
+            for facet, values in job_facets(job).items():
+                for value in dict.fromkeys(values):
+                    postings[facet].setdefault(value, []).append(row)
+        # Rows are appended in order, so every list is already sorted
+        self.postings = {
+            facet: {value: np.array(rows, dtype=np.int32) for value, rows in values.items()}
+            for facet, values in postings.items()
+        }
+        self.n_jobs = len(jobs)
+
+    def values(self, facet: str) -> Dict[str, int]:
+        """Every value of a facet with its number of jobs (e.g. for filter menus)."""
+        return {value: len(rows) for value, rows in sorted(self.postings[facet].items())}
+
+    def _posting(self, facet: str, value: str) -> np.ndarray:
+        key = normalize_skill(value) if facet == 'skill' else _normalize(value)
+        return self.postings[facet].get(key, np.zeros(0, dtype=np.int32))
+
+    def select(self, filters: Optional[Dict[str, List[str]]]) -> Optional[np.ndarray]:
+        """Sorted rows matching every filter, or None when there are no filters (all rows)."""
+        if not filters:
+            return None
+        sets = []
+        for facet, values in filters.items():
+            lists = [self._posting(facet, value) for value in values]
+            if facet == 'skill':
+                sets.extend(lists)
+            elif len(lists) == 1:
+                sets.append(lists[0])
+            else:
+                sets.append(np.unique(np.concatenate(lists)))
+        sets.sort(key=len)
+        rows = sets[0]
+        for other in sets[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
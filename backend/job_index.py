@@ -0,0 +1,202 @@
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from quantization import DTYPES, QuantizedMatrix, quantize
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+# Compact copies derived from EMBEDDINGS_FILE, see quantization.py
+CODES_FILE = "embeddings.{dtype}.npy"
+SCALES_FILE = "scales.int8.npy"
+LOCK_FILE = ".lock"
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a job description, used to detect changed postings."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _read_manifest(index_dir: str) -> Optional[Dict]:
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: str, write):
+    """
+    Write a file via a uniquely named temporary sibling and rename, so readers
+    never see a partial file and concurrent writers never share a temp file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def _file_lock(index_dir: str):
+    """Exclusive lock across processes loading or rebuilding the same index."""
+    with open(os.path.join(index_dir, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class JobIndex:
+    """
+    Embeddings of every job description, computed once and kept on disk.
+
+    The matrix is stored as a normalised float32 ``.npy`` file and opened with
+    ``mmap_mode='r'``, so cosine similarity against a resume is a single
+    matrix-vector product and worker processes share the same pages.
+
+    With ``dtype='float16'`` or ``'int8'`` the index serves from a quantised
+    copy kept next to it (2 or ~1 bytes per component); the float32 file is
+    then only read when jobs change and the copy is rebuilt.
+    """
+
+    def __init__(self, jobs: List[Dict], embeddings: np.ndarray, manifest: Dict):
+        self.jobs = jobs
+        self.embeddings = embeddings
+        self.manifest = manifest
+
+        # Changes whenever the model or any job description changes
+        digest = hashlib.sha256(manifest['model'].encode('utf-8'))
+        for h in manifest['hashes']:
+            digest.update(h.encode('ascii'))
+        self.version = digest.hexdigest()[:16]
+
+    @property
+    def dim(self) -> int:
+        return self.manifest['dim']
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def scores(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of a normalised query vector against every job."""
+        return self.embeddings @ query_embedding.astype(np.float32, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes
+
+    @classmethod
+    def load_or_build(cls, jobs: List[Dict], model, model_name: str, index_dir: str = "job_index",
+                      dtype: str = "float32") -> "JobIndex":
+        """
+        Load the cached index from ``index_dir``, re-encoding only jobs whose
+        description hash is not already present. The cache is discarded when
+        the model name or embedding dimension changes.
+
+        Processes sharing ``index_dir`` (server workers, task workers) take
+        turns: the manifest is read under a file lock, so a process that
+        waited for another's rebuild loads the result instead of encoding again.
+        """
+        hashes = [content_hash(job['description']) for job in jobs]
+        os.makedirs(index_dir, exist_ok=True)
+        with _file_lock(index_dir):
+            return cls._load_or_build(jobs, hashes, model, model_name, index_dir, dtype)
+
+    @classmethod
+    def _load_or_build(cls, jobs: List[Dict], hashes: List[str], model, model_name: str, index_dir: str,
+                       dtype: str) -> "JobIndex":
+        manifest = _read_manifest(index_dir)
+        emb_path = os.path.join(index_dir, EMBEDDINGS_FILE)
+
+        cached = None
+        cached_rows = {}
+        if manifest and manifest.get('model') == model_name and os.path.exists(emb_path):
+            cached = np.load(emb_path, mmap_mode='r')
+            if cached.ndim == 2 and cached.shape == (len(manifest.get('hashes', [])), manifest.get('dim')):
+                for row, h in enumerate(manifest['hashes']):
+                    cached_rows.setdefault(h, row)
+            else:
+                cached = None
+
+        if cached is not None and manifest['hashes'] == hashes:
+            return cls(jobs, _open_embeddings(index_dir, dtype, cached), manifest)
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached_rows]
+        print(f"Job index: {len(jobs) - len(missing)} cached, {len(missing)} to encode")
+
+        new_embeddings = None
+        if missing:
+            new_embeddings = model.encode(
+                [jobs[i]['description'] for i in missing],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            ).astype(np.float32)
+            dim = new_embeddings.shape[1]
+        elif cached is not None:
+            dim = cached.shape[1]
+        else:
+            dim = model.get_sentence_embedding_dimension()
+
+        matrix = np.empty((len(jobs), dim), dtype=np.float32)
+        new_rows = {job_idx: k for k, job_idx in enumerate(missing)}
+        for i, h in enumerate(hashes):
+            if i in new_rows:
+                matrix[i] = new_embeddings[new_rows[i]]
+            else:
+                matrix[i] = cached[cached_rows[h]]
+
+        manifest = {
+            'model': model_name,
+            'dim': int(dim),
+            'count': len(jobs),
+            'hashes': hashes,
+        }
+        _write_atomic(emb_path, lambda f: np.save(f, matrix))
+        _write_atomic(
+            os.path.join(index_dir, MANIFEST_FILE),
+            lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')),
+        )
+
+        _remove_quantized(index_dir)
+        return cls(jobs, _open_embeddings(index_dir, dtype, np.load(emb_path, mmap_mode='r')), manifest)
+
+
+def _remove_quantized(index_dir: str):
+    """Drop compact copies of a float32 matrix that has just been rewritten."""
+    for name in [CODES_FILE.format(dtype=dtype) for dtype in DTYPES if dtype != "float32"] + [SCALES_FILE]:
+        path = os.path.join(index_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _open_embeddings(index_dir: str, dtype: str, float32_matrix: np.ndarray):
+    """Memory-map the matrix in the requested dtype, deriving the quantised copy on first use."""
+    if dtype == "float32":
+        return float32_matrix
+
+    codes_path = os.path.join(index_dir, CODES_FILE.format(dtype=dtype))
+    scales_path = os.path.join(index_dir, SCALES_FILE)
+    if not os.path.exists(codes_path) or (dtype == "int8" and not os.path.exists(scales_path)):
+        codes, scales = quantize(float32_matrix, dtype)
+        if scales is not None:
+            _write_atomic(scales_path, lambda f: np.save(f, scales))
+        _write_atomic(codes_path, lambda f: np.save(f, codes))
+
+    codes = np.load(codes_path, mmap_mode='r')
+    scales = np.load(scales_path, mmap_mode='r') if dtype == "int8" else None
+    return QuantizedMatrix(codes, scales)
@@ -0,0 +1,187 @@
+"""
+SQLite-backed job catalogue.
+
+Every posting has a stable ``id`` that survives edits of its other fields,
+so postings can be added, updated and deleted one at a time instead of
+rewriting a single JSON file. A ``revision`` counter in the ``meta`` table is
+bumped by every write; the matcher polls it (one indexed read) to know when
+its in-memory index is out of date, and ``JobIndex`` then re-encodes only the
+postings whose description changed.
+
+Postings may carry optional metadata (``location``, ``seniority``,
+``role_family``) that job_filters.py indexes for request filters; stores
+created before these columns existed are migrated on open.
+
+On first use an empty store is seeded from ``jobs_db.json`` when present.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+FIELDS = ('title', 'description', 'required_skills')
+METADATA_FIELDS = ('location', 'seniority', 'role_family')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    required_skills TEXT NOT NULL,
+    location TEXT,
+    seniority TEXT,
+    role_family TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+"""
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def validate_job(job: Dict, partial: bool = False) -> Dict:
+    """Check and normalise posting fields; raises ValueError on bad input."""
+    if not isinstance(job, dict):
+        raise ValueError("A job must be a JSON object")
+    unknown = set(job) - set(FIELDS) - set(METADATA_FIELDS) - {'id'}
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+    clean = {}
+    for field in ('title', 'description'):
+        if field in job:
+            if not isinstance(job[field], str) or not job[field].strip():
+                raise ValueError(f"'{field}' must be a non-empty string")
+            clean[field] = job[field].strip()
+        elif not partial:
+            raise ValueError(f"'{field}' is required")
+    if 'required_skills' in job:
+        skills = job['required_skills']
+        if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+            raise ValueError("'required_skills' must be a list of strings")
+        clean['required_skills'] = [s.strip() for s in skills if s.strip()]
+    elif not partial:
+        clean['required_skills'] = []
+    for field in METADATA_FIELDS:
+        if field in job:
+            if job[field] is not None and not isinstance(job[field], str):
+                raise ValueError(f"'{field}' must be a string or null")
+            clean[field] = (job[field] or '').strip() or None
+    return clean
+
+
+class JobStore:
+    def __init__(self, path: str = "jobs.db", seed_path: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        # Processes may open the store together: the column check and the seed
+        # run in one write transaction, so only the first of them does either
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for field in METADATA_FIELDS:
+                if field not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {field} TEXT")
+            if seed_path and os.path.exists(seed_path) and \
+                    conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0:
+                with open(seed_path, 'r') as f:
+                    self._insert(conn, json.load(f))
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while a write commits."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'required_skills': json.loads(row['required_skills']),
+            **{field: row[field] for field in METADATA_FIELDS},
+        }
+
+    @staticmethod
+    def _bump_revision(conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+
+    def revision(self) -> int:
+        return self._connection().execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def all(self) -> List[Dict]:
+        """Every posting, in insertion order."""
+        rows = self._connection().execute("SELECT * FROM jobs ORDER BY rowid").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def _insert(self, conn, jobs: List[Dict]) -> List[Dict]:
+        """Insert postings within the caller's transaction; an ``id`` is generated unless given."""
+        added = []
+        for job in jobs:
+            clean = validate_job(job)
+            clean['id'] = str(job.get('id') or new_job_id())
+            added.append(clean)
+        conn.executemany(
+            "INSERT INTO jobs (id, title, description, required_skills, location, seniority, role_family) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(j['id'], j['title'], j['description'], json.dumps(j['required_skills']),
+              *(j.get(field) for field in METADATA_FIELDS)) for j in added],
+        )
+        self._bump_revision(conn)
+        return [{'id': j['id'], **{f: j[f] for f in FIELDS}, **{f: j.get(f) for f in METADATA_FIELDS}}
+                for j in added]
+
+    def add_many(self, jobs: List[Dict]) -> List[Dict]:
+        """Insert postings in one transaction; an ``id`` is generated unless given."""
+        try:
+            with self._connection() as conn:
+                return self._insert(conn, jobs)
+        except sqlite3.IntegrityError:
+            raise ValueError("A job with one of these ids already exists")
+
+    def add(self, job: Dict) -> Dict:
+        return self.add_many([job])[0]
+
+    def update(self, job_id: str, changes: Dict) -> Optional[Dict]:
+        """Apply a partial update; returns the updated posting, or None if ``job_id`` is unknown."""
+        clean = validate_job(changes, partial=True)
+        if 'id' in changes and changes['id'] != job_id:
+            raise ValueError("A job's id cannot be changed")
+        with self._connection() as conn:
+            if not conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone():
+                return None
+            if clean:
+                if 'required_skills' in clean:
+                    clean['required_skills'] = json.dumps(clean['required_skills'])
+                assignments = ', '.join(f"{field} = ?" for field in clean)
+                conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*clean.values(), job_id))
+                self._bump_revision(conn)
+        return self.get(job_id)
+
+    def delete(self, job_id: str) -> bool:
+        with self._connection() as conn:
+            deleted = conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+            if deleted:
+                self._bump_revision(conn)
+        return deleted
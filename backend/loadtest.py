@@ -0,0 +1,152 @@
+"""
+Load-test harness for the matcher.
+
+HTTP mode posts a resume to a running server (``app.py`` or ``asgi.py``) from
+N concurrent clients and reports throughput and p50/p95/p99 latency for each
+concurrency level, plus the mean encode batch size the server's batcher
+reached at that level (from /encoder/stats). Every request gets a unique trailing PDF comment so the
+result cache does not short-circuit parsing and encoding (use --same-file to
+measure cached responses instead).
+
+    python loadtest.py --url http://127.0.0.1:5000/upload --concurrency 1,8,32
+
+In-process mode skips HTTP and compares encoding summaries one call per
+request against the micro-batcher, at the same concurrency levels:
+
+    python loadtest.py --in-process --concurrency 1,8,32,128
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_PDF = "Ranjeet_Singh_DataScientist.pdf"
+SAMPLE_SUMMARY = ("Data scientist with experience building machine learning models in Python, "
+                  "SQL pipelines and dashboards for business stakeholders.")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_level(call, concurrency: int, requests: int):
+    """Run ``requests`` calls from ``concurrency`` threads; returns (latencies, errors, wall time)."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            call(i)
+        except Exception as e:
+            with lock:
+                errors.append(type(e).__name__ if not isinstance(e, urllib.error.HTTPError) else str(e.code))
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return sorted(latencies), errors, time.perf_counter() - start
+
+
+def report(label: str, concurrency: int, latencies, errors, wall: float):
+    ms = [x * 1000 for x in latencies]
+    error_summary = ''
+    if errors:
+        counts = {e: errors.count(e) for e in set(errors)}
+        error_summary = '  errors: ' + ', '.join(f"{k} x{v}" for k, v in sorted(counts.items()))
+    print(f"{label:>10} c={concurrency:<4} {len(latencies) / wall:8.1f} req/s  "
+          f"p50 {percentile(ms, 50):7.1f} ms  p95 {percentile(ms, 95):7.1f} ms  "
+          f"p99 {percentile(ms, 99):7.1f} ms{error_summary}")
+
+
+def multipart_body(field: str, filename: str, payload: bytes):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n').encode() + payload + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def http_call(url: str, pdf_bytes: bytes, same_file: bool, timeout: float):
+    def call(i):
+        payload = pdf_bytes if same_file else pdf_bytes + f'\n% loadtest {uuid.uuid4().hex}\n'.encode()
+        body, content_type = multipart_body('resume', f'resume-{i}.pdf', payload)
+        req = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+    return call
+
+
+def encoder_stats(url: str):
+    """The server's batcher counters (see /encoder/stats), or None if unavailable."""
+    parts = urllib.parse.urlsplit(url)
+    try:
+        with urllib.request.urlopen(f"{parts.scheme}://{parts.netloc}/encoder/stats", timeout=5) as resp:
+            return json.load(resp)
+    except (OSError, ValueError):
+        return None
+
+
+def in_process_calls(max_batch: int, max_wait_ms: float):
+    from encode_batcher import MicroBatcher
+    from encoder import get_model, warm_up
+    from matcher import encode_summary, encode_texts
+
+    warm_up(get_model())
+    batcher = MicroBatcher(encode_texts, max_batch_size=max_batch, max_wait_ms=max_wait_ms, max_queue=100_000)
+    return {
+        'direct': lambda i: encode_summary(f"{SAMPLE_SUMMARY} ({i})"),
+        'batched': lambda i: batcher.encode(f"{SAMPLE_SUMMARY} ({i})"),
+    }, batcher
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:5000/upload")
+    ap.add_argument("--pdf", default=SAMPLE_PDF)
+    ap.add_argument("--concurrency", default="1,4,16,64", help="comma-separated client counts")
+    ap.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--same-file", action="store_true", help="post identical bytes (exercises the result cache)")
+    ap.add_argument("--in-process", action="store_true", help="benchmark encoding without HTTP")
+    ap.add_argument("--max-batch", type=int, default=32, help="batcher size for --in-process")
+    ap.add_argument("--max-wait-ms", type=float, default=2.0, help="batcher wait for --in-process")
+    args = ap.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    if args.in_process:
+        calls, batcher = in_process_calls(args.max_batch, args.max_wait_ms)
+        for concurrency in levels:
+            for label, call in calls.items():
+                report(label, concurrency, *run_level(call, concurrency, args.requests))
+        print(f"batcher: {batcher.stats()}")
+        batcher.close()
+        return
+
+    with open(args.pdf, 'rb') as f:
+        pdf_bytes = f.read()
+    call = http_call(args.url, pdf_bytes, args.same_file, args.timeout)
+    for concurrency in levels:
+        before = encoder_stats(args.url)
+        report('http', concurrency, *run_level(call, concurrency, args.requests))
+        after = encoder_stats(args.url)
+        if before and after and after['batches'] > before['batches']:
+            batches, items = after['batches'] - before['batches'], after['items'] - before['items']
+            print(f"{'':>10} encode batches: {batches}, mean size {items / batches:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,473 @@
-import json
-from sentence_transformers import SentenceTransformer, util
+import os
+import threading
+import time
+import numpy as np
+from chunking import MAX_TOKENS, chunk_text, encode_sorted, pool
+from dedup import find_duplicates
+from encoder import MODEL_VERSION, get_model
+from metrics import stage
+from job_filters import JobFilterIndex
+from job_index import JobIndex
+from job_store import JobStore
+from resume_index import ResumeIndex
+from retrieval import make_backend
+from resume_parser import ResumeParser
+from skill_matrix import SkillMatrix
+from skill_similarity import SkillSimilarity, skill_vocabulary
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+JOBS_PATH = "jobs_db.json"  # seeds the job store the first time it is created
+JOB_STORE_PATH = os.environ.get("JOB_STORE", "jobs.db")
+JOB_INDEX_DIR = "job_index"
+# Parsed resumes kept for ranking candidates against a job (see resume_index.py)
+RESUME_INDEX_DIR = os.environ.get("RESUME_INDEX_DIR", "resume_index")
+# Storage for the served job embeddings: "float32", "float16" or "int8" (see quantization.py)
+INDEX_DTYPE = os.environ.get("MATCH_INDEX_DTYPE", "float32")
 
-def load_jobs(path="jobs_db.json"):
-    with open(path, 'r') as f:
-        return json.load(f)
+# Retrieval backend: "exact" (brute force) or "ivf" (approximate, for large catalogues)
+SEARCH_BACKEND = os.environ.get("MATCH_BACKEND", "exact")
+IVF_MIN_JOBS = 10_000  # below this, exact search is already fast enough
 
-def match_jobs(parsed_resume_json, top_n=3):
+# Hybrid ranking: score = (1 - w) * cosine similarity + w * skill coverage.
+# With w > 0 the retrieval backend proposes SKILL_RERANK_FACTOR * top_n
+# candidates by embedding, which are then re-ranked by the blended score.
+SKILL_WEIGHT = float(os.environ.get("MATCH_SKILL_WEIGHT", "0"))
+SKILL_RERANK_FACTOR = 10
+
+# Skills whose names embed at least this similar count as the same skill for
+# coverage and missing skills (see skill_similarity.py); off by default, as
+# names like "java" and "javascript" embed close. 1 keeps exact matching
+SKILL_SIMILARITY_THRESHOLD = float(os.environ.get("MATCH_SKILL_SIMILARITY", "1"))
+SKILL_SIMILARITY_DIR = "skill_similarity"
+
+# Near-duplicate postings (templated variants, see dedup.py) at least this
+# similar are indexed once and returned together as one match, e.g. 0.7; off
+# by default, as only representatives are then searched. 0 indexes every
+# posting separately
+DEDUP_THRESHOLD = float(os.environ.get("MATCH_DEDUP_THRESHOLD", "0"))
+
+# A failed catalogue reload is retried after RELOAD_RETRY_SECONDS, doubling with
+# each failure at the same revision up to RELOAD_RETRY_MAX_SECONDS; a new
+# revision is tried at once. get_catalogue(wait=True) follows at most
+# MAX_WAIT_RELOADS reloads while writes keep moving the revision
+RELOAD_RETRY_SECONDS = 5
+RELOAD_RETRY_MAX_SECONDS = 300
+MAX_WAIT_RELOADS = 3
+
+def _parse_weights(spec):
+    weights = {}
+    for item in spec.split(','):
+        field, _, weight = item.partition('=')
+        weights[field.strip()] = float(weight)
+    return weights
+
+# Resume fields embedded for matching and their weights, e.g.
+# MATCH_FIELD_WEIGHTS="summary=0.5,experience=0.3,skills=0.2". Weights of
+# fields a resume lacks are redistributed over the fields it has. A "text"
+# weight also embeds the full resume text, cut into model-sized chunks whose
+# embeddings are pooled with MATCH_CHUNK_POOLING (see chunking.py).
+FIELD_WEIGHTS = _parse_weights(os.environ.get("MATCH_FIELD_WEIGHTS", "summary=0.4,experience=0.4,skills=0.2"))
+MAX_EXPERIENCE_ENTRIES = 8
+CHUNK_POOLING = os.environ.get("MATCH_CHUNK_POOLING", "mean")
+CHUNK_TOPK = int(os.environ.get("MATCH_CHUNK_TOPK", "3"))
+NOTHING_TO_MATCH = "Missing resume text: no summary, experience or skills in input."
+
+class Catalogue:
     """
-    Takes parsed resume (dict or JSON) and returns top matching jobs in JSON format.
-    Expected keys: 'text', 'skills'
+    Everything matching needs for one revision of the job store: the
+    embedding index plus the retrieval backend and skill matrix built from it.
+    A request takes one snapshot and uses it throughout, so a reload swapping
+    in a new revision never mixes row ids from two versions.
+
+    With deduplication the index holds one representative per cluster of
+    near-duplicate postings; ``duplicates`` maps a representative's id to the
+    other postings of its cluster.
     """
-    resume_text = parsed_resume_json['summary']
-    extracted_skills = parsed_resume_json['skills']
 
-    if not resume_text or not extracted_skills:
-        return {"error": "Missing resume text or skills in input."}
+    def __init__(self, index: JobIndex, revision: int, similar_skills=None, duplicates=None):
+        self.index = index
+        self.revision = revision
+        self.similar_skills = similar_skills
+        self.duplicates = duplicates or {}
+        self._lock = threading.Lock()
+        self._backend = None
+        self._skill_matrix = None
+        self._filter_index = None
+        self._rows = None
 
-    jobs = load_jobs()
-    job_texts = [job['description'] for job in jobs]
+    @property
+    def jobs(self):
+        return self.index.jobs
 
-    # Encode text and compute similarity
-    resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-    job_embeddings = model.encode(job_texts, convert_to_tensor=True)
-    cosine_scores = util.pytorch_cos_sim(resume_embedding, job_embeddings)[0]
+    def row(self, job_id):
+        """Row of a job id in this snapshot, or None if it is not indexed."""
+        if self._rows is None:
+            self._rows = {job.get('id'): i for i, job in enumerate(self.jobs)}
+        return self._rows.get(job_id)
 
-    scored_jobs = []
-    for i, score in enumerate(cosine_scores):
-        job = jobs[i]
-        required = set(map(str.lower, job.get("required_skills", [])))
-        have = set(map(str.lower, extracted_skills))
-        missing = required - have
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    name = SEARCH_BACKEND if len(self.index) >= IVF_MIN_JOBS else "exact"
+                    self._backend = make_backend(name, self.index.embeddings)
+        return self._backend
+
+    @property
+    def skill_matrix(self):
+        if self._skill_matrix is None:
+            with self._lock:
+                if self._skill_matrix is None:
+                    self._skill_matrix = SkillMatrix(self.index.jobs, similar=self.similar_skills)
+        return self._skill_matrix
+
+    @property
+    def filter_index(self):
+        if self._filter_index is None:
+            with self._lock:
+                if self._filter_index is None:
+                    self._filter_index = JobFilterIndex(self.index.jobs)
+        return self._filter_index
+
+_store_lock = threading.Lock()
+_job_store = None
+_catalogue_lock = threading.Lock()
+_catalogue = None
+_reload_thread = None
+_reload_failure = None  # (revision, consecutive failures, retry at) of the last failed reload
+_resume_index_lock = threading.Lock()
+_resume_index = None
+
+def get_job_store():
+    global _job_store
+    if _job_store is None:
+        with _store_lock:
+            if _job_store is None:
+                _job_store = JobStore(JOB_STORE_PATH, seed_path=JOBS_PATH)
+    return _job_store
+
+def load_jobs():
+    return get_job_store().all()
+
+def get_skill_similarity(jobs):
+    """The skill-similarity table for the parser's keywords and these jobs' skills."""
+    skills = skill_vocabulary(jobs, ResumeParser().skill_keywords)
+    return SkillSimilarity.load_or_build(skills, get_model(), MODEL_VERSION, SKILL_SIMILARITY_DIR)
 
-        scored_jobs.append({
+def _build_catalogue():
+    store = get_job_store()
+    revision = store.revision()
+    jobs = store.all()
+    indexed, duplicates = jobs, None
+    if DEDUP_THRESHOLD > 0:
+        clusters = find_duplicates(jobs, DEDUP_THRESHOLD)
+        indexed, duplicates = [jobs[i] for i in clusters.representatives], clusters.duplicates()
+    index = JobIndex.load_or_build(indexed, get_model(), MODEL_VERSION, JOB_INDEX_DIR, dtype=INDEX_DTYPE)
+    similar_skills = None
+    if SKILL_SIMILARITY_THRESHOLD < 1:
+        similar_skills = get_skill_similarity(jobs).equivalents(SKILL_SIMILARITY_THRESHOLD)
+    return Catalogue(index, revision, similar_skills, duplicates)
+
+def _reload(revision):
+    global _catalogue, _reload_thread, _reload_failure
+    failure = None
+    try:
+        catalogue = _build_catalogue()
+        _catalogue = catalogue  # atomic swap; in-flight requests keep their old snapshot
+        print(f"Job catalogue reloaded at revision {catalogue.revision} ({len(catalogue.index)} jobs indexed, "
+              f"{sum(map(len, catalogue.duplicates.values()))} duplicates)")
+    except Exception as e:
+        failures = _reload_failure[1] + 1 if _reload_failure and _reload_failure[0] == revision else 1
+        delay = min(RELOAD_RETRY_SECONDS * 2 ** (failures - 1), RELOAD_RETRY_MAX_SECONDS)
+        failure = (revision, failures, time.time() + delay)
+        print(f"Job catalogue reload at revision {revision} failed: {e}; retrying in {delay:g}s")
+    finally:
+        with _catalogue_lock:
+            _reload_failure = failure
+            _reload_thread = None
+
+def get_catalogue(wait=False):
+    """
+    Return the current catalogue snapshot. The first call builds it; after
+    that, a change in the job store's revision starts a rebuild in the
+    background while callers keep using the previous snapshot. A revision
+    whose rebuild failed is retried with backoff, not on every call. Pass
+    ``wait=True`` to block until the snapshot reflects the latest revision,
+    or its rebuild has failed.
+    """
+    global _catalogue, _reload_thread
+    if _catalogue is None:
+        with _catalogue_lock:
+            if _catalogue is None:
+                _catalogue = _build_catalogue()
+        return _catalogue
+
+    for _ in range(MAX_WAIT_RELOADS if wait else 1):
+        revision = get_job_store().revision()
+        if revision == _catalogue.revision:
+            break
+        with _catalogue_lock:
+            retry = _reload_failure is None or _reload_failure[0] != revision or time.time() >= _reload_failure[2]
+            if _reload_thread is None and retry:
+                _reload_thread = threading.Thread(target=_reload, args=(revision,), name="catalogue-reload",
+                                                  daemon=True)
+                _reload_thread.start()
+            thread = _reload_thread
+        if not wait or thread is None:
+            break  # nothing to wait for: the last rebuild of this revision failed
+        thread.join()
+    return _catalogue
+
+def get_job_index():
+    """Return the embedding index of the current catalogue snapshot."""
+    return get_catalogue().index
+
+def _rank(backend, resume_embedding, coverage, top_n):
+    """Top-n (ids, scores), blending in skill coverage when SKILL_WEIGHT is set."""
+    if SKILL_WEIGHT <= 0:
+        return backend.search(resume_embedding, top_n)
+    ids, similarity = backend.search(resume_embedding, top_n * SKILL_RERANK_FACTOR)
+    blended = (1 - SKILL_WEIGHT) * similarity + SKILL_WEIGHT * coverage[ids]
+    order = np.argsort(blended)[::-1][:top_n]
+    return ids[order], blended[order]
+
+def _rank_rows(embeddings, rows, resume_embedding, coverage, top_n):
+    """
+    Top-n (ids, scores, coverage) among the filtered ``rows`` only, scoring
+    just those jobs; ``coverage`` is aligned with ``rows``.
+    """
+    similarity = embeddings[rows] @ resume_embedding.astype(np.float32, copy=False)
+    scores = (1 - SKILL_WEIGHT) * similarity + SKILL_WEIGHT * coverage if SKILL_WEIGHT > 0 else similarity
+    top_n = min(top_n, len(rows))
+    if top_n <= 0:
+        return rows[:0], scores[:0], coverage[:0]
+    top = np.argpartition(scores, -top_n)[-top_n:]
+    top = top[np.argsort(scores[top])[::-1]]
+    return rows[top], scores[top], coverage[top]
+
+def _format_matches(jobs, skill_matrix, top_ids, top_scores, have, top_coverage, duplicates=None):
+    matched_jobs = []
+    for i, score, coverage in zip(top_ids, top_scores, top_coverage):
+        job = jobs[i]
+        matched_jobs.append({
+            "id": job.get("id"),
             "title": job["title"],
             "score": round(float(score) * 100, 2),
+            "skill_coverage": round(float(coverage) * 100, 2),
             "required_skills": job.get("required_skills", []),
-            "missing_skills": list(missing)
+            "missing_skills": skill_matrix.missing(i, have),
+            "duplicates": (duplicates or {}).get(job.get("id"), [])
         })
+    return matched_jobs
+
+def encode_summary(summary):
+    """Normalised embedding of a resume summary (None if there is no summary)."""
+    if not summary:
+        return None
+    return get_model().encode(summary, convert_to_numpy=True, normalize_embeddings=True)
+
+def encode_texts(texts):
+    """Normalised embeddings for a list of texts in one model call (used by the encode batcher)."""
+    return get_model().encode(texts, batch_size=max(1, len(texts)),
+                              convert_to_numpy=True, normalize_embeddings=True)
+
+def _chunk(text):
+    """Chunks of ``text`` sized by the model's own tokenizer and sequence limit."""
+    model = get_model()
+    max_tokens = getattr(model, 'max_seq_length', None) or MAX_TOKENS + 2
+    return chunk_text(text, getattr(model, 'tokenizer', None), max_tokens=max_tokens - 2)
+
+def resume_fields(parsed_resume):
+    """
+    (field, text) pairs to embed for a parsed resume: the summary, one text per
+    experience entry (title plus description), the skills as one list and,
+    when weighted, one text per chunk of the full resume text.
+    """
+    fields = []
+    if parsed_resume.get('summary'):
+        fields.append(('summary', parsed_resume['summary']))
+    for entry in (parsed_resume.get('experience') or [])[:MAX_EXPERIENCE_ENTRIES]:
+        text = '. '.join(part for part in (entry.get('title'), entry.get('description')) if part)
+        if text:
+            fields.append(('experience', text))
+    if parsed_resume.get('skills'):
+        fields.append(('skills', 'Skills: ' + ', '.join(parsed_resume['skills'])))
+    if FIELD_WEIGHTS.get('text', 0) > 0 and parsed_resume.get('text'):
+        with stage("chunk_text"):
+            fields.extend(('text', chunk) for chunk in _chunk(parsed_resume['text']))
+    return [(field, text) for field, text in fields if FIELD_WEIGHTS.get(field, 0) > 0]
+
+def combine_field_embeddings(fields, embeddings):
+    """
+    Weighted mix of the field embeddings. Similarity is linear in the query,
+    so scoring the jobs against this one vector gives the same result as
+    scoring every field separately and taking the weighted average of the
+    cosine similarities (averaging over experience entries, pooling the text
+    chunks with CHUNK_POOLING), while only a single search runs.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    present = list(dict.fromkeys(field for field, _ in fields))
+    total = sum(FIELD_WEIGHTS[field] for field in present)
+    combined = np.zeros(embeddings.shape[1], dtype=np.float32)
+    for field in present:
+        rows = embeddings[[i for i, (f, _) in enumerate(fields) if f == field]]
+        pooled = pool(rows, CHUNK_POOLING, CHUNK_TOPK) if field == 'text' else rows.mean(axis=0)
+        combined += FIELD_WEIGHTS[field] / total * pooled
+    return combined
+
+def _field_version():
+    weights = ','.join(f"{field}={weight:g}" for field, weight in sorted(FIELD_WEIGHTS.items()))
+    if FIELD_WEIGHTS.get('text', 0) > 0:
+        weights += f",pool={CHUNK_POOLING}:{CHUNK_TOPK}"
+    return f"fields({weights})"
+
+def embedding_version(catalogue=None):
+    """Identifies how resume embeddings are built and which catalogue they score against (for caching)."""
+    index = (catalogue or get_catalogue()).index
+    return f"{index.version}:{_field_version()}"
+
+def get_resume_index():
+    """The stored resumes; stale (search raises IndexStale) if the model or field weights changed."""
+    global _resume_index
+    if _resume_index is None:
+        with _resume_index_lock:
+            if _resume_index is None:
+                _resume_index = ResumeIndex(RESUME_INDEX_DIR, f"{MODEL_VERSION}:{_field_version()}",
+                                            get_model().get_sentence_embedding_dimension())
+    return _resume_index
+
+def encode_resume(parsed_resume, encode_fn=None):
+    """
+    Embedding of a parsed resume for matching: all its fields are encoded in
+    one call of ``encode_fn`` (a list of texts -> matrix; defaults to the model
+    directly, the web app passes its micro-batcher), longest first so padded
+    batches waste little. None if nothing to embed.
+    """
+    fields = resume_fields(parsed_resume)
+    if not fields:
+        return None
+    embeddings = encode_sorted([text for _, text in fields], encode_fn or encode_texts)
+    return combine_field_embeddings(fields, embeddings)
+
+def match_jobs(parsed_resume_json, top_n=3, resume_embedding=None, catalogue=None, filters=None):
+    """
+    Takes parsed resume (dict or JSON) and returns top matching jobs in JSON format.
+    Expected keys: 'summary', 'skills' and optionally 'experience'; any of
+    them may be empty as long as one is present.
+
+    Pass ``resume_embedding`` (from encode_resume) to skip encoding, e.g. when
+    it comes from the result cache, and ``catalogue`` to match against a
+    specific snapshot instead of the job store's (e.g. in benchmarks).
+
+    ``filters`` (facet -> values, see job_filters.py) restrict matching to
+    the jobs they select; only those are scored.
+    """
+    extracted_skills = parsed_resume_json.get('skills') or []
+
+    catalogue = catalogue or get_catalogue()
+    skill_matrix = catalogue.skill_matrix
+
+    # Only the resume is encoded per request; job embeddings come from the index
+    if resume_embedding is None:
+        with stage("encode_resume"):
+            resume_embedding = encode_resume(parsed_resume_json)
+        if resume_embedding is None:
+            return {"error": NOTHING_TO_MATCH}
+    rows = None
+    if filters:
+        with stage("filter"):
+            rows = catalogue.filter_index.select(filters)
+    with stage("skill_coverage"):
+        have = skill_matrix.resume_vector(extracted_skills)
+        coverage = skill_matrix.coverage(have, rows)
+    with stage("similarity"):
+        if rows is None:
+            top_ids, top_scores = _rank(catalogue.backend, resume_embedding, coverage, top_n)
+            top_coverage = coverage[top_ids]
+        else:
+            top_ids, top_scores, top_coverage = _rank_rows(catalogue.index.embeddings, rows,
+                                                           resume_embedding, coverage, top_n)
+    with stage("skill_gap"):
+        matched_jobs = _format_matches(catalogue.jobs, skill_matrix, top_ids, top_scores, have, top_coverage,
+                                       catalogue.duplicates)
 
-    scored_jobs.sort(key=lambda x: x['score'], reverse=True)
     return {
-        "matched_jobs": scored_jobs[:top_n]
+        "matched_jobs": matched_jobs
     }
 
+def match_jobs_batch(parsed_resumes, top_n=3, batch_size=64, filters=None):
+    """
+    Match many parsed resumes at once. The fields of all resumes are encoded
+    in a single batched model call and scored against the job index as one
+    resume x job similarity matrix (restricted to the jobs ``filters`` select).
+
+    Returns one result per input, in order, shaped like match_jobs' output.
+    """
+    results = [None] * len(parsed_resumes)
+    valid = []
+    fields = {}
+    for i, parsed in enumerate(parsed_resumes):
+        fields[i] = resume_fields(parsed)
+        if not fields[i]:
+            results[i] = {"error": NOTHING_TO_MATCH}
+        else:
+            valid.append(i)
+
+    if valid:
+        catalogue = get_catalogue()
+        backend = catalogue.backend
+        texts = [text for i in valid for _, text in fields[i]]
+        with stage("encode_batch"):
+            field_embeddings = encode_sorted(texts, lambda batch: get_model().encode(
+                batch, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True))
+        embeddings = []
+        offset = 0
+        for i in valid:
+            n = len(fields[i])
+            embeddings.append(combine_field_embeddings(fields[i], field_embeddings[offset:offset + n]))
+            offset += n
+        embeddings = np.stack(embeddings)
+        skill_matrix = catalogue.skill_matrix
+        rows = catalogue.filter_index.select(filters) if filters else None
+        have = np.stack([skill_matrix.resume_vector(parsed_resumes[i].get('skills') or []) for i in valid])
+        coverage = skill_matrix.coverage(have, rows)  # jobs (or filtered rows) x resumes
+
+        if rows is not None:
+            ranked = [_rank_rows(catalogue.index.embeddings, rows, e, coverage[:, j], top_n)
+                      for j, e in enumerate(embeddings)]
+            all_ids, all_scores, all_coverage = zip(*ranked)
+        else:
+            if SKILL_WEIGHT <= 0:
+                all_ids, all_scores = backend.search_batch(embeddings, top_n)
+            else:
+                ranked = [_rank(backend, e, coverage[:, j], top_n) for j, e in enumerate(embeddings)]
+                all_ids, all_scores = [r[0] for r in ranked], [r[1] for r in ranked]
+            all_coverage = [coverage[ids, j] for j, ids in enumerate(all_ids)]
 
+        for j, i in enumerate(valid):
+            results[i] = {
+                "matched_jobs": _format_matches(catalogue.jobs, skill_matrix, all_ids[j], all_scores[j],
+                                                have[j], all_coverage[j], catalogue.duplicates)
+            }
 
+    return results
 
+def _job_embedding(job, catalogue, encode_fn=None):
+    """The posting's row of the job index if indexed with this description, else encoded now."""
+    row = catalogue.row(job.get('id'))
+    if row is not None and catalogue.jobs[row]['description'] == job['description']:
+        embedding = np.asarray(catalogue.index.embeddings[row], dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) or 1.0)  # quantised rows are only near unit length
+    return np.asarray((encode_fn or encode_texts)([job['description']]))[0]
+
+def match_candidates(job, top_n=10, catalogue=None, encode_fn=None):
+    """
+    Reverse matching: the top-n stored resumes for a posting (a dict with a
+    description and optional required_skills and id), scored like match_jobs.
+    """
+    with stage("encode_job"):
+        job_embedding = _job_embedding(job, catalogue or get_catalogue(), encode_fn)
+    with stage("candidate_search"):
+        candidates = get_resume_index().search(job_embedding, job.get('required_skills') or [],
+                                               top_n, SKILL_WEIGHT)
+    return {"candidates": candidates}
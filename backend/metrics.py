@@ -0,0 +1,186 @@
+"""
+Stage-level latency instrumentation.
+
+Code on the request path wraps each stage in ``stage(name)``; the duration is
+recorded in a histogram labelled by stage and, when a trace is being
+collected for the current request (``collect_trace``), appended to that
+trace as well. ``render()`` exports every metric in the Prometheus text
+format for the ``/metrics`` endpoint.
+
+Resume parsing runs in ParsingPool worker processes, whose histograms are not
+the web process's. Workers therefore collect a trace per document and send
+it back with the result, and the pool ``replay``s it here. Those workers are
+forked while request threads are recording, so a forked child gets fresh
+metric locks (``os.register_at_fork``) instead of copies that may be held.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+# Seconds; stages range from tens of microseconds (regexes) to seconds (large PDFs)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Exact sample value: integral counts as integers, anything else at full precision."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _reset_after_fork(metric):
+    """Give ``metric`` a new lock in forked children: the parent's may be held by a thread that does not exist there."""
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: setattr(metric, '_lock', threading.Lock()))
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _reset_after_fork(self)
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {values[-1]}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{labels} {values[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _reset_after_fork(self)
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "resume_stage_duration_seconds", "Time spent in each stage of the upload pipeline.", labels=("stage",))
+REQUEST_SECONDS = Histogram(
+    "resume_request_duration_seconds", "End-to-end request latency by endpoint.", labels=("endpoint",))
+REQUESTS = Counter(
+    "resume_requests_total", "Requests served by endpoint and HTTP status.", labels=("endpoint", "status"))
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, REQUESTS]
+
+_trace: contextvars.ContextVar = contextvars.ContextVar("resume_trace", default=None)
+
+
+def record(name: str, seconds: float, start: Optional[float] = None):
+    """Record one stage duration in the histogram and in the current trace, if any."""
+    STAGE_SECONDS.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        events, origin = trace
+        events.append({
+            "stage": name,
+            "start_ms": round(((start if start is not None else time.perf_counter() - seconds) - origin) * 1000, 3),
+            "duration_ms": round(seconds * 1000, 3),
+        })
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, start)
+
+
+@contextmanager
+def collect_trace():
+    """Collect the stages run in this context (thread/task) into the yielded list."""
+    events, token = start_trace()
+    try:
+        yield events
+    finally:
+        end_trace(token)
+
+
+def start_trace():
+    """Non-context-manager form of collect_trace, for request hooks; returns (events, token)."""
+    events = []
+    return events, _trace.set((events, time.perf_counter()))
+
+
+def end_trace(token):
+    _trace.reset(token)
+
+
+def replay(events: List[Dict], offset_ms: float = 0.0):
+    """Record stages measured elsewhere (e.g. in a worker process) as if they ran here."""
+    trace = _trace.get()
+    for event in events:
+        STAGE_SECONDS.observe(event["duration_ms"] / 1000, event["stage"])
+        if trace is not None:
+            trace[0].append({**event, "start_ms": round(event["start_ms"] + offset_ms, 3)})
+
+
+def trace_offset_ms() -> float:
+    """Milliseconds since the current trace started (0 when not tracing)."""
+    trace = _trace.get()
+    return (time.perf_counter() - trace[1]) * 1000 if trace is not None else 0.0
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,163 @@
+"""
+A pool of worker processes for parsing resume PDFs off the request thread.
+
+Each worker keeps a warm ``ResumeParser`` and receives raw PDF bytes over a
+pipe. The pool enforces a per-document timeout (a stuck worker is killed and
+replaced), rejects documents over a page limit, and recycles every worker
+after ``max_tasks_per_worker`` documents so memory held by pathological PDFs
+is returned to the OS.
+"""
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, Iterator, Union
+
+import metrics
+from resume_parser import ParsedResume, ResumeParser
+
+
+class ParseError(Exception):
+    """A document could not be parsed (corrupt PDF, page limit, worker crash)."""
+
+
+class ParseTimeout(ParseError):
+    """A document took longer than the pool's per-document timeout."""
+
+
+def _worker_main(conn, max_pages: int, max_tasks: int):
+    parser = ResumeParser()
+    for _ in range(max_tasks):
+        try:
+            pdf_bytes = conn.recv()
+        except EOFError:
+            break
+        if pdf_bytes is None:
+            break
+        # Stage timings travel back with the result; this process's metrics are never scraped
+        with metrics.collect_trace() as trace:
+            try:
+                parsed = parser.parse_resume(pdf_bytes, max_pages=max_pages)
+                result = ("ok", parsed.to_dict(), trace)
+            except Exception as e:
+                result = ("error", str(e), trace)
+        conn.send(result)
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, max_pages: int, max_tasks: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, max_pages, max_tasks), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParsingPool:
+    """
+    Parse PDFs in ``workers`` separate processes.
+
+    ``parse`` is thread-safe: concurrent callers each check out an idle worker
+    and block until one is free.
+    """
+
+    def __init__(self, workers: int = None, timeout: float = 30.0, max_pages: int = 20,
+                 max_tasks_per_worker: int = 200, start_method: str = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_tasks_per_worker = max_tasks_per_worker
+        if start_method is None and "fork" in multiprocessing.get_all_start_methods():
+            # Fork keeps worker start-up cheap; workers only touch PyMuPDF and re
+            start_method = "fork"
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = queue.Queue()
+        self._all = []
+        self._closed = False
+        for _ in range(self.workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.max_pages, self.max_tasks_per_worker)
+        self._all.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, kill: bool) -> _Worker:
+        worker.stop(kill=kill)
+        self._all.remove(worker)
+        return self._spawn()
+
+    def parse(self, pdf_bytes: Union[bytes, BinaryIO]) -> ParsedResume:
+        """Parse one PDF given as bytes or a binary stream, raising ParseError/ParseTimeout on failure."""
+        if self._closed:
+            raise RuntimeError("ParsingPool is closed")
+        if hasattr(pdf_bytes, 'read'):
+            pdf_bytes = pdf_bytes.read()
+
+        worker = self._idle.get()
+        try:
+            try:
+                sent_at = metrics.trace_offset_ms()
+                worker.conn.send(pdf_bytes)
+                if not worker.conn.poll(self.timeout):
+                    worker = self._replace(worker, kill=True)
+                    raise ParseTimeout(f"Parsing exceeded the {self.timeout:g}s timeout")
+                status, payload, trace = worker.conn.recv()
+                metrics.replay(trace, offset_ms=sent_at)
+            except (EOFError, BrokenPipeError, ConnectionResetError):
+                worker = self._replace(worker, kill=True)
+                raise ParseError("Parser worker crashed")
+
+            worker.tasks += 1
+            if worker.tasks >= self.max_tasks_per_worker:
+                # The worker exits on its own after its last task; start a fresh one
+                worker = self._replace(worker, kill=False)
+        finally:
+            self._idle.put(worker)
+
+        if status != "ok":
+            raise ParseError(payload)
+        return ParsedResume.from_dict(payload)
+
+    def parse_many(self, documents: Iterable[bytes]) -> Iterator[Union[ParsedResume, ParseError]]:
+        """
+        Parse documents concurrently on all workers, yielding results in input
+        order. Failures are yielded as ParseError instances instead of raised.
+        """
+        def parse_safe(pdf_bytes):
+            try:
+                return self.parse(pdf_bytes)
+            except ParseError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(parse_safe, documents)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for worker in list(self._all):
+            worker.stop()
+        self._all.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,88 @@
+"""
+Compact storage for the job embedding matrix.
+
+Embeddings are L2-normalised before quantisation, so every component lies in
+[-1, 1]:
+
+- ``float16``: a plain half-precision copy (2 bytes per component).
+- ``int8``: each row is stored as ``round(x / scale)`` with a per-row
+  ``scale = max|x| / 127`` (1 byte per component plus 4 bytes per row).
+
+``QuantizedMatrix`` wraps the (memory-mapped) codes and scales and offers the
+operations the retrieval backends use: ``shape``, row indexing and ``@``.
+NumPy has no fast BLAS path for int8 or float16 products, so ``@`` walks the
+matrix in blocks, widening one block at a time to float32 and applying the
+row scales to the block's scores. Peak extra memory is one block, and the full
+float32 matrix is never materialised.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+DTYPES = ('float32', 'float16', 'int8')
+BLOCK_ROWS = 1024  # ~1.5 MB of float32 per block at dim 384, stays in cache
+
+
+def quantize(matrix: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Return (codes, per-row scales or None) for a float32 matrix of unit rows."""
+    if dtype == 'float16':
+        return matrix.astype(np.float16), None
+    if dtype != 'int8':
+        raise ValueError(f"Unknown index dtype '{dtype}'. Choose from: {', '.join(DTYPES)}")
+
+    codes = np.empty(matrix.shape, dtype=np.int8)
+    scales = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+        block_scales = np.abs(block).max(axis=1) / 127
+        block_scales[block_scales == 0] = 1.0
+        codes[start:start + BLOCK_ROWS] = np.rint(block / block_scales[:, None])
+        scales[start:start + BLOCK_ROWS] = block_scales
+    return codes, scales
+
+
+class QuantizedMatrix:
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+
+    @property
+    def dtype(self):
+        return self.codes.dtype
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def __getitem__(self, rows) -> np.ndarray:
+        """Selected rows, dequantised to float32."""
+        block = np.asarray(self.codes[rows], dtype=np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows][..., None]
+        return block
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        """``self @ other`` for a query vector (dim,) or a (dim, n_queries) matrix."""
+        other = np.asarray(other, dtype=np.float32)
+        out = np.empty((self.codes.shape[0],) + other.shape[1:], dtype=np.float32)
+        for start in range(0, self.codes.shape[0], BLOCK_ROWS):
+            stop = start + BLOCK_ROWS
+            block_scores = np.asarray(self.codes[start:stop], dtype=np.float32) @ other
+            if self.scales is not None:
+                block_scores *= self.scales[start:stop].reshape((-1,) + (1,) * (other.ndim - 1))
+            out[start:stop] = block_scores
+        return out
@@ -0,0 +1,163 @@
+"""
+Content-addressed cache for repeat resume uploads.
+
+Entries are keyed on the SHA-256 of the uploaded PDF bytes and hold the
+parsed resume (as a dict) plus its summary embedding. Each entry records the
+job-index version it was produced under; when the catalogue or the model
+changes the version changes and stale entries are treated as misses.
+
+Two tiers:
+- memory: a small LRU of recently used entries
+- disk: one ``.npz`` file per entry, evicted oldest-access-first once the
+  directory grows past ``max_disk_bytes``
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def content_key(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str = "result_cache", max_memory_items: int = 256,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'evictions': 0,
+        }
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith('.npz')
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def get(self, key: str, version: str) -> Optional[Tuple[Dict, Optional[np.ndarray]]]:
+        """Return (parsed_resume_dict, summary_embedding) for ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return entry[1], entry[2]
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry[0] != version:
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                self._remove_disk(key)
+                return None
+            self._stats['disk_hits'] += 1
+            self._remember(key, entry)
+        return entry[1], entry[2]
+
+    def put(self, key: str, version: str, parsed: Dict, embedding: Optional[np.ndarray]):
+        """
+        Store an entry. Several processes may share ``cache_dir`` (and upload
+        the same PDF at once): each writes its own temp file, the last rename
+        wins, and losing a race with another writer or an eviction is harmless.
+        """
+        entry = (version, parsed, embedding)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.array(version),
+                    parsed=np.array(json.dumps(parsed, ensure_ascii=False)),
+                    embedding=np.zeros(0, dtype=np.float32) if embedding is None else embedding.astype(np.float32),
+                )
+            size = os.path.getsize(tmp_path)
+
+            with self._lock:
+                try:
+                    self._disk_bytes -= os.path.getsize(path)
+                except OSError:
+                    pass  # new entry, or just evicted by another process
+                os.replace(tmp_path, path)
+                self._disk_bytes += size
+                self._remember(key, entry)
+                self._evict_disk()
+        except OSError as e:
+            print(f"Result cache: could not store {key[:12]}: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats['memory_hits'] + self._stats['disk_hits'] + self._stats['misses']
+            hits = lookups - self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_items': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+            }
+
+    def _remember(self, key: str, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                version = str(data['version'])
+                parsed = json.loads(str(data['parsed']))
+                embedding = data['embedding']
+            os.utime(path)  # access time for LRU eviction
+        except (OSError, ValueError, KeyError):
+            return None
+        return version, parsed, (embedding if embedding.size else None)
+
+    def _remove_disk(self, key: str):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        entries = []
+        for e in os.scandir(self.cache_dir):
+            if e.name.endswith('.npz'):
+                try:
+                    entries.append((e.stat().st_mtime, e.name))
+                except OSError:
+                    pass  # removed by another process meanwhile
+        for _, name in sorted(entries):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            self._remove_disk(name[:-len('.npz')])
+            self._stats['evictions'] += 1
@@ -0,0 +1,253 @@
+"""
+Versioned columnar binary format for bulk storage of parsed resumes.
+
+A file holds many ParsedResume records as columns rather than one JSON
+object per resume: every string field is one UTF-8 blob plus an offsets
+array and a null bitmap, and every list field (skills, education,
+experience) is an offsets array into flattened child columns. Loading is
+then a handful of ``np.frombuffer`` calls on a memory-mapped file, and
+fields are decoded only when read.
+
+Layout (little-endian):
+
+    b"RSMC" | u32 format version | u64 header length | header (JSON) | columns
+
+The header holds the record count and, for each column, its dtype, offset
+and length in the file; columns start on 8-byte boundaries. Readers reject
+files whose format version they do not know.
+
+Callers can store extra per-record string columns next to the resume
+fields (resume_index.py keeps each record's key this way).
+
+Usage:
+    write_resumes("resumes.rsm", resumes, extra={"key": keys})
+    resumes = read_resumes("resumes.rsm")          # list of ParsedResume
+    table = ResumeTable.open("resumes.rsm")         # lazy: table[i], table.column("summary")
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from resume_parser import ContactInfo, Education, Experience, ParsedResume
+
+MAGIC = b"RSMC"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sIQ")
+
+CONTACT_FIELDS = ('name', 'email', 'phone', 'address', 'linkedin', 'github', 'portfolio')
+EDUCATION_FIELDS = ('degree', 'institution', 'year', 'gpa')
+EXPERIENCE_FIELDS = ('title', 'company', 'duration', 'description')
+
+
+def _string_column(name: str, values: Sequence[Optional[str]], columns: Dict[str, np.ndarray]):
+    encoded = [b'' if v is None else v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    columns[name + '.offsets'] = offsets.astype(np.uint32 if offsets[-1] < 2**32 else np.uint64)
+    columns[name + '.data'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    columns[name + '.null'] = np.packbits(np.array([v is None for v in values], dtype=bool))
+
+
+def _list_offsets(name: str, lengths: Sequence[int], columns: Dict[str, np.ndarray]):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.uint32)
+    np.cumsum(lengths, out=offsets[1:])
+    columns[name + '.offsets'] = offsets
+
+
+def encode_columns(resumes: Sequence[ParsedResume]) -> Dict[str, np.ndarray]:
+    columns: Dict[str, np.ndarray] = {}
+    for field in CONTACT_FIELDS:
+        _string_column(f'contact_info.{field}', [getattr(r.contact_info, field) for r in resumes], columns)
+    _list_offsets('contact_info.other_links', [len(r.contact_info.other_links) for r in resumes], columns)
+    _string_column('contact_info.other_links.item',
+                   [link for r in resumes for link in r.contact_info.other_links], columns)
+
+    _list_offsets('skills', [len(r.skills) for r in resumes], columns)
+    _string_column('skills.item', [s for r in resumes for s in r.skills], columns)
+
+    for name, fields in (('education', EDUCATION_FIELDS), ('experience', EXPERIENCE_FIELDS)):
+        _list_offsets(name, [len(getattr(r, name)) for r in resumes], columns)
+        items = [item for r in resumes for item in getattr(r, name)]
+        for field in fields:
+            _string_column(f'{name}.{field}', [getattr(item, field) for item in items], columns)
+
+    _string_column('summary', [r.summary for r in resumes], columns)
+    _string_column('text', [r.text for r in resumes], columns)
+    return columns
+
+
+def write_resumes(path: str, resumes: Iterable[ParsedResume],
+                  extra: Optional[Dict[str, Sequence[Optional[str]]]] = None):
+    """
+    Write resumes to ``path`` atomically (via a uniquely named temporary
+    sibling and rename), with optional ``extra`` string columns, one value
+    per resume.
+    """
+    resumes = list(resumes)
+    columns = encode_columns(resumes)
+    for name, values in (extra or {}).items():
+        if len(values) != len(resumes):
+            raise ValueError(f"Column '{name}' has {len(values)} values for {len(resumes)} resumes")
+        _string_column(name, values, columns)
+
+    layout = {}
+    position = 0
+    for name, array in columns.items():
+        layout[name] = {'dtype': array.dtype.str, 'offset': position, 'length': len(array)}
+        position += -(-array.nbytes // 8) * 8
+    header = json.dumps({'count': len(resumes), 'columns': layout}).encode('utf-8')
+    header += b' ' * (-(_PREAMBLE.size + len(header)) % 8)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for array in columns.values():
+                f.write(array.tobytes())
+                f.write(b'\0' * (-array.nbytes % 8))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _Strings:
+    """One string column: decoded on access, None where the null bit is set."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, null: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self.null = np.unpackbits(null, count=len(offsets) - 1).view(bool)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.null[i]:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def slice(self, start: int, stop: int) -> List[Optional[str]]:
+        return [self[i] for i in range(start, stop)]
+
+    def to_list(self) -> List[Optional[str]]:
+        """Every value, decoding the blob once (much faster than indexing one by one)."""
+        blob = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [None if null else blob[a:b].decode('utf-8')
+                for null, a, b in zip(self.null.tolist(), bounds, bounds[1:])]
+
+
+class ResumeTable:
+    """Read access to a file written by ``write_resumes``."""
+
+    def __init__(self, buffer, header: Dict, data_start: int):
+        self._buffer = buffer
+        self._count = header['count']
+        self._arrays = {
+            name: np.frombuffer(buffer, dtype=np.dtype(spec['dtype']), count=spec['length'],
+                                offset=data_start + spec['offset'])
+            for name, spec in header['columns'].items()
+        }
+        self._strings: Dict[str, _Strings] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "ResumeTable":
+        """Memory-map ``path``; columns are views into the mapping, not copies."""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "ResumeTable":
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError("Not a resume table: file is truncated")
+        magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a resume table: bad magic bytes")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported resume table version {version} (expected {FORMAT_VERSION})")
+        header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+        return cls(buffer, header, _PREAMBLE.size + header_length)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def strings(self, name: str) -> _Strings:
+        strings = self._strings.get(name)
+        if strings is None:
+            strings = self._strings[name] = _Strings(
+                self._arrays[name + '.data'], self._arrays[name + '.offsets'], self._arrays[name + '.null'])
+        return strings
+
+    def list_offsets(self, name: str) -> np.ndarray:
+        """Offsets of a list field (e.g. ``skills``) into its ``.item`` column: record i owns [o[i], o[i + 1])."""
+        return self._arrays[name + '.offsets']
+
+    def column(self, name: str) -> List[Optional[str]]:
+        """All values of one string field, e.g. ``summary`` or ``contact_info.email``."""
+        return self.strings(name).to_list()
+
+    def __getitem__(self, i: int) -> ParsedResume:
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        i %= self._count
+        return self._records(i, i + 1)[0]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def to_list(self) -> List[ParsedResume]:
+        return self._records(0, self._count)
+
+    def _records(self, start: int, stop: int) -> List[ParsedResume]:
+        whole = start == 0 and stop == self._count
+
+        def values(name, a, b):
+            strings = self.strings(name)
+            return strings.to_list()[a:b] if whole else strings.slice(a, b)
+
+        def item_range(name):
+            offsets = self._arrays[name + '.offsets']
+            return int(offsets[start]), int(offsets[stop]), (offsets[start:stop + 1] - offsets[start]).tolist()
+
+        contact = {f: values(f'contact_info.{f}', start, stop) for f in CONTACT_FIELDS}
+        link_a, link_b, link_bounds = item_range('contact_info.other_links')
+        links = values('contact_info.other_links.item', link_a, link_b)
+        skill_a, skill_b, skill_bounds = item_range('skills')
+        skills = values('skills.item', skill_a, skill_b)
+
+        nested = {}
+        for name, cls, fields in (('education', Education, EDUCATION_FIELDS),
+                                  ('experience', Experience, EXPERIENCE_FIELDS)):
+            a, b, bounds = item_range(name)
+            items = [cls(*row) for row in zip(*(values(f'{name}.{f}', a, b) for f in fields))] if b > a else []
+            nested[name] = (items, bounds)
+
+        summaries = values('summary', start, stop)
+        texts = values('text', start, stop)
+        resumes = []
+        for j in range(stop - start):
+            resumes.append(ParsedResume(
+                contact_info=ContactInfo(*(contact[f][j] for f in CONTACT_FIELDS),
+                                         other_links=links[link_bounds[j]:link_bounds[j + 1]]),
+                skills=skills[skill_bounds[j]:skill_bounds[j + 1]],
+                education=nested['education'][0][nested['education'][1][j]:nested['education'][1][j + 1]],
+                experience=nested['experience'][0][nested['experience'][1][j]:nested['experience'][1][j + 1]],
+                summary=summaries[j],
+                text=texts[j],
+            ))
+        return resumes
+
+
+def read_resumes(path: str) -> List[ParsedResume]:
+    return ResumeTable.open(path).to_list()
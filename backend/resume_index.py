@@ -0,0 +1,418 @@
+"""
+Persisted index of parsed resumes, for ranking candidates against a job.
+
+Every resume matched through ``/upload`` is appended here once (keyed on the
+SHA-256 of its PDF, like the result cache). The index directory holds:
+
+- ``records.<generation>.rsm``: the resumes as of the last compaction, in the
+  columnar format of resume_codec.py, memory-mapped and decoded per result
+- ``records.<generation>.jsonl``: resumes added since, one per line
+- ``embeddings.f32``: the resume embeddings as raw float32 rows, table rows
+  first, then log lines, opened with ``np.memmap`` so every process shares
+  the pages
+- ``manifest.json``: the model and field weights the embeddings came from,
+  and the current generation
+
+The log and embeddings are append-only. A writer appends the embedding row
+before the record line and holds an exclusive ``flock`` while doing so, so a
+reader only ever counts complete records and other processes' appends are
+picked up by ``refresh()`` reading the new lines. Once the log holds a
+quarter of the table (and at least COMPACT_MIN_RECORDS lines) the writer
+folds it into a new generation's table and switches the manifest over;
+readers notice the manifest change and reload.
+
+When the model or field weights change, the stored embeddings no longer
+compare with new ones: the index is then stale, ``search`` raises IndexStale
+and ``add`` only logs the record (with its full text) until the index is
+re-encoded offline:
+
+    python resume_index.py
+
+Skill vectors are kept as a sparse resume x skill CSR matrix built from the
+records' skill lists, so scoring a job is one mat-vec for the similarity and
+one sparse column sum for the skill coverage, over every stored resume:
+
+    similarity = E @ job_embedding
+    coverage   = R[:, job_skills].sum(axis=1) / len(job_skills)
+"""
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from resume_codec import ResumeTable, write_resumes
+from resume_parser import ParsedResume
+from skill_matrix import normalize_skill
+
+MANIFEST_FILE = "manifest.json"
+TABLE_FILE = "records.{generation}.rsm"
+LOG_FILE = "records.{generation}.jsonl"
+EMBEDDINGS_FILE = "embeddings.f32"
+LOCK_FILE = ".lock"
+# On-disk layout; 1 kept every record in records.jsonl and is upgraded on open
+LAYOUT = 2
+LEGACY_RECORDS_FILE = "records.jsonl"
+COMPACT_MIN_RECORDS = 1000
+
+
+class IndexStale(Exception):
+    """The stored embeddings come from another model or field weights; run ``python resume_index.py``."""
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+
+
+class ResumeIndex:
+    def __init__(self, index_dir: str, version: str, dim: int):
+        """
+        Open (or create) the index in ``index_dir``, for embeddings of
+        ``version``; if it was built with another, it is stale until migrate().
+        """
+        self.index_dir = index_dir
+        self.version = version
+        self.dim = dim
+        self.stale = False
+        self._lock = threading.Lock()
+        self._manifest_stat = None
+        self._generation = None
+        self._table: Optional[ResumeTable] = None
+        self._table_keys: List[str] = []
+        self._table_skills = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._log: List[ParsedResume] = []  # slotted, see bench_serialisation.py
+        self._log_keys: List[str] = []
+        self._log_added: List[float] = []
+        self._log_offset = 0
+        self._rows: Dict[str, int] = {}
+        self._embeddings = np.zeros((0, dim), dtype=np.float32)
+        self.vocabulary: Dict[str, int] = {}
+        self._skill_indices: List[int] = []
+        self._skill_indptr: List[int] = [0]
+        self._skills = None
+
+        os.makedirs(index_dir, exist_ok=True)
+        with self._file_lock():
+            manifest = self._read_manifest()
+            if manifest is not None and manifest.get('layout') != LAYOUT:
+                manifest = self._upgrade(manifest)
+            if manifest is None:
+                self._write_generation(version, [], [], [], np.zeros((0, dim), dtype=np.float32))
+            self._refresh()
+        if self.stale:
+            print(f"Resume index: {index_dir} was built with a different model or field weights; "
+                  f"candidate search is off until `python resume_index.py` re-encodes it")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock across processes appending to the same directory."""
+        with open(self._path(LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self._path(MANIFEST_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_generation(self, version: str, records: List[ParsedResume], keys: List[str],
+                          added: List[float], embeddings: Optional[np.ndarray] = None) -> Dict:
+        """
+        Write ``records`` as the next generation's table (with an empty log)
+        and switch the manifest to it; with the flock held. ``embeddings``
+        replaces the embeddings file when given (it must already match).
+        """
+        manifest = self._read_manifest()
+        previous = manifest.get('generation') if manifest and manifest.get('layout') == LAYOUT else None
+        generation = (previous or 0) + 1
+        write_resumes(self._path(TABLE_FILE.format(generation=generation)), records,
+                      extra={'key': keys, 'added_at': [repr(a) for a in added]})
+        _write_atomic(self._path(LOG_FILE.format(generation=generation)), b'')
+        if embeddings is not None:
+            _write_atomic(self._path(EMBEDDINGS_FILE), np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+        manifest = {'version': version, 'dim': self.dim, 'layout': LAYOUT, 'generation': generation}
+        _write_atomic(self._path(MANIFEST_FILE), json.dumps(manifest).encode('utf-8'))
+        if previous is not None:
+            for name in (TABLE_FILE, LOG_FILE):
+                try:
+                    os.remove(self._path(name.format(generation=previous)))
+                except FileNotFoundError:
+                    pass
+        return manifest
+
+    def _upgrade(self, manifest: Dict) -> Dict:
+        """Convert a layout 1 index (every record in records.jsonl) in place; embeddings are kept."""
+        records = []
+        if os.path.exists(self._path(LEGACY_RECORDS_FILE)):
+            with open(self._path(LEGACY_RECORDS_FILE), 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.endswith('\n')]
+        print(f"Resume index: upgrading {len(records)} resumes to layout {LAYOUT}")
+        manifest = self._write_generation(
+            manifest['version'], [ParsedResume.from_dict(r) for r in records], [r['key'] for r in records],
+            [r.get('added_at', 0.0) for r in records])
+        if os.path.exists(self._path(LEGACY_RECORDS_FILE)):
+            os.remove(self._path(LEGACY_RECORDS_FILE))
+        return manifest
+
+    def _stored_records(self) -> List[Dict]:
+        self._refresh()
+        table = self._table.to_list() if self._table is not None else []
+        return [dict(r.to_dict(), key=key, added_at=added)
+                for r, key, added in zip(table + self._log, self._keys(), self._added())]
+
+    def _keys(self) -> List[str]:
+        return self._table_keys + self._log_keys
+
+    def _added(self) -> List[float]:
+        table = [float(a) for a in self._table.strings('added_at').to_list()] if self._table is not None else []
+        return table + self._log_added
+
+    def migrate(self, reencode: Callable[[Dict], Optional[np.ndarray]], needs_text: bool,
+                drop_incomplete: bool = False) -> int:
+        """
+        Re-encode every stored record with ``reencode`` (parsed resume dict ->
+        embedding, or None to drop it) if the index is stale; returns how many
+        were kept. Records stored without their text (by older versions) can't
+        be re-encoded faithfully when ``needs_text``: this refuses unless
+        ``drop_incomplete`` drops them.
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            if not self.stale:
+                return len(self)
+            records = self._stored_records()
+            incomplete = [r for r in records if needs_text and not r.get('text')]
+            if incomplete and not drop_incomplete:
+                raise ValueError(f"{len(incomplete)} of {len(records)} stored resumes have no text to re-encode; "
+                                 f"re-run with --drop-incomplete to drop them")
+
+            kept, rows = [], []
+            for record in records:
+                embedding = None if needs_text and not record.get('text') else reencode(record)
+                if embedding is not None:
+                    kept.append(record)
+                    rows.append(np.asarray(embedding, dtype=np.float32))
+            print(f"Resume index: re-encoded {len(kept)} resumes, dropped {len(records) - len(kept)}")
+            self._write_generation(self.version, [ParsedResume.from_dict(r) for r in kept],
+                                   [r['key'] for r in kept], [r['added_at'] for r in kept],
+                                   np.stack(rows) if rows else np.zeros((0, self.dim), dtype=np.float32))
+            self._refresh()
+            return len(kept)
+
+    def _compact(self):
+        """Fold the log into a new generation's table; with the flock held."""
+        records = (self._table.to_list() if self._table is not None else []) + self._log
+        self._write_generation(self.version, records, self._keys(), self._added())
+        self._refresh()
+
+    def _load(self, generation: int):
+        """Open ``generation``'s table and start reading its log from the top."""
+        table = ResumeTable.open(self._path(TABLE_FILE.format(generation=generation)))
+        keys = table.strings('key').to_list()
+        self.vocabulary = {}
+        items = table.strings('skills.item').to_list()
+        columns = np.array([self.vocabulary.setdefault(normalize_skill(s), len(self.vocabulary)) for s in items],
+                           dtype=np.int32)
+        skills = sparse.csr_matrix((np.ones(len(columns), dtype=np.float32), columns,
+                                    np.asarray(table.list_offsets('skills'), dtype=np.int64)),
+                                   shape=(len(table), len(self.vocabulary)))
+        skills.sum_duplicates()  # a skill listed twice still counts once
+        skills.data[:] = 1
+
+        self._generation = generation
+        self._table, self._table_keys, self._table_skills = table, keys, skills
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._log, self._log_keys, self._log_added, self._log_offset = [], [], [], 0
+        self._skill_indices, self._skill_indptr = [], [0]
+        self._embeddings = np.zeros((0, self.dim), dtype=np.float32)
+        self._skills = None
+
+    def _refresh(self):
+        """Pick up records appended since the last read, or a new generation (by any process)."""
+        for _ in range(3):
+            try:
+                stat = os.stat(self._path(MANIFEST_FILE))
+                if (stat.st_ino, stat.st_mtime_ns) != self._manifest_stat:
+                    manifest = self._read_manifest()
+                    self.stale = (manifest['version'], manifest['dim']) != (self.version, self.dim)
+                    if manifest['generation'] != self._generation:
+                        self._load(manifest['generation'])
+                    self._manifest_stat = (stat.st_ino, stat.st_mtime_ns)
+                with open(self._path(LOG_FILE.format(generation=self._generation)), 'rb') as f:
+                    f.seek(self._log_offset)
+                    data = f.read()
+                break
+            except FileNotFoundError:  # compacted meanwhile: follow the manifest
+                self._manifest_stat = None
+        else:
+            raise RuntimeError(f"Resume index {self.index_dir} keeps changing generation")
+
+        end = data.rfind(b'\n') + 1  # ignore a line still being written
+        for line in data[:end].splitlines():
+            self._append_record(json.loads(line))
+        self._log_offset += end
+
+        if len(self) > len(self._embeddings) and not self.stale:
+            self._embeddings = np.memmap(self._path(EMBEDDINGS_FILE), dtype=np.float32, mode='r',
+                                         shape=(len(self), self.dim))
+            self._skills = None
+
+    def _append_record(self, record: Dict):
+        resume = ParsedResume.from_dict(record)
+        self._rows[record['key']] = len(self)
+        self._log.append(resume)
+        self._log_keys.append(record['key'])
+        self._log_added.append(record.get('added_at', 0.0))
+        columns = {self.vocabulary.setdefault(normalize_skill(s), len(self.vocabulary))
+                   for s in resume.skills}
+        self._skill_indices.extend(sorted(columns))
+        self._skill_indptr.append(len(self._skill_indices))
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._table_keys) + len(self._log)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        return self._embeddings.nbytes
+
+    def add(self, key: str, parsed: Dict, embedding: np.ndarray) -> bool:
+        """
+        Store a parsed resume and its embedding; False if ``key`` is already
+        stored. While the index is stale only the record is logged, for
+        migrate() to encode.
+        """
+        record = dict(parsed)
+        record['key'] = key
+        record['added_at'] = round(time.time(), 3)
+        row = np.asarray(embedding, dtype=np.float32).reshape(1, self.dim)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if key in self._rows:
+                return False
+            if not self.stale:
+                with open(self._path(EMBEDDINGS_FILE), 'ab') as f:
+                    f.truncate(len(self) * row.nbytes)  # drop a row left by an interrupted add
+                    f.write(row.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            with open(self._path(LOG_FILE.format(generation=self._generation)), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._refresh()
+            if not self.stale and len(self._log) >= max(COMPACT_MIN_RECORDS, len(self._table_keys) // 4):
+                self._compact()
+        return True
+
+    def _skill_matrix(self) -> sparse.csr_matrix:
+        if self._skills is None or self._skills.shape != (len(self), len(self.vocabulary)):
+            table = self._table_skills
+            log = sparse.csr_matrix(
+                (np.ones(len(self._skill_indices), dtype=np.float32),
+                 np.array(self._skill_indices, dtype=np.int32), np.array(self._skill_indptr)),
+                shape=(len(self._log), len(self.vocabulary)),
+            )
+            table = sparse.csr_matrix((table.data, table.indices, table.indptr),
+                                      shape=(table.shape[0], len(self.vocabulary)))
+            self._skills = sparse.vstack([table, log], format='csr')
+        return self._skills
+
+    def search(self, query: np.ndarray, required_skills: List[str], top_n: int = 10,
+               skill_weight: float = 0.0) -> List[Dict]:
+        """
+        Top-n stored resumes for a job embedding, scored like matcher.match_jobs:
+        cosine similarity, blended with skill coverage when ``skill_weight`` is set.
+        """
+        with self._lock:
+            self._refresh()
+            if self.stale:
+                raise IndexStale("Stored resumes were encoded with a different model or field weights; "
+                                 "run `python resume_index.py` to re-encode them")
+            embeddings, skills = self._embeddings, self._skill_matrix()
+            table, table_keys, log, log_keys = self._table, self._table_keys, self._log, self._log_keys
+            vocabulary = dict(self.vocabulary)
+        n = len(embeddings)  # the log may grow after the snapshot; score only these rows
+        if n == 0 or top_n <= 0:
+            return []
+
+        similarity = embeddings @ np.asarray(query, dtype=np.float32)
+        required = list(dict.fromkeys(normalize_skill(s) for s in required_skills))
+        columns = [vocabulary[s] for s in required if s in vocabulary]
+        if required:
+            matched = np.asarray(skills[:, columns].sum(axis=1)).ravel() if columns else np.zeros(n)
+            coverage = (matched / len(required)).astype(np.float32)
+        else:
+            coverage = np.ones(n, dtype=np.float32)  # nothing required: fully covered
+        scores = (1 - skill_weight) * similarity + skill_weight * coverage if skill_weight > 0 else similarity
+
+        top_n = min(top_n, n)
+        top = np.argpartition(scores, -top_n)[-top_n:]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        candidates = []
+        for i in top:
+            if i < len(table_keys):
+                resume, key = table[i], table_keys[i]
+            else:
+                resume, key = log[i - len(table_keys)], log_keys[i - len(table_keys)]
+            have = {normalize_skill(s) for s in resume.skills}
+            candidates.append({
+                "key": key,
+                "name": resume.contact_info.name,
+                "summary": resume.summary,
+                "score": round(float(scores[i]) * 100, 2),
+                "skill_coverage": round(float(coverage[i]) * 100, 2),
+                "skills": resume.skills,
+                "missing_skills": [s.lower() for s in dict.fromkeys(required_skills)
+                                   if normalize_skill(s) not in have],
+            })
+        return candidates
+
+
+def main():
+    import argparse
+    import matcher
+    ap = argparse.ArgumentParser(description="Re-encode the stored resumes after a model or field weight change "
+                                             "(MODEL_NAME, MATCH_FIELD_WEIGHTS, ...), with the server's settings.")
+    ap.add_argument("--drop-incomplete", action="store_true",
+                    help="drop resumes stored without their text when the text field is weighted")
+    args = ap.parse_args()
+
+    index = matcher.get_resume_index()
+    kept = index.migrate(matcher.encode_resume, needs_text=matcher.FIELD_WEIGHTS.get('text', 0) > 0,
+                         drop_incomplete=args.drop_incomplete)
+    print(f"Resume index: {kept} resumes at {index.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,160 @@
 import fitz  # PyMuPDF
 import re
 import json
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+from dataclasses import dataclass
 from pathlib import Path
-from matcher import match_jobs
+from metrics import stage
+from skill_matcher import SKILL_ALIASES, get_skill_matcher
 
-@dataclass
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
+
+DEGREE_PATTERNS = [
+    r'(?:bachelor|master|phd|doctorate|associate|diploma|certificate|b\.?[as]|m\.?[as]|ph\.?d)',
+    r'(?:computer science|engineering|mathematics|physics|chemistry|biology)',
+    r'(?:business administration|management|finance|economics|accounting)'
+]
+
+EXPERIENCE_PATTERNS = [
+    r'(?:software engineer|developer|programmer|analyst|manager|director|coordinator)',
+    r'(?:intern|junior|senior|lead|principal|chief|head)',
+    _MONTH + r'\w*\s+\d{4}'
+]
+
+# Precompiled pattern registry shared by every ResumeParser instance.
+# Contact patterns run case-insensitively over the full text; the rest are
+# matched against lowercased lines, which is much cheaper than re.IGNORECASE.
+PATTERNS = {
+    'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE),
+    'phone': re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+    'linkedin': re.compile(r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w\-]+/?', re.IGNORECASE),
+    'github': re.compile(r'(?:https?://)?(?:www\.)?github\.com/[\w\-]+/?', re.IGNORECASE),
+    'institution': re.compile(r'\b(?:university|college|institute|school|iit|nit|bits)\b'),
+    'degree': re.compile(r'\b(?:b\.?tech|m\.?tech|bachelor|master|b\.?sc|m\.?sc|b\.?a|m\.?a|phd|diploma|certificate)\b'),
+    'month_range': re.compile(r'\b' + _MONTH + r'\w*\s+\d{4}\s*-\s*' + _MONTH + r'?\w*\s*\d{4}\b'),
+    'year_range': re.compile(r'\b\d{4}\s*-\s*\d{4}\b'),
+    'year': re.compile(r'\b(?:19|20)\d{2}\b'),
+    'four_digits': re.compile(r'\b\d{4}\b'),
+    'gpa': re.compile(r'\b(gpa|cgpa)\s*:?\s*(\d+\.?\d*)\s*/?\s*(\d+\.?\d*)\b'),
+    'job_title': re.compile('|'.join(EXPERIENCE_PATTERNS)),
+    'company': re.compile(r'\b(?:inc|corp|ltd|llc|company|technologies|solutions)\b'),
+}
+
+# Section headers, checked in order against a whole (short) line such as
+# "WORK EXPERIENCE", "Technical Skills:" or "Education & Certifications"
+_HEADER_PREFIX = r'(?:(?:professional|career|work|technical|core|key|academic|personal|relevant|educational)\s+)?'
+_HEADER_SUFFIX = r'(?:\s*(?:&|and|/)\s*[a-z ]+)?'
+SECTION_HEADERS = [
+    (name, re.compile(_HEADER_PREFIX + body + _HEADER_SUFFIX))
+    for name, body in [
+        ('summary', r'(?:summary|objective|profile|about(?:\s+me)?)'),
+        ('experience', r'(?:experience|employment(?:\s+history)?|work\s+history|internships?)'),
+        ('education', r'(?:education|academics?|qualifications?|academic\s+background)'),
+        ('skills', r'(?:skills?|competenc(?:y|ies)|technologies|tech\s+stack)'),
+        ('projects', r'(?:projects?)'),
+        ('certifications', r'(?:certifications?|certificates?|courses|achievements|awards)'),
+    ]
+]
+_HEADER_TRIM = re.compile(r'^[\W_]+|[\s:]+$')
+_MAX_HEADER_LENGTH = 50
+SUMMARY_MAX_LINES = 4
+
+
+def _section_of(line: str) -> Optional[str]:
+    """Name of the section a line starts, or None if it is not a header."""
+    if len(line) > _MAX_HEADER_LENGTH:
+        return None
+    label = ' '.join(_HEADER_TRIM.sub('', line).lower().split())
+    for name, pattern in SECTION_HEADERS:
+        if pattern.fullmatch(label):
+            return name
+    return None
+
+
+# A PDF given as a filesystem path, raw bytes, or a readable binary file object
+PdfSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+def open_pdf(pdf_source: PdfSource) -> fitz.Document:
+    """Open a PDF from a path, from bytes, or from a file-like object, without touching disk for the latter two."""
+    if isinstance(pdf_source, (str, Path)):
+        return fitz.open(pdf_source)
+    if hasattr(pdf_source, 'read'):
+        pdf_source = pdf_source.read()
+    return fitz.open(stream=bytes(pdf_source) if isinstance(pdf_source, memoryview) else pdf_source, filetype="pdf")
+
+
+def _describe_source(pdf_source: PdfSource) -> str:
+    if isinstance(pdf_source, (str, Path)):
+        return str(pdf_source)
+    if hasattr(pdf_source, 'read'):
+        return getattr(pdf_source, 'name', None) or 'file object'
+    return f"{len(pdf_source)} bytes in memory"
+
+
+@dataclass(slots=True)
+class PageContent:
+    page: int
+    text: str
+    links: List[Dict]
+
+
+# Margin (in points) around a link rectangle that still counts as its anchor text
+LINK_TEXT_MARGIN = 5
+
+
+def _text_in_rect(spans: List[Dict], link_rect) -> str:
+    """
+    Characters of the already-extracted spans whose centres fall inside a link
+    rectangle expanded by LINK_TEXT_MARGIN, so no second pass over the page
+    is needed to recover a link's anchor text.
+    """
+    rect = fitz.Rect(link_rect)
+    x0, y0 = rect.x0 - LINK_TEXT_MARGIN, rect.y0 - LINK_TEXT_MARGIN
+    x1, y1 = rect.x1 + LINK_TEXT_MARGIN, rect.y1 + LINK_TEXT_MARGIN
+
+    parts = []
+    for span in spans:
+        sx0, sy0, sx1, sy1 = span["bbox"]
+        if sx1 <= x0 or sx0 >= x1 or sy1 <= y0 or sy0 >= y1:
+            continue
+        for char in span["chars"]:
+            cx0, cy0, cx1, cy1 = char["bbox"]
+            cx, cy = (cx0 + cx1) / 2, (cy0 + cy1) / 2
+            if x0 <= cx <= x1 and y0 <= cy <= y1:
+                parts.append(char["c"])
+    return ''.join(parts)
+
+
+def _original_case(line: str, match: re.Match) -> str:
+    """Text of a match found in ``line.lower()``, taken from the original line."""
+    return line[match.start():match.end()]
+
+
+def segment_sections(text: str) -> Dict[str, List[str]]:
+    """
+    Split resume text into sections in a single pass over its lines.
+
+    Returns section name -> stripped, non-empty lines of that section (header
+    lines excluded). Lines before the first header are filed under 'header';
+    a section that appears twice is concatenated.
+    """
+    sections = {'header': []}
+    current = sections['header']
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+        name = _section_of(line)
+        if name is not None:
+            current = sections.setdefault(name, [])
+        else:
+            current.append(line)
+    return sections
+
+# Records are slotted: no per-instance __dict__, which matters when the resume
+# index holds 100k+ of them (see bench_serialisation.py)
+@dataclass(slots=True)
 class ContactInfo:
     name: Optional[str] = None
     email: Optional[str] = None
@@ -21,27 +169,58 @@ class ContactInfo:
         if self.other_links is None:
             self.other_links = []
 
-@dataclass
+@dataclass(slots=True)
 class Education:
     degree: Optional[str] = None
     institution: Optional[str] = None
     year: Optional[str] = None
     gpa: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Experience:
     title: Optional[str] = None
     company: Optional[str] = None
     duration: Optional[str] = None
     description: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class ParsedResume:
     contact_info: ContactInfo
     skills: List[str]
     education: List[Education]
     experience: List[Experience]
     summary: Optional[str] = None
+    text: Optional[str] = None  # full extracted text, for chunked embedding
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ParsedResume":
+        """Rebuild a ParsedResume from its to_dict() form (e.g. after crossing a process boundary)."""
+        return cls(
+            contact_info=ContactInfo(**data['contact_info']),
+            skills=list(data['skills']),
+            education=[Education(**edu) for edu in data['education']],
+            experience=[Experience(**exp) for exp in data['experience']],
+            summary=data.get('summary'),
+            text=data.get('text')
+        )
+
+    def to_dict(self) -> Dict:
+        """Same result as asdict(), without its recursive deep copy."""
+        contact = self.contact_info
+        return {
+            'contact_info': {
+                'name': contact.name, 'email': contact.email, 'phone': contact.phone,
+                'address': contact.address, 'linkedin': contact.linkedin, 'github': contact.github,
+                'portfolio': contact.portfolio, 'other_links': list(contact.other_links),
+            },
+            'skills': list(self.skills),
+            'education': [{'degree': e.degree, 'institution': e.institution, 'year': e.year, 'gpa': e.gpa}
+                          for e in self.education],
+            'experience': [{'title': e.title, 'company': e.company, 'duration': e.duration,
+                            'description': e.description} for e in self.experience],
+            'summary': self.summary,
+            'text': self.text,
+        }
 
 class ResumeParser:
     def __init__(self):
@@ -65,128 +244,79 @@ class ResumeParser:
             # Methodologies
             'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'tdd', 'bdd'
         ]
+        self.skill_aliases = SKILL_ALIASES
+        # Compiled once per taxonomy and shared by every parser instance
+        self.skill_matcher = get_skill_matcher(self.skill_keywords, self.skill_aliases)
         
-        # Regex patterns
-        self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        self.phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        self.linkedin_pattern = r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w\-]+/?'
-        self.github_pattern = r'(?:https?://)?(?:www\.)?github\.com/[\w\-]+/?'
+        # Regex patterns (precompiled, see PATTERNS)
+        self.email_pattern = PATTERNS['email']
+        self.phone_pattern = PATTERNS['phone']
+        self.linkedin_pattern = PATTERNS['linkedin']
+        self.github_pattern = PATTERNS['github']
         
         # Education patterns
-        self.degree_patterns = [
-            r'(?:bachelor|master|phd|doctorate|associate|diploma|certificate|b\.?[as]|m\.?[as]|ph\.?d)',
-            r'(?:computer science|engineering|mathematics|physics|chemistry|biology)',
-            r'(?:business administration|management|finance|economics|accounting)'
-        ]
+        self.degree_patterns = DEGREE_PATTERNS
         
         # Experience patterns
-        self.experience_patterns = [
-            r'(?:software engineer|developer|programmer|analyst|manager|director|coordinator)',
-            r'(?:intern|junior|senior|lead|principal|chief|head)',
-            r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}'
-        ]
+        self.experience_patterns = EXPERIENCE_PATTERNS
 
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF using PyMuPDF."""
-        try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text()
-                
-            doc.close()
-            return text
-        except Exception as e:
-            raise Exception(f"Error reading PDF: {str(e)}")
+    def iter_pages(self, pdf_source: PdfSource, max_pages: Optional[int] = None) -> Iterator[PageContent]:
+        """
+        Walk the PDF once, yielding each page's text and links as soon as the page is read.
 
-    def extract_links_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extract all links from PDF including their associated text and coordinates."""
+        Each page's layout is extracted a single time with get_text("rawdict"); the
+        page text is built from its lines and every link's anchor text is
+        resolved against the same spans, instead of re-extracting per link.
+        """
+        with stage("pdf_open"):
+            doc = open_pdf(pdf_source)
         try:
-            doc = fitz.open(pdf_path)
-            all_links = []
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                links = page.get_links()
-                
-                for link in links:
-                    link_info = {
+            if max_pages is not None and len(doc) > max_pages:
+                raise ValueError(f"PDF has {len(doc)} pages; the limit is {max_pages}")
+
+            for page_num, page in enumerate(doc):
+                line_texts = []
+                spans = []
+                for block in page.get_text("rawdict").get("blocks", []):
+                    for line in block.get("lines", []):
+                        parts = []
+                        for span in line["spans"]:
+                            parts.extend(char["c"] for char in span["chars"])
+                            spans.append(span)
+                        line_texts.append(''.join(parts))
+
+                links = []
+                for link in page.get_links():
+                    links.append({
                         'page': page_num,
                         'rect': link['from'],  # coordinates
                         'uri': link.get('uri', ''),
-                        'text': ''
-                    }
-                    
-                    # Extract text at the link coordinates
-                    rect = fitz.Rect(link['from'])
-                    # Expand rectangle slightly to capture text
-                    expanded_rect = fitz.Rect(
-                        rect.x0 - 5, rect.y0 - 5, 
-                        rect.x1 + 5, rect.y1 + 5
-                    )
-                    
-                    # Get text within the link area
-                    text_instances = page.get_text("dict", clip=expanded_rect)
-                    link_text = ""
-                    for block in text_instances.get("blocks", []):
-                        if "lines" in block:
-                            for line in block["lines"]:
-                                for span in line["spans"]:
-                                    link_text += span["text"]
-                    
-                    link_info['text'] = link_text.strip()
-                    all_links.append(link_info)
-            
+                        'text': _text_in_rect(spans, link['from']).strip()
+                    })
+
+                text = ''.join(line + '\n' for line in line_texts)
+                yield PageContent(page=page_num, text=text, links=links)
+        finally:
             doc.close()
-            return all_links
-        except Exception as e:
-            raise Exception(f"Error extracting links from PDF: {str(e)}")
 
-    def extract_text_and_links_from_pdf(self, pdf_path: str) -> tuple:
-        """Extract both text and links from PDF."""
+    def extract_text_from_pdf(self, pdf_path: PdfSource) -> str:
+        """Extract text from PDF using PyMuPDF."""
+        return self.extract_text_and_links_from_pdf(pdf_path)[0]
+
+    def extract_links_from_pdf(self, pdf_path: PdfSource) -> List[Dict]:
+        """Extract all links from PDF including their associated text and coordinates."""
+        return self.extract_text_and_links_from_pdf(pdf_path)[1]
+
+    def extract_text_and_links_from_pdf(self, pdf_source: PdfSource, max_pages: Optional[int] = None) -> tuple:
+        """Extract both text and links from a PDF path, raw PDF bytes or a file-like object."""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
+            text_parts = []
             all_links = []
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                
-                # Extract text
-                text += page.get_text()
-                
-                # Extract links
-                links = page.get_links()
-                for link in links:
-                    link_info = {
-                        'page': page_num,
-                        'rect': link['from'],
-                        'uri': link.get('uri', ''),
-                        'text': ''
-                    }
-                    
-                    # Extract text at link coordinates
-                    rect = fitz.Rect(link['from'])
-                    expanded_rect = fitz.Rect(
-                        rect.x0 - 5, rect.y0 - 5, 
-                        rect.x1 + 5, rect.y1 + 5
-                    )
-                    
-                    text_instances = page.get_text("dict", clip=expanded_rect)
-                    link_text = ""
-                    for block in text_instances.get("blocks", []):
-                        if "lines" in block:
-                            for line in block["lines"]:
-                                for span in line["spans"]:
-                                    link_text += span["text"]
-                    
-                    link_info['text'] = link_text.strip()
-                    all_links.append(link_info)
-            
-            doc.close()
-            return text, all_links
+            with stage("pdf_extract"):
+                for page in self.iter_pages(pdf_source, max_pages=max_pages):
+                    text_parts.append(page.text)
+                    all_links.extend(page.links)
+            return ''.join(text_parts), all_links
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
 
@@ -196,22 +326,22 @@ class ResumeParser:
         
         # Extract from regular text first
         # Extract email
-        email_match = re.search(self.email_pattern, text, re.IGNORECASE)
+        email_match = self.email_pattern.search(text)
         if email_match:
             contact.email = email_match.group()
         
         # Extract phone
-        phone_match = re.search(self.phone_pattern, text)
+        phone_match = self.phone_pattern.search(text)
         if phone_match:
             contact.phone = phone_match.group()
         
         # Extract LinkedIn
-        linkedin_match = re.search(self.linkedin_pattern, text, re.IGNORECASE)
+        linkedin_match = self.linkedin_pattern.search(text)
         if linkedin_match:
             contact.linkedin = linkedin_match.group()
         
         # Extract GitHub
-        github_match = re.search(self.github_pattern, text, re.IGNORECASE)
+        github_match = self.github_pattern.search(text)
         if github_match:
             contact.github = github_match.group()
         
@@ -224,8 +354,8 @@ class ResumeParser:
                 # Check for email in links
                 if 'mailto:' in uri and not contact.email:
                     contact.email = uri.replace('mailto:', '')
-                elif re.search(self.email_pattern, uri, re.IGNORECASE) and not contact.email:
-                    email_match = re.search(self.email_pattern, uri, re.IGNORECASE)
+                elif self.email_pattern.search(uri) and not contact.email:
+                    email_match = self.email_pattern.search(uri)
                     contact.email = email_match.group()
                 
                 # Check for LinkedIn
@@ -268,176 +398,156 @@ class ResumeParser:
         return contact
 
     def extract_skills(self, text: str) -> List[str]:
-        """Extract skills from text."""
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in self.skill_keywords:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(found_skills))
+        """Extract skills from text in a single pass, respecting word boundaries and aliases."""
+        return self.skill_matcher.extract(text)
+
+    def extract_education(self, text: str, sections: Optional[Dict[str, List[str]]] = None) -> List[Education]:
+        """Extract education information from the education section."""
+        if sections is None:
+            sections = segment_sections(text)
+        lines = sections.get('education', [])
+
+        lowered = [line.lower() for line in lines]
 
-    def extract_education(self, text: str) -> List[Education]:
-        """Extract education information from text."""
         education_list = []
-        lines = text.split('\n')
-        
-        education_section = False
         current_education = None
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if we're in education section
-            if re.search(r'\b(education|academic|qualification|degree)\b', line, re.IGNORECASE):
-                education_section = True
-                continue
-            
-            # Stop if we hit another section
-            if education_section and re.search(r'\b(experience|work|employment|project|skill)\b', line, re.IGNORECASE):
-                education_section = False
-            
-            if education_section:
-                # Look for institution names first (more specific patterns)
-                if re.search(r'\b(university|college|institute|school|iit|nit|bits)\b', line, re.IGNORECASE):
-                    if current_education:
-                        education_list.append(current_education)
+
+        for i, (line, low) in enumerate(zip(lines, lowered)):
+            # Look for institution names first (more specific patterns)
+            if PATTERNS['institution'].search(low):
+                if current_education:
+                    education_list.append(current_education)
+                current_education = Education()
+                current_education.institution = line
+
+                # Look for date range in the same line
+                date_match = PATTERNS['month_range'].search(low) or PATTERNS['year_range'].search(low)
+                if date_match:
+                    current_education.year = _original_case(line, date_match)
+
+                # Look for degree in the next line
+                if i + 1 < len(lines) and PATTERNS['degree'].search(lowered[i + 1]):
+                    current_education.degree = lines[i + 1]
+
+            # Look for degree patterns
+            elif PATTERNS['degree'].search(low):
+                if not current_education:
                     current_education = Education()
-                    current_education.institution = line
-                    
-                    # Look for date range in the same line
-                    date_match = re.search(r'\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}\s*-\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)?\w*\s*\d{4}\b', line, re.IGNORECASE)
-                    if not date_match:
-                        date_match = re.search(r'\b\d{4}\s*-\s*\d{4}\b', line)
-                    if date_match:
-                        current_education.year = date_match.group()
-                    
-                    # Look for degree in the next line
-                    if i + 1 < len(lines):
-                        next_line = lines[i + 1].strip()
-                        if next_line and re.search(r'\b(b\.?tech|m\.?tech|bachelor|master|b\.?sc|m\.?sc|b\.?a|m\.?a|phd|diploma|certificate)\b', next_line, re.IGNORECASE):
-                            current_education.degree = next_line
-                
-                # Look for degree patterns
-                elif re.search(r'\b(b\.?tech|m\.?tech|bachelor|master|b\.?sc|m\.?sc|b\.?a|m\.?a|phd|diploma|certificate)\b', line, re.IGNORECASE):
-                    if not current_education:
-                        current_education = Education()
-                    if not current_education.degree:
-                        current_education.degree = line
-                
-                # Look for years/dates
-                year_match = re.search(r'\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}\s*-\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)?\w*\s*\d{4}\b', line, re.IGNORECASE)
-                if not year_match:
-                    year_match = re.search(r'\b\d{4}\s*-\s*\d{4}\b', line)
-                if not year_match:
-                    year_match = re.search(r'\b(19|20)\d{2}\b', line)
-                    
-                if year_match and current_education and not current_education.year:
-                    current_education.year = year_match.group()
-                
-                # Look for GPA/CGPA
-                gpa_match = re.search(r'\b(gpa|cgpa)\s*:?\s*(\d+\.?\d*)\s*/?\s*(\d+\.?\d*)\b', line, re.IGNORECASE)
-                if gpa_match and current_education:
-                    current_education.gpa = gpa_match.group()
-        
+                if not current_education.degree:
+                    current_education.degree = line
+
+            # Look for years/dates
+            year_match = (PATTERNS['month_range'].search(low)
+                          or PATTERNS['year_range'].search(low)
+                          or PATTERNS['year'].search(low))
+            if year_match and current_education and not current_education.year:
+                current_education.year = _original_case(line, year_match)
+
+            # Look for GPA/CGPA
+            gpa_match = PATTERNS['gpa'].search(low)
+            if gpa_match and current_education:
+                current_education.gpa = _original_case(line, gpa_match)
+
         if current_education:
             education_list.append(current_education)
-        
+
         return education_list
 
-    def extract_experience(self, text: str) -> List[Experience]:
-        """Extract work experience from text."""
+    def extract_experience(self, text: str, sections: Optional[Dict[str, List[str]]] = None) -> List[Experience]:
+        """Extract work experience from the experience section."""
+        if sections is None:
+            sections = segment_sections(text)
+        lines = sections.get('experience', [])
+
         experience_list = []
-        lines = text.split('\n')
-        
-        experience_section = False
         current_experience = None
-        
+        description_lines = []
+
+        def finish():
+            if description_lines:
+                current_experience.description = ' '.join(description_lines)
+            experience_list.append(current_experience)
+
         for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if we're in experience section
-            if re.search(r'\b(experience|employment|work|career|professional)\b', line, re.IGNORECASE):
-                experience_section = True
-                continue
-            
-            # Stop if we hit another section
-            if experience_section and re.search(r'\b(education|skill|project|certification)\b', line, re.IGNORECASE):
-                experience_section = False
-            
-            if experience_section:
-                # Look for job titles
-                for pattern in self.experience_patterns:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        if current_experience:
-                            experience_list.append(current_experience)
-                        current_experience = Experience()
-                        current_experience.title = line
-                        break
-                
-                # Look for company names (lines that might contain company info)
-                if current_experience and not current_experience.company:
-                    if re.search(r'\b(inc|corp|ltd|llc|company|technologies|solutions)\b', line, re.IGNORECASE):
-                        current_experience.company = line
-                
-                # Look for duration
-                if re.search(r'\b\d{4}\b', line) and current_experience:
-                    current_experience.duration = line
-        
+            low = line.lower()
+            used = False
+
+            # Look for job titles
+            if PATTERNS['job_title'].search(low):
+                if current_experience:
+                    finish()
+                current_experience = Experience()
+                current_experience.title = line
+                description_lines = []
+                used = True
+
+            # Look for company names (lines that might contain company info)
+            if current_experience and not current_experience.company:
+                if PATTERNS['company'].search(low):
+                    current_experience.company = line
+                    used = True
+
+            # Look for duration
+            if current_experience and PATTERNS['four_digits'].search(low):
+                current_experience.duration = line
+                used = True
+
+            # Everything else in the entry (bullets, responsibilities) is its description
+            if current_experience and not used:
+                description_lines.append(line.lstrip('•·◦▪●‣–-* ').strip())
+
         if current_experience:
-            experience_list.append(current_experience)
-        
+            finish()
+
         return experience_list
 
-    def extract_summary(self, text: str) -> Optional[str]:
-        """Extract summary/objective from text."""
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            if re.search(r'\b(summary|objective|profile|about)\b', line, re.IGNORECASE):
-                # Get next few lines as summary
-                summary_lines = []
-                for j in range(i+1, min(i+5, len(lines))):
-                    next_line = lines[j].strip()
-                    if next_line and not re.search(r'\b(education|experience|skill)\b', next_line, re.IGNORECASE):
-                        summary_lines.append(next_line)
-                    else:
-                        break
-                
-                if summary_lines:
-                    return ' '.join(summary_lines)
-        
+    def extract_summary(self, text: str, sections: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
+        """Extract summary/objective from the summary section."""
+        if sections is None:
+            sections = segment_sections(text)
+        summary_lines = sections.get('summary', [])[:SUMMARY_MAX_LINES]
+        if summary_lines:
+            return ' '.join(summary_lines)
         return None
 
-    def parse_resume(self, pdf_path: str) -> ParsedResume:
-        """Parse a resume PDF and extract structured information."""
+    def parse_resume(self, pdf_source: PdfSource, max_pages: Optional[int] = None) -> ParsedResume:
+        """Parse a resume PDF (path, bytes or file-like object) and extract structured information."""
         # Extract both text and links
-        print(f"Parsing resume from: {pdf_path}")
-        text, links = self.extract_text_and_links_from_pdf(pdf_path)
-        
-        contact_info = self.extract_contact_info(text, links)
-        skills = self.extract_skills(text)
-        education = self.extract_education(text)
-        experience = self.extract_experience(text)
-        summary = self.extract_summary(text)
+        print(f"Parsing resume from: {_describe_source(pdf_source)}")
+        text, links = self.extract_text_and_links_from_pdf(pdf_source, max_pages=max_pages)
         
+        return self.parse_text(text, links)
+
+    def parse_text(self, text: str, links: List[Dict] = None) -> ParsedResume:
+        """Extract structured information from already-extracted resume text and links."""
+        # Split into sections once; each extractor only reads its own lines
+        with stage("segment_sections"):
+            sections = segment_sections(text)
+
+        with stage("extract_contact_info"):
+            contact_info = self.extract_contact_info(text, links)
+        with stage("extract_skills"):
+            skills = self.extract_skills(text)
+        with stage("extract_education"):
+            education = self.extract_education(text, sections)
+        with stage("extract_experience"):
+            experience = self.extract_experience(text, sections)
+        with stage("extract_summary"):
+            summary = self.extract_summary(text, sections)
+
         return ParsedResume(
             contact_info=contact_info,
             skills=skills,
             education=education,
             experience=experience,
-            summary=summary
+            summary=summary,
+            text=text
         )
 
-    def print_extracted_links(self, pdf_path: str):
-        """Utility method to print all extracted links for debugging."""
-        links = self.extract_links_from_pdf(pdf_path)
+    def print_extracted_links(self, links: Union[List[Dict], PdfSource]):
+        """Utility method to print extracted links (or a PDF's links) for debugging."""
+        if not isinstance(links, list):
+            links = self.extract_links_from_pdf(links)
         print("=== EXTRACTED LINKS ===")
         for i, link in enumerate(links):
             print(f"Link {i+1}:")
@@ -450,18 +560,25 @@ class ResumeParser:
     def save_parsed_data(self, parsed_resume: ParsedResume, output_path: str):
         """Save parsed resume data to JSON file."""
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(asdict(parsed_resume), f, indent=2, ensure_ascii=False)
+            json.dump(parsed_resume.to_dict(), f, indent=2, ensure_ascii=False)
 
 def main():
     """Example usage of the resume parser."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Parse a resume PDF and match it against the job catalogue.")
+    ap.add_argument("pdf_path", nargs="?", default="Ranjeet_Singh_DataScientist.pdf")
+    ap.add_argument("--no-match", action="store_true",
+                    help="only parse; skips job matching, so torch is never imported")
+    args = ap.parse_args()
+
     parser = ResumeParser()
-    
-    # Example usage
-    pdf_path = "Ranjeet_Singh_DataScientist.pdf"  # Replace with actual PDF path
+    pdf_path = args.pdf_path
     
     try:
-        # Parse the resume
-        parsed_resume = parser.parse_resume(pdf_path)
+        # Parse the resume, keeping the links so the PDF is only read once
+        print(f"Parsing resume from: {pdf_path}")
+        text, links = parser.extract_text_and_links_from_pdf(pdf_path)
+        parsed_resume = parser.parse_text(text, links)
         print('type of parsed_resume :',type(parsed_resume))
         # Print results
         print("=== PARSED RESUME ===")
@@ -491,7 +608,7 @@ def main():
         print("\n" + "="*50)
         
         
-        parser.print_extracted_links(pdf_path)
+        parser.print_extracted_links(links)
         
         # Save to JSON
         output_path = "parsed_resume.json"
@@ -499,7 +616,12 @@ def main():
         print(f"\nParsed data saved to {output_path}")
 
 
-        matched = match_jobs(parsed_resume)
+        if args.no_match:
+            return
+
+        # Imported lazily: matching needs the sentence transformer, parsing does not
+        from matcher import match_jobs
+        matched = match_jobs(parsed_resume.to_dict())
         print('type of matched : ',type(matched))
         print(matched)
         
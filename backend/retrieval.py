@@ -0,0 +1,169 @@
+"""
+Retrieval backends used by the matcher to find the top-k jobs for a resume.
+
+Both backends work on a matrix of L2-normalised embeddings (one row per job)
+and score with inner product, which equals cosine similarity.
+
+- ``exact``: brute-force scoring of every job with a vectorised
+  ``argpartition`` top-k.
+- ``ivf``: an inverted-file index. Jobs are clustered with spherical k-means
+  and a query only scores the jobs in its ``n_probe`` closest clusters.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first, without a full sort."""
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise ``top_k`` for a (queries x jobs) score matrix."""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    order = np.argsort(np.take_along_axis(scores, candidates, axis=1), axis=1)[:, ::-1]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class ExactSearch:
+    """Score every job; always returns the true top-k."""
+
+    name = "exact"
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.embeddings @ query.astype(np.float32, copy=False)
+        ids = top_k(scores, k)
+        return ids, scores[ids]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k for many queries from one (queries x jobs) similarity matrix."""
+        scores = (self.embeddings @ queries.astype(np.float32, copy=False).T).T
+        ids = top_k_rows(scores, k)
+        return ids, np.take_along_axis(scores, ids, axis=1)
+
+
+def _normalise(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Nearest centroid (by inner product) for every row, computed in chunks to bound memory."""
+    assignment = np.empty(embeddings.shape[0], dtype=np.int32)
+    for start in range(0, embeddings.shape[0], chunk_size):
+        block = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+        assignment[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def spherical_kmeans(data: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns normalised centroids."""
+    rng = np.random.default_rng(seed)
+    data = np.asarray(data, dtype=np.float32)
+    centroids = data[rng.choice(data.shape[0], n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignment = _assign(data, centroids)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        order = np.argsort(assignment, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(data[order], starts[nonempty], axis=0)
+
+        # Re-seed empty clusters with random points so every list stays useful
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            sums[empty] = data[rng.choice(data.shape[0], empty.size, replace=False)]
+        centroids = _normalise(sums)
+
+    return centroids
+
+
+class IVFSearch:
+    """
+    Approximate search with an inverted-file index.
+
+    ``n_lists`` defaults to roughly ``sqrt(N)`` clusters, trained on a sample of
+    ``train_per_list`` points per cluster. Higher ``n_probe`` trades latency
+    for recall; ``n_probe == n_lists`` is equivalent to exact search.
+    """
+
+    name = "ivf"
+
+    def __init__(self, embeddings: np.ndarray, n_lists: int = None, n_probe: int = 8,
+                 train_per_list: int = 32, n_iter: int = 10, seed: int = 0):
+        self.embeddings = embeddings
+        n = embeddings.shape[0]
+        if n_lists is None:
+            n_lists = int(np.sqrt(n))
+        self.n_lists = max(1, min(n_lists, n))
+        self.n_probe = max(1, min(n_probe, self.n_lists))
+
+        rng = np.random.default_rng(seed)
+        train_size = train_per_list * self.n_lists
+        sample = embeddings
+        if n > train_size:
+            sample = embeddings[np.sort(rng.choice(n, train_size, replace=False))]
+        self.centroids = spherical_kmeans(sample, self.n_lists, n_iter=n_iter, seed=seed)
+
+        # Inverted lists stored CSR-style: ids of list l are order[offsets[l]:offsets[l + 1]]
+        assignment = _assign(embeddings, self.centroids)
+        self.order = np.argsort(assignment, kind='stable').astype(np.int64)
+        self.offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=self.n_lists), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = query.astype(np.float32, copy=False)
+        lists = top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+        candidates.sort()  # sequential reads from the (memory-mapped) matrix
+
+        scores = self.embeddings[candidates] @ query
+        best = top_k(scores, k)
+        return candidates[best], scores[best]
+
+    def search_batch(self, queries: np.ndarray, k: int):
+        # Probed lists differ per query, so results are per-query arrays of possibly unequal length
+        results = [self.search(q, k) for q in queries]
+        return [r[0] for r in results], [r[1] for r in results]
+
+
+BACKENDS = {
+    ExactSearch.name: ExactSearch,
+    IVFSearch.name: IVFSearch,
+}
+
+
+def make_backend(name: str, embeddings: np.ndarray, **kwargs):
+    """Build the retrieval backend registered under ``name``."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown retrieval backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return backend_cls(embeddings, **kwargs)
@@ -0,0 +1,129 @@
+"""
+Single-pass multi-pattern skill matcher.
+
+All skill names (and their aliases) are compiled into one regular expression
+shaped like a trie, e.g. ``{go, golang, git}`` becomes ``g(?:o(?:lang|)|it)``
+with word-boundary checks at the ends. The regex engine then walks the text
+once, and at each position descends at most one trie branch, so the cost is
+linear in the text length and nearly independent of the taxonomy size.
+
+Boundaries only apply to word characters: ``go`` does not match inside
+``google`` and ``r`` does not match inside ``docker``, while ``c++`` still
+matches in ``c++17`` because its last character is not a word character.
+At a given position the longest skill wins (``c++`` over ``c``).
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Alternative spellings mapped to the canonical skill names used by ResumeParser
+SKILL_ALIASES = {
+    'node.js': 'nodejs',
+    'node js': 'nodejs',
+    'k8s': 'kubernetes',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'sklearn': 'scikit-learn',
+    'scikit learn': 'scikit-learn',
+    'react.js': 'react',
+    'reactjs': 'react',
+    'vue.js': 'vue',
+    'vuejs': 'vue',
+    'angularjs': 'angular',
+    'express.js': 'express',
+    'expressjs': 'express',
+    'cpp': 'c++',
+    'c sharp': 'c#',
+    'ci cd': 'ci/cd',
+    'amazon web services': 'aws',
+    'google cloud platform': 'gcp',
+    'google cloud': 'gcp',
+    'microsoft azure': 'azure',
+    'mongo db': 'mongodb',
+    'shell scripting': 'bash',
+}
+
+_END = ''  # trie key marking the end of a pattern
+
+
+def _normalise(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_regex(node: Dict) -> str:
+    """Emit a regex for a trie node; longer continuations are tried before ending here."""
+    branches = []
+    for ch in sorted(k for k in node if k != _END):
+        piece = r'\s+' if ch == ' ' else re.escape(ch)
+        branches.append(piece + _trie_regex(node[ch]))
+    if _END in node:
+        # Word-final patterns must not run into a following word character
+        branches.append(r'(?!\w)' if node[_END] else '')
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+class SkillMatcher:
+    """Find skills from a fixed taxonomy in free text in one pass."""
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        self.skills = list(dict.fromkeys(skills))
+        self._rank = {_normalise(s): i for i, s in reversed(list(enumerate(self.skills)))}
+
+        # Surface form -> canonical skill; aliases only count if their target is in the taxonomy
+        self.lookup = {_normalise(s): s for s in reversed(self.skills)}
+        for alias, target in (aliases or {}).items():
+            canonical = self.lookup.get(_normalise(target))
+            if canonical is not None:
+                self.lookup.setdefault(_normalise(alias), canonical)
+
+        self.pattern = self._compile(self.lookup)
+
+    @staticmethod
+    def _compile(forms: Iterable[str]) -> Optional[re.Pattern]:
+        word_start, other_start = {}, {}
+        for form in forms:
+            if not form:
+                continue
+            node = word_start if _is_word_char(form[0]) else other_start
+            for ch in form:
+                node = node.setdefault(ch, {})
+            node[_END] = _is_word_char(form[-1])
+
+        alternatives = []
+        if word_start:
+            alternatives.append(r'(?<!\w)' + _trie_regex(word_start))
+        if other_start:
+            alternatives.append(_trie_regex(other_start))
+        if not alternatives:
+            return None
+        return re.compile('|'.join(alternatives))
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """All non-overlapping matches as (start, end, canonical skill), leftmost-longest."""
+        if self.pattern is None:
+            return []
+        return [
+            (m.start(), m.end(), self.lookup[' '.join(m.group().split())])
+            for m in self.pattern.finditer(text.lower())
+        ]
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skills found in ``text``, in taxonomy order."""
+        found = {skill for _, _, skill in self.find(text)}
+        return sorted(found, key=lambda s: self._rank[_normalise(s)])
+
+
+@lru_cache(maxsize=8)
+def _cached_matcher(skills: Tuple[str, ...], aliases: Tuple[Tuple[str, str], ...]) -> SkillMatcher:
+    return SkillMatcher(skills, dict(aliases))
+
+
+def get_skill_matcher(skills: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> SkillMatcher:
+    """Compiled matcher for a taxonomy, shared between parser instances."""
+    return _cached_matcher(tuple(skills), tuple(sorted((aliases or {}).items())))
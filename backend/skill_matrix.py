@@ -0,0 +1,91 @@
+"""
+Job x skill incidence matrix for vectorised skill-gap scoring.
+
+The catalogue's ``required_skills`` are compiled once into a normalised
+vocabulary (lowercased, aliases folded onto the canonical names used by
+ResumeParser) and a sparse binary CSR matrix with one row per job. A resume
+becomes a dense 0/1 vector over the same vocabulary, so the number of
+required skills a resume covers is one sparse mat-vec for every job at once:
+
+    matched  = M @ have              (skills covered, per job)
+    coverage = matched / required    (fraction covered, per job)
+
+Missing skills are only listed for the jobs actually returned, by reading
+their CSR row against the resume vector.
+
+With ``similar`` (skill -> equivalent skills, see skill_similarity.py) a
+resume skill also sets the columns of its equivalents, so coverage and gaps
+treat e.g. "torch" as covering "pytorch".
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from skill_matcher import SKILL_ALIASES
+
+
+def normalize_skill(skill: str) -> str:
+    skill = ' '.join(skill.lower().split())
+    return SKILL_ALIASES.get(skill, skill)
+
+
+class SkillMatrix:
+    def __init__(self, jobs: List[Dict], similar: Optional[Dict[str, List[str]]] = None):
+        self.similar = similar or {}
+        self.vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        for job in jobs:
+            columns = []
+            for skill in job.get('required_skills', []):
+                column = self.vocabulary.setdefault(normalize_skill(skill), len(self.vocabulary))
+                if column not in columns:
+                    columns.append(column)
+            indices.extend(columns)
+            indptr.append(len(indices))
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(jobs), len(self.vocabulary)),
+        )
+        self.required_counts = np.diff(self.matrix.indptr).astype(np.float32)
+        self._jobs = jobs
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def resume_vector(self, skills: Iterable[str]) -> np.ndarray:
+        """0/1 vector over the vocabulary (skills and their equivalents); skills no job asks for are ignored."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for skill in skills:
+            skill = normalize_skill(skill)
+            for name in (skill, *self.similar.get(skill, ())):
+                column = self.vocabulary.get(name)
+                if column is not None:
+                    vector[column] = 1.0
+        return vector
+
+    def coverage(self, have: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fraction of each job's required skills present in ``have``: a vector
+        for one resume, or a (jobs x resumes) matrix for a (resumes x vocab)
+        batch. Jobs with no required skills count as fully covered. With
+        ``rows``, only those jobs are scored (in that order).
+        """
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        counts = self.required_counts if rows is None else self.required_counts[rows]
+        matched = matrix @ (have.T if have.ndim == 2 else have)
+        counts = counts if have.ndim == 1 else counts[:, None]
+        return np.divide(matched, counts, out=np.ones_like(matched), where=counts > 0)
+
+    def missing(self, job_id: int, have: np.ndarray) -> List[str]:
+        """Required skills of one job not in ``have``, lowercased, in the job's order."""
+        missing = []
+        seen = set()
+        for skill in self._jobs[job_id].get('required_skills', []):
+            column = self.vocabulary[normalize_skill(skill)]
+            if not have[column] and column not in seen:
+                seen.add(column)
+                missing.append(skill.lower())
+        return missing
@@ -0,0 +1,205 @@
+"""
+Precomputed nearest-neighbour table over skill names.
+
+Skill coverage compares normalised names exactly, so "pytorch" and "torch",
+or "incident management" and "incident response", count as different skills.
+Here the skill vocabulary (the parser's keywords plus every job's
+``required_skills``, normalised like skill_matrix.py does) is embedded once
+and each skill's ``k`` most similar skills are stored with their cosine
+similarity:
+
+- ``embeddings.npy``: one normalised row per skill, reused across rebuilds
+  so only skills new to the catalogue are encoded
+- ``neighbours.npy`` / ``scores.npy``: (skills x k) neighbour ids and scores
+- ``manifest.json``: the model and the skill list the rows belong to
+
+At request time nothing is encoded: ``equivalents(threshold)`` turns the
+table into a skill -> similar skills lookup, which SkillMatrix uses to count
+a job skill as covered when the resume has the skill or an equivalent one.
+
+Usage (inspect the table to choose a threshold):
+    python skill_similarity.py pytorch "incident management"
+"""
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from skill_matrix import normalize_skill
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+NEIGHBOURS_FILE = "neighbours.npy"
+SCORES_FILE = "scores.npy"
+LOCK_FILE = ".lock"
+DEFAULT_K = 10
+# Names this short ("c", "r", "c#") embed unreliably; they only match exactly
+MIN_SIMILAR_LENGTH = 3
+BLOCK_ROWS = 1024
+
+
+def skill_vocabulary(jobs: List[Dict], keywords: Iterable[str]) -> List[str]:
+    """Normalised skill names from the parser's keywords and the jobs' required skills."""
+    skills = [normalize_skill(s) for s in keywords]
+    skills += [normalize_skill(s) for job in jobs for s in job.get('required_skills', [])]
+    return list(dict.fromkeys(s for s in skills if s))
+
+
+def _write_atomic(path: str, write):
+    """Write via a uniquely named temporary sibling and rename (see job_index.py)."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _save(path: str, array: np.ndarray):
+    _write_atomic(path, lambda f: np.save(f, array))
+
+
+@contextmanager
+def _file_lock(table_dir: str):
+    """Exclusive lock across processes loading or rebuilding the same table."""
+    with open(os.path.join(table_dir, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def nearest(embeddings: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k (ids, cosine scores) per row among the other rows, computed blockwise."""
+    n = len(embeddings)
+    k = min(k, n - 1)
+    neighbours = np.zeros((n, max(k, 0)), dtype=np.int32)
+    scores = np.zeros((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return neighbours, scores
+    for start in range(0, n, BLOCK_ROWS):
+        block = embeddings[start:start + BLOCK_ROWS] @ embeddings.T
+        block[np.arange(len(block)), np.arange(start, start + len(block))] = -np.inf  # not its own neighbour
+        top = np.argpartition(block, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbours[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + len(block)] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbours, scores
+
+
+class SkillSimilarity:
+    def __init__(self, skills: List[str], neighbours: np.ndarray, scores: np.ndarray):
+        self.skills = skills
+        self.ids = {skill: i for i, skill in enumerate(skills)}
+        self.neighbours = neighbours
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def similar(self, skill: str) -> List[Tuple[str, float]]:
+        """The stored neighbours of one skill, most similar first."""
+        i = self.ids.get(normalize_skill(skill))
+        if i is None:
+            return []
+        return [(self.skills[j], round(float(s), 4)) for j, s in zip(self.neighbours[i], self.scores[i])]
+
+    def equivalents(self, threshold: float) -> Dict[str, List[str]]:
+        """
+        Skill -> skills at least ``threshold`` similar to it. Symmetric: a
+        pair counts if either skill has the other among its top-k.
+        """
+        pairs: Dict[str, Dict[str, None]] = {}
+        rows, columns = np.nonzero(self.scores >= threshold)
+        for i, j in zip(rows.tolist(), self.neighbours[rows, columns].tolist()):
+            a, b = self.skills[i], self.skills[j]
+            if len(a) < MIN_SIMILAR_LENGTH or len(b) < MIN_SIMILAR_LENGTH:
+                continue
+            pairs.setdefault(a, {})[b] = None
+            pairs.setdefault(b, {})[a] = None
+        return {skill: list(similar) for skill, similar in pairs.items()}
+
+    @classmethod
+    def load_or_build(cls, skills: List[str], model, model_name: str, table_dir: str = "skill_similarity",
+                      k: int = DEFAULT_K) -> "SkillSimilarity":
+        """
+        Load the table from ``table_dir`` when it was built for the same model,
+        skills and ``k``; otherwise encode the skills not embedded yet and
+        recompute the neighbours. The manifest is read under a file lock, so
+        processes sharing ``table_dir`` rebuild it once between them.
+        """
+        os.makedirs(table_dir, exist_ok=True)
+        with _file_lock(table_dir):
+            return cls._load_or_build(skills, model, model_name, table_dir, k)
+
+    @classmethod
+    def _load_or_build(cls, skills: List[str], model, model_name: str, table_dir: str, k: int) -> "SkillSimilarity":
+        manifest_path = os.path.join(table_dir, MANIFEST_FILE)
+        manifest = None
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = None
+
+        paths = {name: os.path.join(table_dir, name) for name in (EMBEDDINGS_FILE, NEIGHBOURS_FILE, SCORES_FILE)}
+        usable = manifest is not None and manifest.get('model') == model_name and all(map(os.path.exists, paths.values()))
+        if usable and manifest['skills'] == skills and manifest.get('k') == k:
+            return cls(skills, np.load(paths[NEIGHBOURS_FILE], mmap_mode='r'), np.load(paths[SCORES_FILE], mmap_mode='r'))
+
+        cached = {}
+        if usable:
+            old = np.load(paths[EMBEDDINGS_FILE], mmap_mode='r')
+            if len(old) == len(manifest['skills']):
+                cached = {skill: row for row, skill in enumerate(manifest['skills'])}
+        missing = [skill for skill in skills if skill not in cached]
+        print(f"Skill similarity: {len(skills) - len(missing)} skills cached, {len(missing)} to encode")
+
+        dim = model.get_sentence_embedding_dimension()
+        embeddings = np.zeros((len(skills), dim), dtype=np.float32)
+        if missing:
+            new = np.asarray(model.encode(missing, convert_to_numpy=True, normalize_embeddings=True), dtype=np.float32)
+            new_rows = dict(zip(missing, new))
+        for i, skill in enumerate(skills):
+            embeddings[i] = new_rows[skill] if skill not in cached else old[cached[skill]]
+
+        neighbours, scores = nearest(embeddings, k)
+        _save(paths[EMBEDDINGS_FILE], embeddings)
+        _save(paths[NEIGHBOURS_FILE], neighbours)
+        _save(paths[SCORES_FILE], scores)
+        manifest = {'model': model_name, 'k': k, 'skills': skills}
+        _write_atomic(manifest_path, lambda f: f.write(json.dumps(manifest).encode('utf-8')))
+        return cls(skills, neighbours, scores)
+
+
+def main():
+    import argparse
+    from matcher import get_skill_similarity, load_jobs
+    ap = argparse.ArgumentParser(description="Show the nearest skills stored in the similarity table.")
+    ap.add_argument("skills", nargs="*", help="skills to look up (default: every skill with an equivalent)")
+    ap.add_argument("--threshold", type=float, default=None, help="only list equivalents at or above this score")
+    args = ap.parse_args()
+
+    table = get_skill_similarity(load_jobs())
+    if args.threshold is not None and not args.skills:
+        for skill, similar in sorted(table.equivalents(args.threshold).items()):
+            print(f"{skill}: {', '.join(similar)}")
+        return
+    for skill in args.skills or table.skills:
+        neighbours = [(s, score) for s, score in table.similar(skill)
+                      if args.threshold is None or score >= args.threshold]
+        print(f"{skill}: " + ', '.join(f"{s} ({score:.2f})" for s, score in neighbours))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Durable queue for asynchronous uploads.
+
+``POST /upload?async=1`` stores the PDF and its match options as a task in a
+SQLite database and answers at once with the task id. Worker processes
+(``TaskWorkers``) parse, encode and match queued tasks and store each result
+with its task; clients poll ``GET /results/<id>`` or follow
+``GET /results/<id>/events`` (server-sent events). Nothing but SQLite is
+involved, and tasks survive restarts.
+
+A task moves queued -> running -> done | failed:
+
+- a worker claims the oldest ready task with a single UPDATE and holds a
+  lease on it for ``timeout`` seconds; the supervisor kills a worker that
+  outlives its lease and the task fails as timed out
+- a task whose worker died is requeued by the supervisor; one whose
+  supervisor went too (server restart) is claimed again once its lease has
+  run out
+- errors while encoding or matching are retried up to ``max_attempts`` times
+  with exponential backoff; documents that cannot be parsed fail at once
+- the PDF is dropped when a task finishes, and finished tasks are deleted
+  after ``retention`` seconds
+
+Workers are separate interpreters, so they load their own model and never
+share the API process's GIL. The server entry points (``python app.py``,
+asgi.py) start ``TASK_WORKERS`` of them through ``app.start_task_workers()``;
+importing the app starts none. Set it to 0, or serve the app some other way
+(e.g. gunicorn), and run them against the same database instead:
+    python task_queue.py --workers 4
+"""
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+# A running task is only reclaimed this long after its lease ran out, so the
+# supervisor that owns the worker records the timeout first
+LEASE_GRACE_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    payload BLOB,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+"""
+
+
+class QueueFull(Exception):
+    """Too many tasks are waiting; the client should retry later."""
+
+
+class TaskFailed(Exception):
+    """A task that cannot succeed on retry (unreadable document, nothing to match)."""
+
+
+def upload_response(parsed_data: Dict, matched: Dict) -> Dict:
+    """The /upload response body for a parsed resume and its ``match_jobs`` result."""
+    jobs = matched['matched_jobs']
+    return {
+        "name": parsed_data['contact_info']['name'],
+        "skills": parsed_data['skills'],
+        "summary": parsed_data['summary'],
+        "matched_job_titles": [job['title'] for job in jobs],
+        "sim_scores": [job['score'] for job in jobs],
+        "req_skills": [job['required_skills'] for job in jobs],
+        "missing_skills": [job['missing_skills'] for job in jobs],
+        "duplicate_job_titles": [[d['title'] for d in job['duplicates']] for job in jobs],
+    }
+
+
+class TaskQueue:
+    def __init__(self, path: str = "tasks.db", max_attempts: int = 3, retry_backoff: float = 2.0,
+                 max_queued: int = 1000):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_queued = max_queued
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        One connection per thread; WAL lets status polls proceed while a worker
+        commits. The database is created on first use, not on construction.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, payload: bytes, params: Dict) -> str:
+        """Store a task and return its id; raises QueueFull past ``max_queued`` waiting tasks."""
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            # One statement, so concurrent enqueues cannot both pass the limit check
+            inserted = conn.execute(
+                "INSERT INTO tasks (id, status, params, payload, available_at, created_at, updated_at) "
+                "SELECT ?, 'queued', ?, ?, ?, ?, ? "
+                "WHERE (SELECT COUNT(*) FROM tasks WHERE status = 'queued') < ?",
+                (task_id, json.dumps(params), payload, now, now, now, self.max_queued),
+            ).rowcount
+        if not inserted:
+            raise QueueFull(f"{self.max_queued} uploads are waiting to be processed; retry later")
+        return task_id
+
+    def claim(self, worker: str, timeout: float) -> Optional[Tuple[str, bytes, Dict]]:
+        """
+        Take the oldest ready task, or one whose worker was lost, as ``worker``;
+        returns (id, payload, params) or None when nothing is ready.
+        """
+        while True:
+            now = time.time()
+            with self._connection() as conn:
+                row = conn.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, "
+                    "lease_until = ?, updated_at = ? "
+                    "WHERE id = (SELECT id FROM tasks WHERE (status = 'queued' AND available_at <= ?) "
+                    "            OR (status = 'running' AND lease_until < ?) ORDER BY available_at LIMIT 1) "
+                    "RETURNING id, payload, params, attempts",
+                    (worker, now + timeout, now, now, now - LEASE_GRACE_SECONDS),
+                ).fetchone()
+            if row is None:
+                return None
+            if row['attempts'] <= self.max_attempts:
+                return row['id'], row['payload'], json.loads(row['params'])
+            self.fail(row['id'], worker, f"Gave up after {self.max_attempts} attempts (worker lost)", retry=False)
+
+    def complete(self, task_id: str, worker: str, result: Dict) -> bool:
+        with self._connection() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, payload = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (json.dumps(result), time.time(), task_id, worker),
+            ).rowcount
+        return updated == 1
+
+    def fail(self, task_id: str, worker: str, error: str, retry: bool) -> bool:
+        """Record a failed attempt: requeue with backoff while attempts remain and ``retry`` is set."""
+        now = time.time()
+        with self._connection() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET "
+                "status = CASE WHEN ? AND attempts < ? THEN 'queued' ELSE 'failed' END, "
+                "payload = CASE WHEN ? AND attempts < ? THEN payload END, "
+                "available_at = ? + ? * (1 << (attempts - 1)), "
+                "lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (retry, self.max_attempts, retry, self.max_attempts, now, self.retry_backoff,
+                 error, now, task_id, worker),
+            ).rowcount
+        return updated == 1
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        """Status of one task, with its result once done or its error once failed."""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, status, result, error, attempts, available_at, created_at, updated_at "
+            "FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        task = {key: row[key] for key in ('id', 'status', 'attempts', 'created_at', 'updated_at')}
+        if row['status'] == 'queued':
+            task['position'] = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = 'queued' AND available_at < ?",
+                (row['available_at'],)).fetchone()[0]
+        if row['status'] == 'done':
+            task['result'] = json.loads(row['result'])
+        elif row['error'] is not None:
+            task['error'] = row['error']  # for a queued task: why the last attempt failed
+        return task
+
+    def expired(self) -> List[Tuple[str, str]]:
+        """(id, worker) of running tasks past their lease."""
+        rows = self._connection().execute(
+            "SELECT id, worker FROM tasks WHERE status = 'running' AND lease_until < ?", (time.time(),)).fetchall()
+        return [(row['id'], row['worker']) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {**{status: 0 for status in STATUSES}, **{row[0]: row[1] for row in rows}}
+
+    def fail_worker(self, worker: str, error: str) -> bool:
+        """Requeue (or fail, when out of attempts) the task a dead worker was running."""
+        row = self._connection().execute("SELECT id FROM tasks WHERE worker = ? AND status = 'running'",
+                                         (worker,)).fetchone()
+        return row is not None and self.fail(row['id'], worker, error, retry=True)
+
+    def purge(self, older_than: float) -> int:
+        """Delete tasks that finished more than ``older_than`` seconds ago."""
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM tasks WHERE status IN ('done', 'failed') AND updated_at < ?",
+                                (time.time() - older_than,)).rowcount
+
+
+def _process_upload(parser, pdf_bytes: bytes, params: Dict, max_pages: int, store_resumes: bool) -> Dict:
+    from matcher import encode_resume, get_resume_index, match_jobs
+    from result_cache import content_key
+
+    try:
+        parsed_data = parser.parse_resume(pdf_bytes, max_pages=max_pages).to_dict()
+    except Exception as e:
+        raise TaskFailed(str(e)) from e
+    resume_embedding = encode_resume(parsed_data)
+    if store_resumes and resume_embedding is not None:
+        get_resume_index().add(content_key(pdf_bytes), parsed_data, resume_embedding)
+    matched = match_jobs(parsed_data, top_n=params['top_n'], resume_embedding=resume_embedding,
+                         filters=params.get('filters'))
+    if 'error' in matched:
+        raise TaskFailed(matched['error'])
+    return upload_response(parsed_data, matched)
+
+
+def run_worker(path: str, worker: str, timeout: float, max_attempts: int, max_pages: int,
+               store_resumes: bool, poll_interval: float = 0.5):
+    """Claim and process tasks until SIGTERM; the task in progress is finished first."""
+    from resume_parser import ResumeParser
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole group; the supervisor stops us
+    queue = TaskQueue(path, max_attempts=max_attempts)
+    parser = ResumeParser()
+    while not stopping:
+        task = queue.claim(worker, timeout)
+        if task is None:
+            time.sleep(poll_interval)
+            continue
+        task_id, pdf_bytes, params = task
+        print(f"Task {task_id}: processing {params.get('filename')}")
+        try:
+            result = _process_upload(parser, pdf_bytes, params, max_pages, store_resumes)
+        except TaskFailed as e:
+            queue.fail(task_id, worker, str(e), retry=False)
+        except Exception as e:
+            print(f"Task {task_id}: attempt failed: {e}")
+            queue.fail(task_id, worker, f"{type(e).__name__}: {e}", retry=True)
+        else:
+            queue.complete(task_id, worker, result)
+
+
+class TaskWorkers:
+    """
+    ``workers`` worker processes on a queue database: exited workers are
+    restarted, workers that outlive their task's lease are killed, and
+    finished tasks are purged after ``retention`` seconds.
+    """
+
+    def __init__(self, path: str = "tasks.db", workers: int = 2, timeout: float = 120.0, max_attempts: int = 3,
+                 max_pages: int = 20, store_resumes: bool = True, retention: float = 24 * 3600,
+                 check_interval: float = 1.0):
+        self.queue = TaskQueue(path, max_attempts=max_attempts)
+        self.timeout = timeout
+        self.retention = retention
+        self.check_interval = check_interval
+        self.workers = workers
+        self._command = [sys.executable, os.path.abspath(__file__), '--db', path, '--timeout', str(timeout),
+                         '--max-attempts', str(max_attempts), '--max-pages', str(max_pages)]
+        if not store_resumes:
+            self._command.append('--no-store-resumes')
+        # Workers share the CPUs; without a setting each would size its thread pool to all of them
+        self._env = dict(os.environ)
+        self._env.setdefault('ENCODER_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._stop = threading.Event()
+        for _ in range(workers):
+            self._spawn()
+        self._supervisor = threading.Thread(target=self._supervise, name="task-workers", daemon=True)
+        self._supervisor.start()
+
+    def _spawn(self):
+        worker = f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._processes[worker] = subprocess.Popen(self._command + ['--worker', worker], env=self._env)
+
+    def _supervise(self):
+        last_purge = 0.0
+        while not self._stop.wait(self.check_interval):
+            try:  # a failed check (locked database, failed spawn) must not end supervision
+                self._check()
+                if time.monotonic() - last_purge > 60:
+                    self.queue.purge(self.retention)
+                    last_purge = time.monotonic()
+            except Exception as e:
+                print(f"Task workers: supervision check failed: {type(e).__name__}: {e}")
+
+    def _check(self):
+        for task_id, worker in self.queue.expired():
+            process = self._processes.get(worker)
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+                self.queue.fail(task_id, worker, f"Processing exceeded the {self.timeout:g}s timeout",
+                                retry=False)
+        for worker, process in list(self._processes.items()):
+            if process.poll() is not None and not self._stop.is_set():
+                self.queue.fail_worker(worker, f"Worker exited with code {process.returncode}")
+                del self._processes[worker]
+        while len(self._processes) < self.workers and not self._stop.is_set():
+            self._spawn()  # a spawn that fails here is retried on the next check
+
+    def close(self, grace: float = 10.0):
+        """Stop the workers, letting each finish its current task for up to ``grace`` seconds."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._supervisor.join()
+        for process in self._processes.values():
+            process.terminate()
+        deadline = time.monotonic() + grace
+        for process in self._processes.values():
+            try:
+                process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()  # its task is reclaimed once the lease runs out
+                process.wait()
+        self._processes.clear()
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Process queued uploads (see the module docstring).")
+    ap.add_argument("--db", default=os.environ.get("TASK_DB", "tasks.db"))
+    ap.add_argument("--workers", type=int, default=int(os.environ.get("TASK_WORKERS", 2)) or 2)
+    ap.add_argument("--timeout", type=float, default=float(os.environ.get("TASK_TIMEOUT", 120)))
+    ap.add_argument("--max-attempts", type=int, default=int(os.environ.get("TASK_MAX_ATTEMPTS", 3)))
+    ap.add_argument("--max-pages", type=int, default=int(os.environ.get("PARSE_MAX_PAGES", 20)))
+    ap.add_argument("--no-store-resumes", action="store_true", help="don't add resumes to the resume index")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)  # run a single worker (used by TaskWorkers)
+    args = ap.parse_args()
+
+    if args.worker:
+        run_worker(args.db, args.worker, args.timeout, args.max_attempts, args.max_pages,
+                   store_resumes=not args.no_store_resumes)
+        return
+    workers = TaskWorkers(args.db, args.workers, args.timeout, args.max_attempts, args.max_pages,
+                          store_resumes=not args.no_store_resumes)
+    print(f"{args.workers} workers processing {args.db}; Ctrl+C to stop")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        workers.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Background catalogue reloads: a failing revision is retried with backoff."""
+import types
+
+import pytest
+
+
+class Store:
+    def __init__(self, revision):
+        self._revision = revision
+
+    def revision(self):
+        return self._revision
+
+
+@pytest.fixture
+def store():
+    return Store(2)
+
+
+@pytest.fixture
+def matcher(monkeypatch, store):
+    matcher = pytest.importorskip('matcher')
+    monkeypatch.setattr(matcher, 'get_job_store', lambda: store)
+    monkeypatch.setattr(matcher, '_catalogue', types.SimpleNamespace(revision=1))
+    monkeypatch.setattr(matcher, '_reload_thread', None)
+    monkeypatch.setattr(matcher, '_reload_failure', None)
+    return matcher
+
+
+def failing_build(builds):
+    def build():
+        builds.append(1)
+        raise RuntimeError("model unavailable")
+    return build
+
+
+def test_failed_reload_is_not_restarted_on_every_call(matcher, store, monkeypatch):
+    builds = []
+    monkeypatch.setattr(matcher, '_build_catalogue', failing_build(builds))
+    stale = matcher._catalogue
+    assert matcher.get_catalogue(wait=True) is stale
+    for _ in range(20):
+        assert matcher.get_catalogue() is stale
+        assert matcher.get_catalogue(wait=True) is stale
+    assert len(builds) == 1
+
+    # A new revision is tried at once, and a later success replaces the snapshot
+    fresh = types.SimpleNamespace(revision=3, index=[], duplicates={})
+    monkeypatch.setattr(matcher, '_build_catalogue', lambda: fresh)
+    store._revision = 3
+    assert matcher.get_catalogue(wait=True) is fresh
+    assert matcher._reload_failure is None
+
+
+def test_failed_revision_is_retried_after_backoff(matcher, monkeypatch):
+    builds = []
+    monkeypatch.setattr(matcher, '_build_catalogue', failing_build(builds))
+    matcher.get_catalogue(wait=True)
+    assert matcher._reload_failure[:2] == (2, 1)
+
+    monkeypatch.setattr(matcher, '_reload_failure', (2, 1, 0))  # backoff elapsed
+    matcher.get_catalogue(wait=True)
+    assert matcher._reload_failure[:2] == (2, 2)
+    assert len(builds) == 2
@@ -0,0 +1,44 @@
+"""Near-duplicate postings are only collapsed when MATCH_DEDUP_THRESHOLD asks for it."""
+import importlib
+
+import pytest
+
+JOBS = [{'id': str(i), 'title': f'Cloud Engineer #{i}', 'description': 'We are seeking a Cloud Engineer '
+         'proficient in aws, docker, terraform.', 'required_skills': ['aws', 'docker', 'terraform']}
+        for i in range(3)]
+
+
+class Store:
+    def revision(self):
+        return 1
+
+    def all(self):
+        return JOBS
+
+
+@pytest.fixture
+def matcher(monkeypatch):
+    monkeypatch.delenv('MATCH_DEDUP_THRESHOLD', raising=False)
+    matcher = importlib.reload(pytest.importorskip('matcher'))
+    yield matcher
+    monkeypatch.undo()
+    importlib.reload(matcher)
+
+
+def test_dedup_is_off_by_default(matcher, monkeypatch):
+    monkeypatch.setattr(matcher, 'get_job_store', Store)
+    monkeypatch.setattr(matcher, 'get_model', lambda: None)
+    monkeypatch.setattr(matcher.JobIndex, 'load_or_build', classmethod(lambda cls, jobs, *args, **kwargs: jobs))
+
+    catalogue = matcher._build_catalogue()
+    assert catalogue.index == JOBS
+    assert catalogue.duplicates == {}
+
+
+def test_postings_with_different_skills_are_not_duplicates():
+    from dedup import find_duplicates
+    jobs = [dict(job) for job in JOBS]
+    jobs[1]['required_skills'] = ['AWS', 'Docker', 'terraform']  # same skills, other spelling
+    jobs[2]['required_skills'] = ['aws', 'docker', 'terraform', 'kubernetes']
+    clusters = find_duplicates(jobs, threshold=0.5)
+    assert clusters.members == {0: [0, 1], 2: [2]}
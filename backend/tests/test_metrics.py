@@ -0,0 +1,9 @@
+"""Prometheus text rendering."""
+from metrics import Counter
+
+
+def test_counters_render_exact_values():
+    counter = Counter("uploads_total", "Uploads.", labels=("status",))
+    counter.inc("200", amount=1234567)
+    counter.inc("500", amount=0.5)
+    assert counter.render()[2:] == ['uploads_total{status="200"} 1234567', 'uploads_total{status="500"} 0.5']
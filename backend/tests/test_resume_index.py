@@ -0,0 +1,70 @@
+"""Resume index storage: compaction into the columnar table, the layout upgrade and migration."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+import resume_index
+from resume_index import IndexStale, ResumeIndex
+
+
+def resume(name, skills):
+    return {'contact_info': {'name': name}, 'skills': skills, 'education': [], 'experience': [],
+            'summary': f"{name} resume"}
+
+
+def embedding(i, dim=4):
+    row = np.zeros(dim, dtype=np.float32)
+    row[i % dim] = 1
+    return row
+
+
+def test_compacted_records_are_still_searched(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_index, 'COMPACT_MIN_RECORDS', 3)
+    index = ResumeIndex(str(tmp_path), version='test', dim=4)
+    other = ResumeIndex(str(tmp_path), version='test', dim=4)
+    for i, name in enumerate(['ada', 'grace', 'linus', 'guido']):
+        assert index.add(name, resume(name, ['Python', 'python'] if i == 1 else ['sql']), embedding(i))
+    assert not index.add('ada', resume('ada', []), embedding(0))
+
+    assert sorted(os.listdir(tmp_path)) == ['.lock', 'embeddings.f32', 'manifest.json',
+                                            'records.2.jsonl', 'records.2.rsm']
+    assert len(index._table_keys) == 3 and len(index._log) == 1
+    for reader in (index, other):
+        top = reader.search(embedding(1), ['python'], top_n=2, skill_weight=0.5)
+        assert [c['key'] for c in top] == ['grace', 'guido']
+        assert top[0]['skill_coverage'] == 100.0 and top[1]['missing_skills'] == ['python']
+        assert len(reader) == 4 and 'linus' in reader
+
+
+def test_layout_1_index_is_upgraded(tmp_path):
+    records = [dict(resume(name, ['sql']), key=name, added_at=1.0) for name in ['ada', 'grace']]
+    with open(tmp_path / 'records.jsonl', 'w') as f:
+        f.writelines(json.dumps(r) + '\n' for r in records)
+    (tmp_path / 'embeddings.f32').write_bytes(np.stack([embedding(0), embedding(1)]).tobytes())
+    (tmp_path / 'manifest.json').write_text(json.dumps({'version': 'test', 'dim': 4}))
+
+    index = ResumeIndex(str(tmp_path), version='test', dim=4)
+    assert not (tmp_path / 'records.jsonl').exists()
+    assert [c['key'] for c in index.search(embedding(1), ['sql'], top_n=1)] == ['grace']
+
+
+def test_stale_index_is_migrated_offline(tmp_path):
+    old = ResumeIndex(str(tmp_path), version='old', dim=4)
+    old.add('ada', resume('ada', ['sql']), embedding(0))
+    old.add('grace', dict(resume('grace', ['sql']), text='grace hopper'), embedding(1))
+
+    index = ResumeIndex(str(tmp_path), version='new', dim=3)
+    assert index.stale
+    with pytest.raises(IndexStale):
+        index.search(embedding(0, dim=3), [])
+    assert index.add('linus', dict(resume('linus', ['c']), text='linus torvalds'), embedding(2, dim=3))
+
+    reencode = lambda record: embedding(len(record['text']), dim=3)
+    with pytest.raises(ValueError, match='no text'):
+        index.migrate(reencode, needs_text=True)
+    assert index.migrate(reencode, needs_text=True, drop_incomplete=True) == 2
+    old.refresh()
+    assert not index.stale and old.stale
+    assert [c['key'] for c in index.search(embedding(len('grace hopper'), dim=3), [], top_n=1)] == ['grace']
@@ -0,0 +1,36 @@
+"""Similar skill names only count as equivalent when MATCH_SKILL_SIMILARITY asks for it."""
+import importlib
+
+import pytest
+
+JOBS = [{'id': '1', 'title': 'ML Engineer', 'description': 'Train models', 'required_skills': ['pytorch']}]
+
+
+class Store:
+    def revision(self):
+        return 1
+
+    def all(self):
+        return JOBS
+
+
+@pytest.fixture
+def matcher(monkeypatch):
+    monkeypatch.delenv('MATCH_SKILL_SIMILARITY', raising=False)
+    matcher = importlib.reload(pytest.importorskip('matcher'))
+    yield matcher
+    monkeypatch.undo()
+    importlib.reload(matcher)
+
+
+def test_skill_similarity_is_off_by_default(matcher, monkeypatch):
+    def unexpected(jobs):
+        raise AssertionError("the skill-similarity table was built")
+
+    monkeypatch.setattr(matcher, 'get_job_store', Store)
+    monkeypatch.setattr(matcher, 'get_model', lambda: None)
+    monkeypatch.setattr(matcher.JobIndex, 'load_or_build', classmethod(lambda cls, jobs, *args, **kwargs: jobs))
+    monkeypatch.setattr(matcher, 'get_skill_similarity', unexpected)
+
+    catalogue = matcher._build_catalogue()
+    assert catalogue.similar_skills is None
@@ -0,0 +1,56 @@
+"""Upload task supervision and the event stream limit."""
+import threading
+import time
+
+import pytest
+
+from task_queue import TaskWorkers
+
+
+class Running:
+    def poll(self):
+        return None
+
+    def terminate(self):
+        pass
+
+    def wait(self, timeout=None):
+        return 0
+
+
+def test_supervisor_survives_a_failed_check(tmp_path, monkeypatch):
+    monkeypatch.setattr(TaskWorkers, '_spawn', lambda self: self._processes.setdefault(str(len(self._processes)),
+                                                                                        Running()))
+    workers = TaskWorkers(str(tmp_path / 'tasks.db'), workers=1, check_interval=0.01)
+    calls = []
+
+    def expired():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return []
+
+    monkeypatch.setattr(workers.queue, 'expired', expired)
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    workers.close()
+    assert len(calls) >= 3
+
+
+def test_event_streams_are_capped(tmp_path, monkeypatch):
+    app = pytest.importorskip('app')
+    monkeypatch.setattr(app, '_sse_streams', threading.BoundedSemaphore(1))
+    task_id = app.task_queue.enqueue(b'%PDF', {'top_n': 5})
+    client = app.app.test_client()
+
+    first = client.get(f'/results/{task_id}/events', buffered=False)
+    assert first.status_code == 200
+    second = client.get(f'/results/{task_id}/events')
+    assert second.status_code == 503
+    assert second.get_json()['results_url'] == f'/results/{task_id}'
+
+    first.close()  # a closed stream frees its slot
+    third = client.get(f'/results/{task_id}/events', buffered=False)
+    assert third.status_code == 200
+    third.close()
@@ -0,0 +1,46 @@
+"""top_n bounds of the candidate search and its endpoints."""
+import numpy as np
+import pytest
+
+from resume_index import ResumeIndex
+
+
+def resume(name, skills):
+    return {'contact_info': {'name': name}, 'skills': skills, 'education': [], 'experience': [],
+            'summary': f"{name} resume"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ResumeIndex(str(tmp_path), version='test', dim=4)
+    for i, name in enumerate(['ada', 'grace', 'linus']):
+        embedding = np.zeros(4, dtype=np.float32)
+        embedding[i] = 1
+        index.add(name, resume(name, ['python']), embedding)
+    return index
+
+
+@pytest.mark.parametrize('top_n', [0, -1])
+def test_search_returns_nothing_for_non_positive_top_n(index, top_n):
+    assert index.search(np.ones(4, dtype=np.float32), ['python'], top_n=top_n) == []
+
+
+def test_search_caps_top_n_at_index_size(index):
+    assert len(index.search(np.ones(4, dtype=np.float32), [], top_n=2)) == 2
+    assert len(index.search(np.ones(4, dtype=np.float32), [], top_n=100)) == 3
+
+
+@pytest.mark.parametrize('top_n', ['0', '-1', 'above max', 'ten'])
+def test_candidate_endpoints_reject_bad_top_n(top_n):
+    app = pytest.importorskip('app')
+    client = app.app.test_client()
+    if top_n == 'above max':
+        top_n = str(app.MAX_TOP_N + 1)
+    job = {'title': 'Data Scientist', 'description': 'Python and SQL', 'required_skills': ['python']}
+    response = client.post('/candidates', query_string={'top_n': top_n}, json=job)
+    assert response.status_code == 400
+    assert 'top_n' in response.get_json()['error']
+
+    job_id = client.get('/jobs').get_json()['jobs'][0]['id']
+    response = client.get(f'/jobs/{job_id}/candidates', query_string={'top_n': top_n})
+    assert response.status_code == 400